@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from csv_loader import _cache_format, as_float64, widen_numbers
+from document_renderer import top_rows_by_group
+
+DIMENSIONS = ['Platform', 'Genre', 'Publisher', 'Year']
+MEASURES = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+
+# Bump when what build() stores changes (cells, kept top rows, summary), so persisted cubes are rebuilt
+CUBE_VERSION = 1
+
+
+class AggregateCube:
+    """Pre-aggregated sales over Platform x Genre x Publisher x Year.
+
+    ``cells`` holds one row per observed combination with the summed sales
+    of every region and the number of games. ``top_games`` keeps the few
+    rows needed for the top-N lists (global, per region and per platform),
+    and ``summary`` the dataset-wide statistics. All three are persisted
+    under ``<directory>/<csv hash>.v<CUBE_VERSION>`` so a restart never re-aggregates.
+    """
+
+    TOP_GAMES = 50
+    TOP_GAMES_PER_PLATFORM = 10
+
+    def __init__(self, cells: pd.DataFrame, top_games: pd.DataFrame, summary: Dict):
+        self.cells = cells
+        self.top_games = top_games
+        self.summary = summary
+
+    # ------------------------------------------------------------------ #
+    # Construction
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "AggregateCube":
+        dimensions = [c for c in DIMENSIONS if c in df.columns]
+        measures = [c for c in MEASURES if c in df.columns]
+
+        # Sums in float64 from the values written in the CSV (float32 columns of csv_loader)
+        sums = df[dimensions].assign(**{measure: as_float64(df[measure]) for measure in measures})
+        if dimensions:
+            grouped = sums.groupby(dimensions, dropna=False, observed=True)
+            cells = grouped[measures].sum().astype('float64')
+            cells['count'] = grouped.size()
+            cells = cells.reset_index()
+        else:
+            cells = sums[measures].sum().to_frame().T.assign(count=len(df))
+
+        # Rows needed by the top-N lists: global and per region, then per platform
+        keep = set()
+        for measure in measures:
+            keep.update(df.nlargest(cls.TOP_GAMES, measure).index)
+        if 'Platform' in df.columns and 'Global_Sales' in df.columns:
+            for rows in top_rows_by_group(df, 'Platform', 'Global_Sales', cls.TOP_GAMES_PER_PLATFORM).values():
+                keep.update(rows.index)
+        game_columns = [c for c in ['Name', 'Platform', 'Year', 'Genre', 'Publisher'] + measures if c in df.columns]
+        top_games = df.loc[sorted(keep), game_columns]
+
+        summary = {
+            "rows": len(df),
+            "columns": df.columns.tolist(),
+            "describe": widen_numbers(df).describe(include='all').to_string(),
+            "platform_order": [str(p) for p in df['Platform'].unique()] if 'Platform' in df.columns else [],
+        }
+        return cls(cells, top_games, summary)
+
+    @classmethod
+    def load_or_build(cls, df: pd.DataFrame, source_hash: str, directory: str) -> "AggregateCube":
+        path = os.path.join(directory, f"{source_hash[:16]}.v{CUBE_VERSION}")
+        cube = cls.load(path)
+        if cube is not None:
+            print(f"✓ Agrégats pré-calculés chargés ({len(cube.cells)} cellules)")
+            return cube
+
+        cube = cls.build(df)
+        cube.save(path)
+        # Aggregates of previous versions of the file are stale
+        for name in os.listdir(directory):
+            if name != os.path.basename(path):
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        print(f"✓ Agrégats pré-calculés et persistés ({len(cube.cells)} cellules)")
+        return cube
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def save(self, path: str) -> None:
+        fmt = _cache_format()
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, frame in [("cells", self.cells), ("top_games", self.top_games)]:
+            if fmt == "parquet":
+                frame.to_parquet(os.path.join(tmp_path, f"{name}.parquet"))
+            else:
+                frame.to_pickle(os.path.join(tmp_path, f"{name}.pkl"))
+        with open(os.path.join(tmp_path, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.summary, f, ensure_ascii=False)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["AggregateCube"]:
+        try:
+            with open(os.path.join(path, "summary.json"), "r", encoding="utf-8") as f:
+                summary = json.load(f)
+            frames = []
+            for name in ["cells", "top_games"]:
+                parquet_path = os.path.join(path, f"{name}.parquet")
+                if os.path.exists(parquet_path):
+                    frames.append(pd.read_parquet(parquet_path))
+                else:
+                    frames.append(pd.read_pickle(os.path.join(path, f"{name}.pkl")))
+        except (OSError, ValueError, ImportError):
+            return None
+        return cls(frames[0], frames[1], summary)
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+    def filter(self, filters: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+        """Cells matching {'Platform': [...], 'Genre': [...], 'Year': (min, max)}"""
+        cells = self.cells
+        for column, value in (filters or {}).items():
+            if column not in cells.columns:
+                continue
+            if column == 'Year':
+                low, high = value
+                cells = cells[cells['Year'].between(low, high).to_numpy(dtype=bool, na_value=False)]
+            else:
+                cells = cells[cells[column].isin(value).to_numpy(dtype=bool, na_value=False)]
+        return cells
+
+    def aggregate(self, group_by: str, measure: str, agg: str = 'sum',
+                  filters: Optional[Dict[str, object]] = None) -> pd.Series:
+        """Total (or mean per game) of ``measure`` for each value of ``group_by``"""
+        grouped = self.filter(filters).groupby(group_by, observed=True)[[measure, 'count']].sum()
+        if agg == 'mean':
+            return grouped[measure] / grouped['count']
+        if agg == 'count':
+            return grouped['count'].astype('float64')
+        return grouped[measure]
+
+    def totals(self, measures: Iterable[str],
+               filters: Optional[Dict[str, object]] = None) -> Tuple[pd.Series, int]:
+        """(sum of each measure, number of games) over the filtered cells"""
+        cells = self.filter(filters)
+        return cells[list(measures)].sum(), int(cells['count'].sum())
+
+    def top_games_by(self, measure: str, n: int) -> pd.DataFrame:
+        return self.top_games.nlargest(n, measure)
+
+    def top_games_per_platform(self, n: int) -> Dict[str, pd.DataFrame]:
+        return top_rows_by_group(self.top_games, 'Platform', 'Global_Sales', n)
@@ -0,0 +1,322 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from aggregate_cube import AggregateCube
+from question_filters import DIMENSION_WORDS, GENRE_ALIASES, QuestionFilterParser, normalize, tokens_of
+
+REGION_COLUMNS = {
+    'NA_Sales': "Amérique du Nord",
+    'EU_Sales': "Europe",
+    'JP_Sales': "Japon",
+    'Other_Sales': "Autres régions",
+    'Global_Sales': "Monde",
+}
+
+DIMENSION_LABELS = {
+    'Platform': "plateforme",
+    'Genre': "genre",
+    'Publisher': "éditeur",
+    'Year': "année",
+}
+
+REGION_WORDS = {
+    # "eu" et "na" seuls sont aussi des mots ("il a eu") : seulement accolés aux ventes
+    'NA_Sales': ["amerique du nord", "amerique", "north america", "etats-unis", "usa",
+                 "ventes na", "na sales"],
+    'EU_Sales': ["europe", "ventes eu", "eu sales"],
+    'JP_Sales': ["japon", "japan", "jp"],
+    'Other_Sales': ["autres regions", "other regions", "reste du monde"],
+}
+
+GAME_WORDS = r"\b(jeu|jeux|game|games|titre|titres)\b"
+# Alternatives les plus longues d'abord : "best" ne doit pas laisser "-selling", ni "le plus" laisser "de succes"
+RANK_WORDS = (r"\b((?:le |la |les )?plus (?:de succes|de ventes|vendus?)|best-selling|top-selling|classement|"
+              r"meilleure?s?|premiers?|highest|le plus|la plus|les plus|best|most|top)\b")
+AGG_WORDS = r"\b(statistiques|totales|moyenne|average|combien|totale|totaux|nombre|total|somme|moyen|stats|mean|sum)\b"
+SALES_WORDS = r"\b(chiffres?|ventes?|vendus?|sales|sold)\b"
+COUNT_WORDS = r"\b(le plus de|nombre de|combien de|number of|how many|plus de|most)\s+(jeux|games|titres)\b"
+NUMBER_WORDS = {"un": 1, "deux": 2, "trois": 3, "quatre": 4, "cinq": 5, "six": 6, "sept": 7,
+                "huit": 8, "neuf": 9, "dix": 10, "quinze": 15, "vingt": 20}
+
+# Mots de question qui ne changent pas le calcul ; tout autre mot non reconnu renvoie vers le RAG
+QUESTION_WORDS = frozenset("""
+au aux avec ce ces cette dans de des du en est et eu il ils la le les leur leurs lequel laquelle lesquels
+mes moi nous ont ou par pour quel quelle quelles quels qui que quoi sa se ses son sont sur tous toutes
+tout toute une vous donne donnez dis dites montre montrez affiche liste cite peux pouvez fait ete
+avoir quelles jamais temps histoire monde mondial mondiales mondiaux globales global globale millions
+million vend vendent vendre mieux marche video videos dataset donnees chaque entre depuis apres avant
+ans
+a all an are at by did do does ever for from give has have in is list me of on per show tell the there
+time to was were what which who whose with worldwide
+""".split())
+
+
+def _mentions(text: str, words: List[str]) -> bool:
+    return any(re.search(rf"\b{re.escape(word)}\b", text) for word in words)
+
+
+@dataclass
+class AggregateIntent:
+    """Question agrégée reconnue : ce qu'il faut calculer sur le DataFrame"""
+    kind: str  # 'top_games', 'region_top_games', 'ranking', 'regions' ou 'total'
+    measure: str = 'Global_Sales'
+    group_by: Optional[str] = None
+    agg: str = 'sum'  # 'sum', 'mean' ou 'count' (nombre de jeux)
+    n: int = 5
+    filters: Dict[str, object] = field(default_factory=dict)
+
+
+class AnalyticsRouter:
+    """Reconnaît les questions d'agrégation et y répond directement avec pandas"""
+
+    DEFAULT_TOP_N = 5
+    MAX_TOP_N = 50
+    MAX_GROUPS = 10  # nombre de groupes affichés pour un TOP par groupe
+
+    def __init__(self, df: pd.DataFrame, cube: Optional[AggregateCube] = None):
+        self.df = df
+        # Les agrégats (sommes, moyennes, classements) sont servis par le cube
+        self.cube = cube if cube is not None else AggregateCube.build(df)
+        # Plateformes, genres, éditeurs et années cités dans la question
+        self.filter_parser = QuestionFilterParser(df)
+
+    # ------------------------------------------------------------------ #
+    # Reconnaissance
+    # ------------------------------------------------------------------ #
+    def route(self, question: str) -> Optional[AggregateIntent]:
+        """Retourne l'intention agrégée de la question, ou None pour passer par le RAG"""
+        text = normalize(question)
+        has_rank = re.search(RANK_WORDS, text) is not None
+        has_agg = re.search(AGG_WORDS, text) is not None
+        has_sales = re.search(SALES_WORDS, text) is not None
+        asks_games = re.search(GAME_WORDS, text) is not None
+
+        per_dim = self._per_dimension(text)
+        target_dim = self._target_dimension(text, exclude=per_dim)
+        region = self._region(text)
+        counts_games = re.search(COUNT_WORDS, text) is not None
+
+        intent = AggregateIntent(
+            kind='total',
+            measure=region or 'Global_Sales',
+            agg='mean' if re.search(r"\b(moyenne|moyen|average|mean)\b", text) else 'sum',
+            n=self._top_n(text),
+        )
+
+        asks_regions = re.search(r"\bregions?\b", text) is not None and region is None
+        if counts_games and (target_dim or per_dim):
+            intent.kind = 'ranking'
+            intent.group_by = target_dim or per_dim
+            intent.agg = 'count'
+        elif counts_games:
+            intent.agg = 'count'
+        elif asks_regions and asks_games and has_rank:
+            intent.kind = 'region_top_games'
+        elif asks_regions and (has_agg or has_sales or per_dim is None):
+            intent.kind = 'regions'
+        elif asks_games and has_rank:
+            intent.kind = 'top_games'
+            intent.group_by = per_dim
+        elif target_dim and (has_rank or has_agg):
+            intent.kind = 'ranking'
+            intent.group_by = target_dim
+        elif per_dim and (has_agg or has_sales or has_rank):
+            intent.kind = 'ranking'
+            intent.group_by = per_dim
+            intent.n = self._top_n(text, default=20)
+        elif not (has_agg and has_sales):
+            return None
+
+        if intent.group_by and intent.group_by not in self.df.columns:
+            return None
+        # La dimension classée n'est pas un filtre ("quelle plateforme..." ne filtre pas sur "plateforme")
+        intent.filters = self._filters(text, skip=intent.group_by or per_dim)
+        if self._unparsed_words(text, intent.filters):
+            # "meilleur jeu de Mario" : un mot que le calcul ignorerait, le RAG répond mieux
+            return None
+        return intent
+
+    def _per_dimension(self, text: str) -> Optional[str]:
+        for column, words in DIMENSION_WORDS.items():
+            if re.search(rf"\b(par|by|per|pour chaque|selon)\s+({'|'.join(map(re.escape, words))})\b", text):
+                return column
+        return None
+
+    def _target_dimension(self, text: str, exclude: Optional[str]) -> Optional[str]:
+        for column, words in DIMENSION_WORDS.items():
+            if column != exclude and column != 'Year' and _mentions(text, words):
+                return column
+        if exclude != 'Year' and re.search(r"\b(quelle annee|which year|en quelle annee)\b", text):
+            return 'Year'
+        return None
+
+    @staticmethod
+    def _region(text: str) -> Optional[str]:
+        for column, words in REGION_WORDS.items():
+            if _mentions(text, words):
+                return column
+        return None
+
+    def _filters(self, text: str, skip: Optional[str]) -> Dict[str, object]:
+        return self.filter_parser.parse(text, skip=skip)
+
+    @staticmethod
+    def _unparsed_words(text: str, filters: Dict[str, object]) -> List[str]:
+        """Mots de la question qui ne sont ni des mots-clés du calcul, ni des filtres reconnus"""
+        for pattern in (GAME_WORDS, RANK_WORDS, AGG_WORDS, SALES_WORDS, COUNT_WORDS, r"\bregions?\b"):
+            text = re.sub(pattern, " ", text)
+        keywords = [word for words in list(DIMENSION_WORDS.values()) + list(REGION_WORDS.values()) for word in words]
+        for phrase in sorted(keywords, key=len, reverse=True):
+            text = re.sub(rf"\b{re.escape(phrase)}\b", " ", text)
+
+        known = set(QUESTION_WORDS) | set(NUMBER_WORDS)
+        for column, value in filters.items():
+            if column != 'Year':
+                known.update(token for v in value for token in tokens_of(normalize(str(v))))
+        known.update(alias for alias, genre in GENRE_ALIASES.items() if genre in filters.get('Genre', []))
+        return [token for token in tokens_of(text)
+                if len(token) > 1 and not token.isdigit() and token not in known]
+
+    def _top_n(self, text: str, default: int = DEFAULT_TOP_N) -> int:
+        match = re.search(r"\btop\s*(\d+)\b", text) or re.search(
+            r"\b(\d+)\s+(premiers?|meilleure?s?|plus|jeux|games|editeurs|plateformes|genres)\b", text)
+        if match:
+            return max(1, min(int(match.group(1)), self.MAX_TOP_N))
+        for word, value in NUMBER_WORDS.items():
+            if re.search(rf"\b(top|les)\s+{word}\b", text) or re.search(rf"\b{word}\s+(premiers?|meilleure?s?)\b", text):
+                return value
+        return default
+
+    # ------------------------------------------------------------------ #
+    # Calcul
+    # ------------------------------------------------------------------ #
+    def _filtered(self, filters: Dict[str, object]) -> pd.DataFrame:
+        return self.df[self.filter_parser.mask(self.df, filters)]
+
+    @staticmethod
+    def _describe_filters(filters: Dict[str, object]) -> str:
+        parts = []
+        for column, value in filters.items():
+            if column == 'Year':
+                low, high = value
+                parts.append(f"en {low}" if low == high else f"de {low} à {high}")
+            else:
+                parts.append(f"{DIMENSION_LABELS.get(column, column)} {', '.join(map(str, value))}")
+        return f" ({'; '.join(parts)})" if parts else ""
+
+    @staticmethod
+    def _label(value) -> str:
+        if pd.api.types.is_scalar(value) and pd.isna(value):
+            # Année manquante (NA de l'Int16 du chargeur typé, NaN d'un DataFrame par défaut)
+            return "N/A"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    def answer(self, intent: AggregateIntent) -> Tuple[str, pd.DataFrame]:
+        """Calcule le résultat de l'intention ; retourne (texte, tableau)"""
+        if intent.kind in ('regions', 'ranking', 'total'):
+            return self._answer_from_cube(intent)
+        return self._answer_from_games(intent)
+
+    def _answer_from_cube(self, intent: AggregateIntent) -> Tuple[str, pd.DataFrame]:
+        """Agrégats servis par le cube pré-calculé, sans parcourir les lignes"""
+        scope = self._describe_filters(intent.filters)
+        region = REGION_COLUMNS.get(intent.measure, intent.measure)
+        columns = [c for c in REGION_COLUMNS if c in self.cube.cells.columns]
+        sums, count = self.cube.totals(columns, intent.filters)
+
+        if count == 0:
+            return f"Aucune donnée ne correspond à ces critères{scope}.", pd.DataFrame()
+
+        if intent.kind == 'regions':
+            table = pd.DataFrame({'total': sums, 'moyenne': sums / count})
+            lines = [f"Statistiques de ventes par région{scope} (en millions) :"]
+            for column, row in table.iterrows():
+                lines.append(f"- {REGION_COLUMNS[column]} : total {row['total']:.2f}M, moyenne {row['moyenne']:.2f}M par jeu")
+            return "\n".join(lines), table
+
+        if intent.agg == 'count':
+            return self._answer_count(intent, scope, count)
+
+        agg_label = "moyenne" if intent.agg == 'mean' else "total"
+        if intent.kind == 'ranking':
+            grouped = self.cube.aggregate(intent.group_by, intent.measure, intent.agg, intent.filters)
+            table = grouped.nlargest(intent.n).rename(f"{intent.measure}_{intent.agg}").to_frame()
+            label = DIMENSION_LABELS[intent.group_by]
+            best, best_value = table.index[0], table.iloc[0, 0]
+            lines = [f"{label.capitalize()} en tête{scope} : {self._label(best)} "
+                     f"({agg_label} des ventes {region} : {best_value:.2f} millions).",
+                     f"Classement par {label} ({agg_label}, en millions) :"]
+            for rank, (key, value) in enumerate(table.iloc[:, 0].items(), start=1):
+                lines.append(f"{rank}. {self._label(key)} : {value:.2f}M")
+            return "\n".join(lines), table
+
+        value = sums[intent.measure] / count if intent.agg == 'mean' else sums[intent.measure]
+        table = pd.DataFrame({intent.measure: [value], 'jeux': [count]})
+        return (f"Ventes {region}{scope} : {agg_label} de {value:.2f} millions "
+                f"sur {count} jeux."), table
+
+    def _answer_count(self, intent: AggregateIntent, scope: str, count: int) -> Tuple[str, pd.DataFrame]:
+        """Nombre de jeux, au total ou par groupe"""
+        if intent.kind != 'ranking':
+            return f"Nombre de jeux{scope} : {count}.", pd.DataFrame({'jeux': [count]})
+        grouped = self.cube.aggregate(intent.group_by, intent.measure, 'count', intent.filters)
+        table = grouped.nlargest(intent.n).astype('int64').rename('jeux').to_frame()
+        label = DIMENSION_LABELS[intent.group_by]
+        best, best_value = table.index[0], table.iloc[0, 0]
+        lines = [f"{label.capitalize()} en tête{scope} : {self._label(best)} ({best_value} jeux).",
+                 f"Classement par {label} (nombre de jeux) :"]
+        for rank, (key, value) in enumerate(table['jeux'].items(), start=1):
+            lines.append(f"{rank}. {self._label(key)} : {value} jeux")
+        return "\n".join(lines), table
+
+    def _answer_from_games(self, intent: AggregateIntent) -> Tuple[str, pd.DataFrame]:
+        """Classements de jeux : ils ont besoin des lignes individuelles"""
+        df = self._filtered(intent.filters)
+        scope = self._describe_filters(intent.filters)
+        region = REGION_COLUMNS.get(intent.measure, intent.measure)
+
+        if df.empty:
+            return f"Aucune donnée ne correspond à ces critères{scope}.", df
+
+        if intent.kind == 'region_top_games':
+            lines = [f"TOP {intent.n} des jeux par région{scope} (en millions) :"]
+            tables = []
+            for column, label in REGION_COLUMNS.items():
+                if column not in df.columns:
+                    continue
+                top = df.nlargest(intent.n, column)
+                tables.append(top[['Name', column]].rename(columns={column: 'Sales'}).assign(Region=column))
+                lines.append(f"\n{label} :")
+                for _, row in top.iterrows():
+                    lines.append(f"- {row['Name']} ({row.get('Platform', 'N/A')}) : {row[column]:.2f}M")
+            return "\n".join(lines), pd.concat(tables, ignore_index=True)
+
+        if intent.kind == 'top_games':
+            columns = [c for c in ['Name', 'Platform', 'Year', 'Publisher', intent.measure] if c in df.columns]
+            if intent.group_by:
+                group_totals = df.groupby(intent.group_by, observed=True)[intent.measure].sum()
+                groups = group_totals.nlargest(self.MAX_GROUPS).index
+                ranked = df[df[intent.group_by].isin(groups)].sort_values(intent.measure, ascending=False, kind='stable')
+                table = ranked.groupby(intent.group_by, sort=False, observed=True).head(intent.n)[columns]
+                lines = [f"TOP {intent.n} des jeux par {DIMENSION_LABELS[intent.group_by]}{scope} "
+                         f"(ventes {region}, en millions) :"]
+                for group in groups:
+                    lines.append(f"\n{self._label(group)} :")
+                    for _, row in table[table[intent.group_by] == group].iterrows():
+                        lines.append(f"- {row['Name']} : {row[intent.measure]:.2f}M")
+                return "\n".join(lines), table
+
+            table = df.nlargest(intent.n, intent.measure)[columns]
+            best = table.iloc[0]
+            lines = [f"Le jeu le plus vendu{scope} est {best['Name']} ({best.get('Platform', 'N/A')}) "
+                     f"avec {best[intent.measure]:.2f} millions de ventes ({region}).",
+                     f"TOP {len(table)} :"]
+            for rank, (_, row) in enumerate(table.iterrows(), start=1):
+                lines.append(f"{rank}. {row['Name']} ({row.get('Platform', 'N/A')}, {self._label(row.get('Year', ''))}) : "
+                             f"{row[intent.measure]:.2f}M")
+            return "\n".join(lines), table
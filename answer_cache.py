@@ -0,0 +1,114 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """Answer cache keyed on the question embedding, its filters and the games it names.
+
+    A question whose cosine distance to a cached one is at most
+    ``max_distance``, with the same filters (platforms, genres, publishers,
+    years parsed from the question) and the same named games (ids of the
+    exact title matches), gets the stored response back: "ventes en 2008"
+    and "ventes en 2009", or "FIFA 14" and "FIFA 15", embed almost
+    identically. Entries are evicted in
+    LRU order beyond ``max_entries`` and expire after ``ttl_seconds``; the
+    whole cache is dropped when the dataset fingerprint changes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0, max_distance: float = 0.05):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.fingerprint = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()  # id -> (unit vector, response, created_at, scope key)
+        self._next_id = 0
+        self._matrix = None  # stacked vectors, rebuilt lazily after a change
+        self._matrix_ids = []
+        self._matrix_scopes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _scope_key(filters: Optional[Dict[str, Any]], games: Sequence[str]) -> str:
+        return json.dumps([filters or {}, sorted(games)], sort_keys=True, default=str)
+
+    @staticmethod
+    def fingerprint_of(manifest: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def invalidate(self, manifest: Optional[Dict[str, Any]] = None) -> None:
+        """Drop every entry if the dataset manifest differs from the one the answers were built on"""
+        fingerprint = self.fingerprint_of(manifest) if manifest is not None else None
+        with self._lock:
+            if manifest is not None and fingerprint == self.fingerprint:
+                return
+            self._entries.clear()
+            self._matrix = None
+            self.fingerprint = fingerprint
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [key for key, (_, _, created, _) in self._entries.items() if now - created > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self.evictions += len(expired)
+            self._matrix = None
+
+    def lookup(self, embedding: Sequence[float],
+               filters: Optional[Dict[str, Any]] = None, games: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+        query = self._unit(embedding)
+        scope_key = self._scope_key(filters, games)
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            if self._entries:
+                if self._matrix is None:
+                    self._matrix_ids = list(self._entries)
+                    self._matrix = np.vstack([self._entries[key][0] for key in self._matrix_ids])
+                    self._matrix_scopes = np.array([self._entries[key][3] for key in self._matrix_ids], dtype=object)
+                distances = 1.0 - self._matrix @ query
+                distances[self._matrix_scopes != scope_key] = np.inf
+                best = int(np.argmin(distances))
+                if distances[best] <= self.max_distance:
+                    key = self._matrix_ids[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][1]
+            self.misses += 1
+            return None
+
+    def store(self, embedding: Sequence[float], response: Dict[str, Any],
+              filters: Optional[Dict[str, Any]] = None, games: Sequence[str] = ()) -> None:
+        with self._lock:
+            self._entries[self._next_id] = (self._unit(embedding), response, time.monotonic(),
+                                            self._scope_key(filters, games))
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,114 @@
+"""
+Serveur ASGI (Starlette) : même interface que app.py, mais les requêtes qui
+attendent LM Studio ne monopolisent aucun thread.
+
+Lancement : uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+import contextlib
+import json
+
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from chatbot_service import ChatbotService
+import metrics
+from web_template import HTML_TEMPLATE
+
+CSV_PATH = "data/vgsales.csv"
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Chargement du modèle d'embeddings et de l'index en arrière-plan : le serveur écoute tout de suite
+    app.state.service = ChatbotService(CSV_PATH).start()
+    yield
+    if app.state.service.chatbot is not None:
+        await app.state.service.chatbot.aclose()
+
+
+def not_ready(service):
+    return JSONResponse({**service.status(), 'error': service.unavailable_message()}, status_code=503)
+
+
+async def read_question(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return ''
+    return (data or {}).get('question', '')
+
+
+async def home(request):
+    return HTMLResponse(HTML_TEMPLATE)
+
+
+async def healthz(request):
+    return JSONResponse({'status': 'ok'})
+
+
+async def readyz(request):
+    service = request.app.state.service
+    return JSONResponse(service.status(), status_code=200 if service.chatbot is not None else 503)
+
+
+async def metrics_endpoint(request):
+    return Response(metrics.REGISTRY.render(), headers={'Content-Type': metrics.CONTENT_TYPE})
+
+
+async def ask(request):
+    question = await read_question(request)
+    if not question:
+        return JSONResponse({'error': 'Question vide'}, status_code=400)
+    chatbot = request.app.state.service.chatbot
+    if chatbot is None:
+        return not_ready(request.app.state.service)
+    response = await chatbot.aask(question)
+    return JSONResponse({
+        'answer': response['answer'],
+        'sources_count': len(response['sources']),
+        'context_tokens': response.get('context_tokens', 0)
+    })
+
+
+async def ask_stream(request):
+    question = await read_question(request)
+    if not question:
+        return JSONResponse({'error': 'Question vide'}, status_code=400)
+    chatbot = request.app.state.service.chatbot
+    if chatbot is None:
+        return not_ready(request.app.state.service)
+
+    async def events():
+        # Server-sent events : un évènement "data: {...}" par fragment de réponse
+        async for event in chatbot.aask_stream(question):
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+app = Starlette(
+    routes=[
+        Route('/', home),
+        Route('/healthz', healthz),
+        Route('/readyz', readyz),
+        Route('/metrics', metrics_endpoint),
+        Route('/ask', ask, methods=['POST']),
+        Route('/ask/stream', ask_stream, methods=['POST']),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("\n" + "="*70)
+    print("🌐 Interface web lancée sur : http://localhost:5000")
+    print("📱 Ouvrez votre navigateur et accédez à cette URL")
+    print("="*70 + "\n")
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,103 @@
+"""
+Benchmark : embeddings PyTorch (sentence-transformers) vs ONNX Runtime (fp32 / int8)
+
+Mesure le débit d'encodage des documents par jeu de vgsales.csv et la
+latence d'une question seule, puis vérifie la parité : similarité cosinus
+entre les vecteurs torch et ONNX des mêmes textes, et recouvrement des 10
+plus proches voisins. Le script échoue (code 1) si la similarité minimale
+passe sous --min-cosine.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_embeddings --csv data/vgsales.csv --docs 2000 --threads 4
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from document_renderer import render_game_documents
+from onnx_embeddings import OnnxEmbeddings
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def throughput(encode, texts, batch_size):
+    encode(texts[:batch_size])  # chauffe
+    start = time.perf_counter()
+    vectors = np.asarray(encode(texts), dtype=np.float32)
+    return len(texts) / (time.perf_counter() - start), vectors
+
+
+def query_latency(encode, queries):
+    encode(queries[:1])
+    start = time.perf_counter()
+    for query in queries:
+        encode([query])
+    return (time.perf_counter() - start) / len(queries)
+
+
+def neighbours(vectors, queries, k=10):
+    return np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/vgsales.csv")
+    parser.add_argument("--docs", type=int, default=2000, help="Nombre de documents encodés")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=0, help="Threads intra-op (0 = défaut de la bibliothèque)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--onnx-dir", default="./onnx_models")
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    df = pd.read_csv(args.csv).head(args.docs)
+    texts, _, _ = render_game_documents(df)
+    queries = [f"Ventes de {name}" for name in df['Name'].sample(args.queries, random_state=0).astype(str)]
+
+    model = SentenceTransformer(MODEL)
+    backends = {
+        "torch fp32": lambda batch: model.encode(batch, batch_size=args.batch_size, normalize_embeddings=True),
+    }
+    for label, quantize in [("onnx fp32", False), ("onnx int8", True)]:
+        onnx = OnnxEmbeddings(MODEL, args.onnx_dir, quantize=quantize, intra_op_threads=args.threads,
+                              batch_size=args.batch_size)
+        backends[label] = onnx.encode
+
+    print(f"\n📊 {len(texts)} documents, {len(queries)} questions, threads={args.threads or 'défaut'}\n")
+    doc_vectors, query_vectors = {}, {}
+    for label, encode in backends.items():
+        rate, doc_vectors[label] = throughput(encode, texts, args.batch_size)
+        latency = query_latency(encode, queries)
+        query_vectors[label] = np.asarray(encode(queries), dtype=np.float32)
+        print(f"  {label:<11} {rate:8.0f} docs/s | question seule {latency * 1000:6.2f} ms")
+
+    print("\n🔎 Parité avec torch")
+    reference = doc_vectors["torch fp32"]
+    reference_neighbours = neighbours(reference, query_vectors["torch fp32"])
+    failed = False
+    for label in backends:
+        if label == "torch fp32":
+            continue
+        cosine = np.sum(reference * doc_vectors[label], axis=1)
+        found = neighbours(doc_vectors[label], query_vectors[label])
+        overlap = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(found, reference_neighbours)])
+        print(f"  {label:<11} cosinus moyen {cosine.mean():.4f} | min {cosine.min():.4f} | "
+              f"top-10 commun {overlap:.3f}")
+        failed |= cosine.min() < args.min_cosine
+
+    if failed:
+        print(f"\n❌ Similarité cosinus sous le seuil {args.min_cosine}")
+        sys.exit(1)
+    print("\n✅ Parité respectée")
+
+
+if __name__ == "__main__":
+    main()
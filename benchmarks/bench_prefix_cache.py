@@ -0,0 +1,99 @@
+"""
+Benchmark : réutilisation du préfixe de prompt (cache KV) par LM Studio
+
+Compare le délai avant le premier token pour deux mises en page du prompt :
+- « un message » : consignes + contexte récupéré + question dans un seul
+  message utilisateur (ancienne mise en page) ;
+- « préfixe stable » : message système fixe (consignes puis documents de
+  synthèse, toujours dans le même ordre), puis le contexte propre à la question.
+
+Sans --base-url, un faux serveur (benchmarks/lmstudio_stub.py) simule le
+coût du prefill hors cache ; avec --base-url, les requêtes partent vers le
+vrai LM Studio.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_prefix_cache --csv data/vgsales.csv
+    python -m benchmarks.bench_prefix_cache --base-url http://localhost:1234/v1
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks import lmstudio_stub
+from config.config import RAGChatbotConfig
+from rag_chatbot import RAGChatbot
+
+QUESTIONS = [
+    "Quels sont les meilleurs jeux de rôle sur DS ?",
+    "Parle-moi des ventes de Mario Kart",
+    "Quels jeux de sport se sont bien vendus en Europe ?",
+    "Quels jeux Sega ont eu du succès ?",
+    "Quels shooters ont marché sur Xbox 360 ?",
+    "Quels jeux de course sont sortis sur PS2 ?",
+    "Quels jeux de plateforme ont le mieux marché au Japon ?",
+    "Parle-moi de la série Call of Duty",
+]
+
+
+def single_message(messages):
+    """Ancienne mise en page : tout dans un seul message utilisateur"""
+    return [{"role": "user", "content": "\n\n".join(m["content"] for m in messages)}]
+
+
+def time_to_first_token(llm, messages):
+    start = time.perf_counter()
+    for _ in llm.stream(messages):
+        return time.perf_counter() - start
+    return time.perf_counter() - start
+
+
+def run(bot, static_types, flatten, rounds):
+    bot.config.STATIC_CONTEXT_TYPES = static_types
+    bot._create_qa_chain()
+    latencies = []
+    for round_ in range(rounds):
+        for question in QUESTIONS:
+            response, pending = bot._prepare_answer(question)
+            if response is not None:
+                continue  # voie analytique : pas d'appel au modèle
+            messages = single_message(pending["prompt"]) if flatten else pending["prompt"]
+            latency = time_to_first_token(bot.llm, messages)
+            if round_ or question != QUESTIONS[0]:
+                latencies.append(latency)  # la toute première requête remplit le cache
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/vgsales.csv")
+    parser.add_argument("--base-url", help="URL de LM Studio (sinon faux serveur local)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--prefill-ms", type=float, default=0.5, help="Faux serveur : coût d'un token hors cache")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        stub_args = lmstudio_stub.build_parser().parse_args(["--port", "0", "--prefill-ms", str(args.prefill_ms)])
+        server = lmstudio_stub.serve(stub_args)
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    config = RAGChatbotConfig(LM_STUDIO_API_BASE=base_url)
+    bot = RAGChatbot(args.csv, config=config)
+    default_types = config.STATIC_CONTEXT_TYPES
+
+    print(f"\n📊 {len(QUESTIONS)} questions x {args.rounds} tours → {base_url}\n")
+    for label, static_types, flatten in [
+        ("un message", (), True),
+        ("préfixe stable", default_types, False),
+    ]:
+        latencies = run(bot, static_types, flatten, args.rounds)
+        print(f"  {label:<16} premier token : moyenne {statistics.mean(latencies) * 1000:7.1f} ms | "
+              f"médiane {statistics.median(latencies) * 1000:7.1f} ms")
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark : rendu des documents avec iterrows vs rendu vectorisé
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_rendering --csv data/vgsales.csv --scale 10
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from document_renderer import as_text, render_bullet_list, render_game_documents, top_rows_by_group
+
+
+def legacy_game_documents(df):
+    """Ancienne implémentation ligne par ligne (référence)"""
+    documents, metadatas, ids = [], [], []
+    for idx, row in df.iterrows():
+        documents.append(f"""
+Jeu: {row['Name']}
+Plateforme: {row['Platform']}
+Année: {row['Year']}
+Genre: {row['Genre']}
+Éditeur: {row['Publisher']}
+Ventes Amérique du Nord: {row['NA_Sales']} millions
+Ventes Europe: {row['EU_Sales']} millions
+Ventes Japon: {row['JP_Sales']} millions
+Ventes autres régions: {row['Other_Sales']} millions
+Ventes mondiales: {row['Global_Sales']} millions
+""")
+        metadatas.append({
+            'name': str(row['Name']),
+            'platform': str(row['Platform']),
+            'year': int(row['Year']) if not pd.isna(row['Year']) else 0,
+            'genre': str(row['Genre']),
+            'publisher': str(row['Publisher']),
+            'global_sales': float(row['Global_Sales'])
+        })
+        ids.append(str(idx))
+    return documents, metadatas, ids
+
+
+def legacy_top_lists(df):
+    texts = []
+    top_text = ""
+    for idx, row in df.nlargest(20, 'Global_Sales').iterrows():
+        top_text += f"- {row['Name']} ({row.get('Platform', 'N/A')}): {row['Global_Sales']} millions\n"
+    texts.append(top_text)
+    for platform in df['Platform'].unique()[:15]:
+        platform_text = ""
+        for idx, row in df[df['Platform'] == platform].nlargest(10, 'Global_Sales').iterrows():
+            platform_text += f"- {row['Name']}: {row['Global_Sales']} millions\n"
+        texts.append(platform_text)
+    return texts
+
+
+def vectorized_top_lists(df):
+    top_games = df.nlargest(20, 'Global_Sales')
+    texts = [render_bullet_list(as_text(top_games['Name']) + " (" + as_text(top_games['Platform']) + ")",
+                                top_games['Global_Sales'])]
+    top_by_platform = top_rows_by_group(df, 'Platform', 'Global_Sales', 10)
+    for platform in df['Platform'].unique()[:15]:
+        rows = top_by_platform[platform]
+        texts.append(render_bullet_list(as_text(rows['Name']), rows['Global_Sales']))
+    return texts
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/vgsales.csv")
+    parser.add_argument("--scale", type=int, default=10, help="Nombre de copies concaténées du CSV")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = pd.concat([pd.read_csv(args.csv)] * args.scale, ignore_index=True)
+    print(f"📊 {len(df)} lignes ({args.scale}x {args.csv})\n")
+
+    for label, legacy, vectorized in [
+        ("Documents par jeu", legacy_game_documents, render_game_documents),
+        ("Listes TOP-N", legacy_top_lists, vectorized_top_lists),
+    ]:
+        legacy_time, expected = timed(legacy, df, repeat=args.repeat)
+        vectorized_time, actual = timed(vectorized, df, repeat=args.repeat)
+        assert actual == expected, f"{label} : le rendu vectorisé diffère de l'original"
+        print(f"{label:<20} iterrows {legacy_time * 1000:9.1f} ms | vectorisé {vectorized_time * 1000:8.1f} ms "
+              f"| x{legacy_time / vectorized_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark : recherche question par question vs micro-batching (RetrievalBatcher)
+
+N threads posent chacun des questions en boucle ; on mesure le débit
+(questions/s) de l'encodage + requête Chroma, avec et sans regroupement.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_retrieval_batching --csv data/vgsales.csv --threads 32
+"""
+import argparse
+import threading
+import time
+
+import chromadb
+import pandas as pd
+from sentence_transformers import SentenceTransformer
+
+from document_renderer import render_game_documents
+from retrieval_batcher import RetrievalBatcher
+
+QUESTIONS = [
+    "Quel est le jeu le plus vendu sur Wii ?",
+    "Meilleurs jeux de sport en Europe",
+    "Jeux Nintendo sortis en 2006",
+    "Quels jeux de rôle ont le mieux marché au Japon ?",
+    "Ventes de Grand Theft Auto",
+    "Jeux de course sur PS2",
+    "Top shooters sur Xbox 360",
+    "Jeux de plateforme de Sega",
+]
+
+
+def build_collection(model, csv_path, rows):
+    df = pd.read_csv(csv_path).head(rows)
+    texts, metadatas, ids = render_game_documents(df)
+    collection = chromadb.EphemeralClient().create_collection("bench_batching")
+    embeddings = model.encode(texts, batch_size=256).tolist()
+    for start in range(0, len(texts), 5000):
+        end = start + 5000
+        collection.add(ids=ids[start:end], documents=texts[start:end],
+                       metadatas=metadatas[start:end], embeddings=embeddings[start:end])
+    return collection
+
+
+def run(threads, questions_per_thread, retrieve):
+    def worker(offset):
+        for i in range(questions_per_thread):
+            retrieve(QUESTIONS[(offset + i) % len(QUESTIONS)] + f" #{offset}-{i}")
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return threads * questions_per_thread / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/vgsales.csv")
+    parser.add_argument("--rows", type=int, default=5000, help="Nombre de jeux indexés")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--questions", type=int, default=8, help="Questions par thread")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    collection = build_collection(model, args.csv, args.rows)
+    print(f"📊 {collection.count()} documents, {args.threads} threads x {args.questions} questions\n")
+
+    def single(question):
+        vector = model.encode([question])[0].tolist()
+        return collection.query(query_embeddings=[vector], n_results=args.k)
+
+    def search_batch(vectors, k):
+        results = collection.query(query_embeddings=[list(v) for v in vectors], n_results=k)
+        return results["ids"]
+
+    batcher = RetrievalBatcher(
+        lambda texts: model.encode(texts).tolist(),
+        search_batch,
+        max_batch=args.max_batch,
+        max_wait_ms=args.wait_ms
+    )
+
+    def batched(question):
+        return batcher.search(batcher.embed(question), args.k)
+
+    # Vérification : même résultat avec et sans regroupement
+    reference = single(QUESTIONS[0])["ids"][0]
+    assert batched(QUESTIONS[0]) == reference, "le regroupement change les documents retrouvés"
+
+    single_rate = run(args.threads, args.questions, single)
+    batched_rate = run(args.threads, args.questions, batched)
+    stats = batcher.stats()
+    print(f"Une requête par question {single_rate:8.1f} q/s")
+    print(f"Micro-batching           {batched_rate:8.1f} q/s | x{batched_rate / single_rate:.1f} "
+          f"(lots moyens de {stats['mean_batch_size']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
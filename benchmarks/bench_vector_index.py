@@ -0,0 +1,75 @@
+"""
+Benchmark : Chroma (SQLite + HNSW) vs index NumPy (float32 / float16 / int8)
+
+Les documents par jeu de vgsales.csv sont encodés une fois avec le modèle
+d'embeddings, puis chaque backend répond aux mêmes requêtes. Le rappel@k est
+mesuré par rapport à la recherche exacte float32.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_vector_index --csv data/vgsales.csv --queries 200
+"""
+import argparse
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+import pandas as pd
+from sentence_transformers import SentenceTransformer
+
+from document_renderer import render_game_documents
+from vector_index import DTYPES, ChromaVectorIndex, NumpyVectorIndex
+
+FILTER = {"$and": [{"platform": {"$in": ["Wii", "DS"]}}, {"year": {"$gte": 2005}}]}
+
+
+def timed_search(index, queries, k, where=None):
+    start = time.perf_counter()
+    results = [index.search([query], k, where)[0] for query in queries]
+    return (time.perf_counter() - start) / len(queries), [[hit.id for hit in hits] for hits in results]
+
+
+def recall(results, reference):
+    return float(np.mean([len(set(found) & set(expected)) / max(len(expected), 1)
+                          for found, expected in zip(results, reference)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/vgsales.csv")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes (noms de jeux tirés au hasard)")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    texts, metadatas, ids = render_game_documents(df)
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    print(f"⏳ Encodage de {len(texts)} documents...")
+    embeddings = model.encode(texts, batch_size=256, normalize_embeddings=True)
+
+    sample = df['Name'].sample(args.queries, random_state=0).astype(str).tolist()
+    queries = model.encode([f"Ventes de {name}" for name in sample], normalize_embeddings=True)
+
+    workdir = tempfile.mkdtemp()
+    backends = {}
+    for dtype in DTYPES:
+        index = NumpyVectorIndex(f"{workdir}/numpy_{dtype}", dtype)
+        index.add(ids, embeddings, texts, metadatas)
+        index.save()
+        backends[f"numpy {dtype}"] = NumpyVectorIndex.load(index.directory)
+    collection = chromadb.PersistentClient(path=f"{workdir}/chroma").create_collection("bench")
+    chroma = ChromaVectorIndex(collection)
+    chroma.add(ids, embeddings.tolist(), texts, metadatas)
+    backends["chroma"] = chroma
+
+    print(f"📊 {len(texts)} vecteurs, {args.queries} requêtes, k={args.k}\n")
+    for label, where in [("sans filtre", None), ("avec filtre", FILTER)]:
+        _, reference = timed_search(backends["numpy float32"], queries, args.k, where)
+        print(f"— {label}")
+        for name, index in backends.items():
+            latency, results = timed_search(index, queries, args.k, where)
+            print(f"  {name:<14} {latency * 1000:7.2f} ms/requête | rappel@{args.k} {recall(results, reference):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Faux serveur LM Studio (/v1/chat/completions) pour les benchmarks
+
+Le temps de réponse imite un serveur llama.cpp : --latency-ms fixes, puis
+le prefill (le préfixe du prompt déjà présent dans l'un des derniers prompts
+traités, cache KV d'un « slot », est gratuit, chaque autre token coûte
+--prefill-ms), puis la génération de --completion-tokens tokens à
+--tokens-per-second. Les messages sont mis à plat avec un gabarit ChatML et
+comptés à raison de --chars-per-token caractères par token. La réponse
+indique dans "usage" les tokens du prompt et ceux repris du cache.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.lmstudio_stub --port 1234 --latency-ms 50 --tokens-per-second 30
+"""
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER_WORDS = "Réponse simulée par le serveur de test pour mesurer le système sans modèle".split()
+
+
+def answer_tokens(count):
+    """``count`` fragments de réponse (un mot par token)"""
+    return [ANSWER_WORDS[i % len(ANSWER_WORDS)] + " " for i in range(count)]
+
+
+def render_chat(messages):
+    """Texte vu par le modèle (gabarit ChatML)"""
+    return "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages) + "<|im_start|>assistant\n"
+
+
+def common_prefix_length(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class PrefixCache:
+    """Derniers prompts traités, un par slot (le plus ancien est remplacé)"""
+
+    # Comme llama.cpp : un slot n'est repris que si au moins cette part de son prompt est commune
+    SIMILARITY = 0.5
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.prompts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup_and_store(self, text):
+        """Nombre de caractères de ``text`` déjà en cache, puis mémorise ``text``"""
+        with self.lock:
+            best_key, best = None, 0
+            for key in self.prompts:
+                length = common_prefix_length(key, text)
+                if length > best and length >= self.SIMILARITY * len(key):
+                    best_key, best = key, length
+            if best_key is not None:
+                # Le slot réutilisé contient désormais le nouveau prompt
+                del self.prompts[best_key]
+            elif len(self.prompts) >= self.slots:
+                self.prompts.popitem(last=False)
+            self.prompts[text] = None
+            return best
+
+
+def make_handler(args, cache):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_):
+            pass
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            text = render_chat(payload["messages"])
+            cached_chars = cache.lookup_and_store(text) if args.slots else 0
+            prompt_tokens = round(len(text) / args.chars_per_token)
+            cached_tokens = min(prompt_tokens, int(cached_chars / args.chars_per_token))
+            time.sleep(args.latency_ms / 1000.0 + (prompt_tokens - cached_tokens) * args.prefill_ms / 1000.0)
+
+            tokens = answer_tokens(min(args.completion_tokens, payload.get("max_tokens") or args.completion_tokens))
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            }
+            if payload.get("stream"):
+                self._stream(tokens, usage)
+            else:
+                if args.tokens_per_second:
+                    time.sleep(len(tokens) / args.tokens_per_second)
+                self._json({
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}}],
+                    "usage": usage,
+                })
+
+        def _json(self, data):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self, tokens, usage):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            delay = 1.0 / args.tokens_per_second if args.tokens_per_second else 0.0
+            for token in tokens:
+                if delay:
+                    time.sleep(delay)
+                chunk = {"choices": [{"index": 0, "delta": {"content": token}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # beaucoup de clients simultanés dans les benchmarks
+
+
+def serve(args):
+    """Démarre le serveur dans un thread et le renvoie (server.shutdown() pour l'arrêter)"""
+    server = StubServer((args.host, args.port), make_handler(args, PrefixCache(args.slots)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Délai fixe (ms) avant le prefill")
+    parser.add_argument("--prefill-ms", type=float, default=0.5, help="Coût (ms) d'un token de prompt hors cache")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Vitesse de génération (0 = instantané)")
+    parser.add_argument("--completion-tokens", type=int, default=64, help="Longueur des réponses (tokens)")
+    parser.add_argument("--chars-per-token", type=float, default=3.5)
+    parser.add_argument("--slots", type=int, default=4, help="Prompts gardés en cache (0 = pas de cache)")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    server = serve(args)
+    print(f"🧪 Faux LM Studio sur http://{args.host}:{server.server_port}/v1 (Ctrl+C pour arrêter)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
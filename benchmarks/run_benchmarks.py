@@ -0,0 +1,293 @@
+"""
+Suite de benchmarks hors ligne (LM Studio remplacé par benchmarks/lmstudio_stub.py)
+
+Pour data/vgsales.csv et des copies synthétiques (10x, 100x), mesure :
+- lecture du CSV (pandas par défaut, chargeur typé, cache binaire) et mémoire
+  du DataFrame, construction des documents et des agrégats ;
+- débit d'encodage des embeddings ;
+- construction de l'index à froid (RAGChatbot, par étape) et rechargement à chaud ;
+- recherche (embedding de la question + récupération) : p50 / p99 ;
+- RAGChatbot.ask de bout en bout contre le faux serveur : p50 / p99.
+
+Les résultats sont écrits en JSON (un fichier par commit) pour comparer les
+commits entre eux avec --compare.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.run_benchmarks --scales 1,10,100 --latency-ms 50 --tokens-per-second 40
+    python -m benchmarks.run_benchmarks --scales 1 --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from aggregate_cube import AggregateCube
+import csv_loader
+from benchmarks import lmstudio_stub
+from config.config import RAGChatbotConfig
+from document_renderer import render_game_documents
+
+QUESTION_TEMPLATES = [
+    "Parle-moi du jeu {name}",
+    "Quels sont les meilleurs jeux de {genre} sur {platform} ?",
+    "Quels jeux de {publisher} ont bien marché ?",
+    "Quels jeux sont sortis sur {platform} en {year} ?",
+]
+
+# Métriques comparées par --compare : (clé, plus petit = mieux)
+COMPARED = [
+    ("csv_load_s", True),
+    ("csv_typed_load_s", True),
+    ("csv_cached_load_s", True),
+    ("frame_mb", True),
+    ("documents_s", True),
+    ("aggregates_s", True),
+    ("embedding_docs_per_s", False),
+    ("index_build_s", True),
+    ("warm_start_s", True),
+    ("retrieval_ms.p50", True),
+    ("retrieval_ms.p99", True),
+    ("ask_ms.p50", True),
+    ("ask_ms.p99", True),
+]
+
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], text=True).strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentiles(seconds):
+    values = np.asarray(seconds) * 1000
+    return {
+        "n": len(values),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def synthetic_csv(csv_path, scale, workdir):
+    """Copie du CSV répétée ``scale`` fois (le fichier d'origine pour scale=1)"""
+    if scale == 1:
+        return csv_path
+    path = os.path.join(workdir, f"vgsales_x{scale}.csv")
+    df = pd.read_csv(csv_path)
+    pd.concat([df] * scale, ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def make_questions(df, count):
+    rng = np.random.default_rng(0)
+    rows = df.dropna(subset=['Name', 'Platform', 'Genre', 'Publisher', 'Year'])
+    sample = rows.iloc[rng.choice(len(rows), size=count, replace=len(rows) < count)]
+    return [
+        QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)].format(
+            name=row.Name, genre=row.Genre, platform=row.Platform, publisher=row.Publisher, year=int(row.Year)
+        )
+        for i, row in enumerate(sample.itertuples())
+    ]
+
+
+def stage(results, key, function):
+    """Exécute une étape ; une erreur (ex. modèle d'embeddings absent) est consignée sans arrêter la suite"""
+    try:
+        return function()
+    except Exception as e:
+        results.setdefault("errors", {})[key] = f"{type(e).__name__}: {e}"
+        print(f"  ⚠️  {key} : {type(e).__name__}: {e}")
+        traceback.print_exc(limit=2)
+        return None
+
+
+def bench_dataset(csv_path, scale, args, base_url, workdir):
+    from embedding_backends import create_encoder
+    from rag_chatbot import RAGChatbot
+
+    results = {"scale": scale}
+    print(f"\n=== {scale}x ({csv_path}) ===")
+
+    csv_load_s, default_df = timed(pd.read_csv, csv_path)
+    results.update(rows=len(default_df), csv_load_s=round(csv_load_s, 4),
+                   default_frame_mb=round(default_df.memory_usage(deep=True).sum() / 1e6, 2))
+    del default_df
+    frames = os.path.join(workdir, "frames")
+    results["csv_typed_load_s"] = round(timed(csv_loader.load_frame, csv_path, frames)[0], 4)
+    csv_cached_load_s, df = timed(csv_loader.load_frame, csv_path, frames)
+    results.update(csv_cached_load_s=round(csv_cached_load_s, 4),
+                   frame_mb=round(df.memory_usage(deep=True).sum() / 1e6, 2))
+    results["documents_s"] = round(timed(render_game_documents, df)[0], 4)
+    results["aggregates_s"] = round(timed(AggregateCube.build, df)[0], 4)
+    print(f"  CSV {csv_load_s:.2f}s ({results['default_frame_mb']:.1f} Mo) | typé {results['csv_typed_load_s']:.2f}s | "
+          f"cache {csv_cached_load_s:.3f}s ({results['frame_mb']:.1f} Mo)")
+    print(f"  documents {results['documents_s']:.2f}s | agrégats {results['aggregates_s']:.2f}s")
+
+    config = RAGChatbotConfig(
+        LM_STUDIO_API_BASE=base_url,
+        PERSIST_DIRECTORY=os.path.join(workdir, f"index_x{scale}"),
+        EMBEDDING_CACHE_DIRECTORY=os.path.join(workdir, f"embeddings_x{scale}"),
+        VECTOR_BACKEND=args.vector_backend,
+        EMBEDDING_BACKEND=args.embedding_backend,
+    )
+
+    def embedding_throughput():
+        encoder = create_encoder(config)
+        texts = render_game_documents(df.head(args.embed_docs))[0]
+        encoder.encode(texts[:32])
+        seconds, _ = timed(encoder.encode, texts)
+        results["embedding_docs_per_s"] = round(len(texts) / seconds, 1)
+        print(f"  embeddings {results['embedding_docs_per_s']:.0f} docs/s")
+
+    stage(results, "embedding_docs_per_s", embedding_throughput)
+
+    def index_build():
+        seconds, chatbot = timed(RAGChatbot, csv_path=csv_path, config=config)
+        results["index_build_s"] = round(seconds, 3)
+        results["index_build_phases"] = {phase: round(s, 4) for phase, s in chatbot.timings.items()}
+        seconds, chatbot = timed(RAGChatbot, csv_path=csv_path, config=config)
+        results["warm_start_s"] = round(seconds, 3)
+        results["warm_start_phases"] = {phase: round(s, 4) for phase, s in chatbot.timings.items()}
+        print(f"  index à froid {results['index_build_s']:.2f}s | à chaud {results['warm_start_s']:.2f}s")
+        return chatbot
+
+    chatbot = stage(results, "index_build_s", index_build)
+    if chatbot is None:
+        return results
+
+    questions = make_questions(df, args.questions)
+
+    def retrieval():
+        latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            chatbot._retrieve(question, chatbot._embed_question(question))
+            latencies.append(time.perf_counter() - start)
+        results["retrieval_ms"] = percentiles(latencies)
+        print(f"  recherche p50 {results['retrieval_ms']['p50']:.1f} ms | p99 {results['retrieval_ms']['p99']:.1f} ms")
+
+    stage(results, "retrieval_ms", retrieval)
+
+    def ask():
+        chatbot.answer_cache.invalidate()
+        latencies = []
+        for question in make_questions(df.sample(frac=1.0, random_state=1), args.questions):
+            start = time.perf_counter()
+            chatbot.ask(question)
+            latencies.append(time.perf_counter() - start)
+        results["ask_ms"] = percentiles(latencies)
+        print(f"  ask p50 {results['ask_ms']['p50']:.1f} ms | p99 {results['ask_ms']['p99']:.1f} ms")
+
+    stage(results, "ask_ms", ask)
+    return results
+
+
+def metric(dataset, key):
+    value = dataset
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare(current, previous_path):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\n📈 Comparaison avec {previous.get('commit')} ({previous_path})")
+    before = {d["scale"]: d for d in previous.get("datasets", [])}
+    for dataset in current["datasets"]:
+        old = before.get(dataset["scale"])
+        if old is None:
+            continue
+        print(f"— {dataset['scale']}x")
+        for key, lower_is_better in COMPARED:
+            a, b = metric(old, key), metric(dataset, key)
+            if not a or b is None:
+                continue
+            change = (b - a) / a * 100
+            better = change < 0 if lower_is_better else change > 0
+            print(f"  {key:<22} {a:>10.3f} → {b:>10.3f}  ({change:+.1f}% {'✓' if better else '✗'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/vgsales.csv")
+    parser.add_argument("--scales", default="1,10,100", help="Facteurs de duplication du CSV, séparés par des virgules")
+    parser.add_argument("--questions", type=int, default=50, help="Questions par mesure de latence")
+    parser.add_argument("--embed-docs", type=int, default=2000, help="Documents encodés pour le débit d'embeddings")
+    parser.add_argument("--vector-backend", default=RAGChatbotConfig.VECTOR_BACKEND)
+    parser.add_argument("--embedding-backend", default=RAGChatbotConfig.EMBEDDING_BACKEND)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Faux serveur : délai fixe par requête")
+    parser.add_argument("--prefill-ms", type=float, default=0.2, help="Faux serveur : coût d'un token hors cache")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="Faux serveur : vitesse de génération")
+    parser.add_argument("--completion-tokens", type=int, default=64)
+    parser.add_argument("--output", help="Fichier JSON (défaut : benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Résultats JSON d'un autre commit à comparer")
+    args = parser.parse_args()
+
+    stub_args = lmstudio_stub.build_parser().parse_args([
+        "--port", "0",
+        "--latency-ms", str(args.latency_ms),
+        "--prefill-ms", str(args.prefill_ms),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--completion-tokens", str(args.completion_tokens),
+    ])
+    server = lmstudio_stub.serve(stub_args)
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": dataclasses.asdict(RAGChatbotConfig(
+            VECTOR_BACKEND=args.vector_backend, EMBEDDING_BACKEND=args.embedding_backend
+        )),
+        "stub": {key: getattr(stub_args, key) for key in
+                 ("latency_ms", "prefill_ms", "tokens_per_second", "completion_tokens")},
+        "datasets": [],
+    }
+
+    workdir = tempfile.mkdtemp(prefix="rag_bench_")
+    try:
+        for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+            csv_path = synthetic_csv(args.csv, scale, workdir)
+            report["datasets"].append(bench_dataset(csv_path, scale, args, base_url, workdir))
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join("benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    print(f"\n💾 Résultats : {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
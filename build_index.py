@@ -0,0 +1,55 @@
+"""
+Construit une fois pour toutes l'index du chatbot (base vectorielle, cache
+d'embeddings, agrégats, index lexical) avant de lancer un serveur
+multi-processus dont les workers ne font que le lire.
+
+Avec --sync-rows, la collection ChromaDB d'un document par jeu (CSVProcessor)
+est aussi mise à jour : seules les lignes nouvelles ou modifiées du CSV sont
+encodées, les lignes disparues supprimées (rafraîchissement quotidien de
+l'export des ventes).
+
+Le backend vectoriel est lu dans RAG_VECTOR_BACKEND, comme le fait app.py :
+gunicorn.conf.py impose "numpy", l'index doit donc être construit avec.
+
+Usage (depuis la racine du projet) :
+    RAG_VECTOR_BACKEND=numpy python build_index.py --csv data/vgsales.csv
+    RAG_VECTOR_BACKEND=numpy python build_index.py --csv data/vgsales.csv --sync-rows
+    gunicorn -c gunicorn.conf.py app:app
+"""
+import argparse
+import os
+import time
+
+from config.config import RAGChatbotConfig
+from rag_chatbot import RAGChatbot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/vgsales.csv")
+    parser.add_argument("--sync-rows", action="store_true",
+                        help="Synchroniser aussi la collection ligne par ligne avec le CSV")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    config = RAGChatbotConfig(
+        READ_ONLY_INDEX=False,
+        VECTOR_BACKEND=os.environ.get("RAG_VECTOR_BACKEND", RAGChatbotConfig.VECTOR_BACKEND),
+    )
+    chatbot = RAGChatbot(csv_path=args.csv, config=config)
+    chatbot.embeddings.cache.save()
+
+    print(f"\n✅ Index prêt en {time.perf_counter() - start:.1f}s ({chatbot.config.VECTOR_BACKEND})")
+    for phase, seconds in chatbot.timings.items():
+        print(f"   {phase:<14} {seconds:6.2f}s")
+
+    if args.sync_rows:
+        from csv_processor import CSVProcessor
+
+        processor = CSVProcessor(args.csv, embedding_cache_dir=chatbot.config.EMBEDDING_CACHE_DIRECTORY,
+                                 config=chatbot.config)
+        processor.prepare_for_rag(chatbot.config.PERSIST_DIRECTORY, sync=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+STARTING = "starting"
+READY = "ready"
+FAILED = "failed"
+
+
+class ChatbotService:
+    """Builds the RAGChatbot in a background thread so the web server can bind at once.
+
+    ``rag_chatbot`` (LangChain, torch, sentence-transformers) is only
+    imported by the warm-up thread. Until the chatbot is built, ``chatbot``
+    is None and ``status()`` reports ``starting``; ``timings`` holds the
+    duration in seconds of each startup phase (imports, embeddings model,
+    CSV, aggregates, indexes...).
+    """
+
+    def __init__(self, csv_path: str, config: Any = None):
+        self.csv_path = csv_path
+        self.config = config
+        self.chatbot = None
+        self.state = STARTING
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "ChatbotService":
+        """Start the warm-up (only once)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._warm_up, name="chatbot-warm-up", daemon=True)
+                self._thread.start()
+        return self
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the chatbot is ready (True) or the warm-up failed or timed out (False)"""
+        self._ready.wait(timeout)
+        return self.state == READY
+
+    def status(self) -> Dict[str, Any]:
+        status = {"status": self.state, "timings": {phase: round(seconds, 3) for phase, seconds in self.timings.items()}}
+        if self.error:
+            status["error"] = self.error
+        return status
+
+    def unavailable_message(self) -> str:
+        """Error shown to clients while ``chatbot`` is None"""
+        if self.state == FAILED:
+            return "Le chatbot n'a pas pu démarrer, consultez les journaux du serveur"
+        return "Le chatbot est en cours de démarrage, réessayez dans quelques instants"
+
+    def _warm_up(self) -> None:
+        started = time.perf_counter()
+        try:
+            print("🚀 Initialisation du chatbot...")
+            from rag_chatbot import RAGChatbot
+            self.timings["imports"] = time.perf_counter() - started
+
+            chatbot = RAGChatbot(csv_path=self.csv_path, config=self.config)
+            self.timings.update(chatbot.timings)
+            self.chatbot = chatbot
+            self.state = READY
+            self.timings["total"] = time.perf_counter() - started
+            phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.timings.items())
+            print(f"✅ Chatbot prêt ! ({phases})")
+        except Exception as e:
+            self.state = FAILED
+            self.error = f"{type(e).__name__}: {e}"
+            self.timings["total"] = time.perf_counter() - started
+            print(f"❌ Échec de l'initialisation du chatbot : {self.error}")
+            traceback.print_exc()
+        finally:
+            self._ready.set()
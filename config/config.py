@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 @dataclass
 class RAGChatbotConfig:
@@ -8,13 +9,57 @@ class RAGChatbotConfig:
 
     # Embeddings
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_CACHE_DIRECTORY: str = "./embedding_cache"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    EMBEDDING_BACKEND: str = "torch"  # "torch" (sentence-transformers) or "onnx" (ONNX Runtime, CPU)
+    ONNX_MODEL_DIRECTORY: str = "./onnx_models"
+    ONNX_QUANTIZE: bool = True  # int8 dynamic quantization of the exported model
+    EMBEDDING_THREADS: int = 0  # intra-op threads for either backend, 0 = library default
 
     # Vector DB
     PERSIST_DIRECTORY: str = "./chroma_db"
+    VECTOR_BACKEND: str = "chroma"  # "chroma" or "numpy" (in-process brute-force index)
+    VECTOR_INDEX_DTYPE: str = "float32"  # numpy backend storage: float32, float16 or int8
+    # Serving workers only read the index built beforehand by build_index.py
+    # (no rebuild, embedding cache mapped read-only)
+    READ_ONLY_INDEX: bool = False
 
     # Chunking
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 50
+    # Texts split and embedded together while streaming a dataset into the vector store
+    INGEST_BATCH_SIZE: int = 1000
 
     # Retrieval
     TOP_K_RESULTS: int = 3
+    # Restrict retrieval to the platforms, genres, publishers and years named in the question
+    METADATA_FILTERING: bool = True
+    # RAGChatbot also indexes one document per game (platform, genre, publisher and year in its
+    # metadata) next to the aggregate chunks: without them the filters have almost nothing to select
+    INDEX_GAME_DOCUMENTS: bool = True
+    # Hybrid retrieval: BM25 over Name/Publisher/Platform fused with the vector results
+    LEXICAL_SEARCH: bool = True
+    LEXICAL_TOP_K: int = 5
+    # Micro-batching of concurrent question embeddings and vector searches
+    RETRIEVAL_BATCHING: bool = True
+    RETRIEVAL_BATCH_WAIT_MS: float = 5.0
+    RETRIEVAL_MAX_BATCH: int = 32
+
+    # Context packing (prompt size sent to LM Studio)
+    CONTEXT_TOKEN_BUDGET: int = 2048
+    CONTEXT_TOKENIZER: Optional[str] = None  # Hugging Face tokenizer of the served model, else estimated
+    CONTEXT_CHARS_PER_TOKEN: float = 3.5
+    CONTEXT_MMR_LAMBDA: float = 0.7  # 1.0 = relevance only, lower = more diverse chunks
+    CONTEXT_DUPLICATE_SIMILARITY: float = 0.97
+    # Summary documents sent in the system message of every request, in this order
+    # (stable prompt prefix reused by LM Studio's KV cache instead of being retrieved)
+    STATIC_CONTEXT_TYPES: Tuple[str, ...] = ("summary", "top_games", "regions", "publishers", "genres")
+
+    # Semantic answer cache
+    ANSWER_CACHE_SIZE: int = 256
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    ANSWER_CACHE_MAX_DISTANCE: float = 0.05
+
+    # Analytics fast path (aggregate questions answered with pandas)
+    ANALYTICS_LLM_PHRASING: bool = False
@@ -0,0 +1,179 @@
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class TokenCounter:
+    """Token count of a text with the served model's tokenizer, or a chars-per-token estimate.
+
+    ``tokenizer_name`` is a Hugging Face tokenizer id or path matching the
+    model loaded in LM Studio; when it is not set or cannot be loaded the
+    count is ``ceil(len(text) / chars_per_token)``.
+    """
+
+    def __init__(self, tokenizer_name: Optional[str] = None, chars_per_token: float = 3.5):
+        self.chars_per_token = chars_per_token
+        self.tokenizer = None
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+                self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+            except (ImportError, OSError, ValueError) as e:
+                print(f"⚠️  Tokenizer '{tokenizer_name}' indisponible, estimation à "
+                      f"{chars_per_token} caractères par token ({e})")
+
+    def count(self, text: str) -> int:
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def truncate(self, text: str, budget: int) -> str:
+        """Longest prefix of ``text`` that fits in ``budget`` tokens"""
+        if self.tokenizer is not None:
+            ids = self.tokenizer.encode(text, add_special_tokens=False)
+            return text if len(ids) <= budget else self.tokenizer.decode(ids[:budget])
+        return text[:int(budget * self.chars_per_token)]
+
+
+@dataclass
+class PackedContext:
+    documents: List[Document]
+    text: str
+    tokens: int
+    dropped: int = 0  # duplicates, overlaps and documents over budget
+    candidates: int = 0
+
+
+@dataclass
+class ContextStats:
+    requests: int = 0
+    tokens: int = 0
+    dropped: int = 0
+    max_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, packed: PackedContext) -> None:
+        with self._lock:
+            self.requests += 1
+            self.tokens += packed.tokens
+            self.dropped += packed.dropped
+            self.max_tokens = max(self.max_tokens, packed.tokens)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "mean_tokens": self.tokens / self.requests if self.requests else 0.0,
+            "max_tokens": self.max_tokens,
+            "dropped": self.dropped,
+        }
+
+
+class ContextPacker:
+    """Selects and orders retrieved chunks for the prompt.
+
+    Chunks are taken in maximal-marginal-relevance order (relevance to the
+    question against similarity to what is already selected). A chunk is
+    skipped when it is a near-duplicate of a selected one, when it is
+    contained in one, or when it does not fit in the remaining budget; the
+    text shared with a neighbouring chunk (splitter overlap) is cut out.
+    """
+
+    SEPARATOR = "\n\n"
+
+    def __init__(self, counter: TokenCounter, token_budget: int = 1500, mmr_lambda: float = 0.7,
+                 duplicate_similarity: float = 0.97, min_overlap: int = 40):
+        self.counter = counter
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_similarity = duplicate_similarity
+        self.min_overlap = min_overlap
+        self.stats = ContextStats()
+
+    @staticmethod
+    def _unit(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _strip_overlap(self, text: str, kept: Sequence[str]) -> str:
+        """``text`` without the parts it shares with the start or end of a kept chunk"""
+        n = self.min_overlap
+        for other in kept:
+            if text in other:
+                return ""
+            if len(text) < n or len(other) < n:
+                continue
+            # other ... | text : text starts with the end of other
+            head = text[:n]
+            pos = other.find(head)
+            while pos != -1:
+                if text.startswith(other[pos:]):
+                    text = text[len(other) - pos:]
+                    break
+                pos = other.find(head, pos + 1)
+            # text ... | other : text ends with the start of other
+            if len(text) >= n:
+                tail = other[:n]
+                pos = text.find(tail)
+                while pos != -1:
+                    if other.startswith(text[pos:]):
+                        text = text[:pos]
+                        break
+                    pos = text.find(tail, pos + 1)
+        return text.strip()
+
+    def pack(self, query_embedding: Sequence[float], documents: Sequence[Document],
+             embeddings: Sequence[Sequence[float]]) -> PackedContext:
+        if not documents:
+            packed = PackedContext([], "", 0)
+            self.stats.record(packed)
+            return packed
+
+        vectors = self._unit(np.asarray(embeddings, dtype=np.float32))
+        query = self._unit(np.asarray(query_embedding, dtype=np.float32))
+        relevance = vectors @ query
+        redundancy = np.full(len(documents), -np.inf, dtype=np.float32)  # max similarity to the selection
+
+        remaining = list(range(len(documents)))
+        selected, texts = [], []
+        used = 0
+        dropped = 0
+        separator_tokens = self.counter.count(self.SEPARATOR)
+        while remaining:
+            penalty = np.where(np.isfinite(redundancy[remaining]), redundancy[remaining], 0.0)
+            scores = self.mmr_lambda * relevance[remaining] - (1 - self.mmr_lambda) * penalty
+            best = remaining.pop(int(np.argmax(scores)))
+
+            if redundancy[best] >= self.duplicate_similarity:
+                dropped += 1
+                continue
+            text = self._strip_overlap(documents[best].page_content.strip(), texts)
+            if not text:
+                dropped += 1
+                continue
+
+            tokens = self.counter.count(text) + (separator_tokens if texts else 0)
+            if used + tokens > self.token_budget:
+                if texts:
+                    # A shorter chunk further down may still fit
+                    dropped += 1
+                    continue
+                text = self.counter.truncate(text, self.token_budget)
+                tokens = self.counter.count(text)
+
+            document = documents[best]
+            if text != document.page_content:
+                document = Document(page_content=text, metadata=document.metadata)
+            selected.append(document)
+            texts.append(text)
+            used += tokens
+            redundancy = np.maximum(redundancy, vectors @ vectors[best])
+
+        context = self.SEPARATOR.join(texts)
+        packed = PackedContext(selected, context, self.counter.count(context), dropped, len(documents))
+        self.stats.record(packed)
+        return packed
@@ -0,0 +1,177 @@
+import codecs
+import os
+import shutil
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from index_manifest import file_sha256
+
+# Explicit dtypes of the video game sales columns; other columns keep the inferred ones
+CATEGORICAL_COLUMNS = ['Platform', 'Genre', 'Publisher']
+FLOAT32_COLUMNS = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+SCHEMA: Dict[str, str] = {
+    'Rank': 'int32',
+    **{column: 'category' for column in CATEGORICAL_COLUMNS},
+    **{column: 'float32' for column in FLOAT32_COLUMNS},
+}
+
+# Bump when the schema (and so the cached frames) changes
+SCHEMA_VERSION = 1
+
+SNIFF_BYTES = 1 << 16
+
+
+def sniff_encoding(path: str, sample_size: int = SNIFF_BYTES) -> str:
+    """Encoding of a text file guessed from its first bytes (BOM, then strict UTF-8, then cp1252)."""
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            # Incremental: a multi-byte character cut by the end of the sample is not an error
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=len(sample) < sample_size)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin1"
+
+
+def _fallback_encoding(encoding: str, error: Exception) -> str:
+    """Encoding to read again with after a decoding error past the sniffed prefix: latin1 decodes any byte"""
+    if encoding == "latin1":
+        raise error
+    return "latin1"
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _cache_format() -> str:
+    return "parquet" if _pyarrow_available() else "pickle"
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the known columns to compact dtypes (categories, float32, nullable Int16 year)."""
+    dtypes = {column: dtype for column, dtype in SCHEMA.items()
+              if column in df.columns and df[column].dtype != dtype}
+    if 'Rank' in dtypes and df['Rank'].isna().any():
+        dtypes['Rank'] = 'Int32'
+    df = df.astype(dtypes) if dtypes else df
+    if 'Year' in df.columns and df['Year'].dtype != 'Int16':
+        years = pd.to_numeric(df['Year'], errors='coerce')
+        if ((years.dropna() % 1) == 0).all() and years.dropna().between(-32768, 32767).all():
+            df['Year'] = years.astype('Int16')
+    return df
+
+
+def as_float64(column: pd.Series) -> pd.Series:
+    """float64 values of a column, float32 ones widened through their shortest decimal.
+
+    ``np.float64(np.float32(41.49))`` is 41.4900016784668; going through the
+    text keeps the value written in the CSV (at most 7 significant digits),
+    so sums and renderings match the ones of a float64 frame.
+    """
+    if column.dtype != np.float32:
+        return column.astype(np.float64)
+    # Sales figures repeat a lot: only the distinct values go through the text
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    values = np.asarray(uniques).astype(str).astype(np.float64)
+    return pd.Series(values[codes], index=column.index, name=column.name)
+
+
+def is_compact_number(dtype) -> bool:
+    """float32 or nullable integer: numbers a default ``read_csv`` would have read as float64"""
+    if dtype == np.float32:
+        return True
+    return isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(dtype)
+
+
+def widen_numbers(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame with the compact numeric columns as float64, the dtypes of a default ``read_csv``."""
+    narrow = [column for column in df.columns if is_compact_number(df[column].dtype)]
+    return df.assign(**{column: as_float64(df[column]) for column in narrow}) if narrow else df
+
+
+def read_csv(path: str, encoding: Optional[str] = None) -> pd.DataFrame:
+    """Parse the CSV once (pyarrow engine when available) and apply the schema."""
+    encoding = encoding or sniff_encoding(path)
+    if _pyarrow_available():
+        options = {"engine": "pyarrow"}
+        # pyarrow reports invalid UTF-8 as ArrowInvalid, a ValueError
+        decode_errors = (UnicodeDecodeError, ValueError)
+    else:
+        header = pd.read_csv(path, encoding=encoding, nrows=0).columns
+        options = {"dtype": {column: dtype for column, dtype in SCHEMA.items() if column in header and column != 'Rank'}}
+        decode_errors = (UnicodeDecodeError,)
+    try:
+        df = pd.read_csv(path, encoding=encoding, **options)
+    except decode_errors as e:
+        df = pd.read_csv(path, encoding=_fallback_encoding(encoding, e), **options)
+    return apply_schema(df)
+
+
+def iter_frames(path: str, chunksize: int, usecols: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Typed frames of ``chunksize`` rows (same schema as ``read_csv``), the index running on across chunks.
+
+    ``usecols`` parses only those columns (the ones missing from the file
+    are ignored). Invalid UTF-8 past the sniffed prefix restarts the read in latin1 and
+    skips the chunks already yielded (a newline is the same byte in both).
+    """
+    encoding = sniff_encoding(path)
+    options = {"usecols": lambda column: column in usecols} if usecols is not None else {}
+    yielded = 0
+    while True:
+        try:
+            for number, chunk in enumerate(pd.read_csv(path, encoding=encoding, chunksize=chunksize, **options)):
+                if number >= yielded:
+                    yield apply_schema(chunk)
+                    yielded += 1
+            return
+        except UnicodeDecodeError as e:
+            encoding = _fallback_encoding(encoding, e)
+
+
+def load_frame(path: str, cache_directory: Optional[str] = None, source_sha256: Optional[str] = None,
+               persist: bool = True) -> pd.DataFrame:
+    """Typed frame of a CSV, cached under ``<cache_directory>/<csv hash>`` in a binary columnar file.
+
+    The cache is Parquet when pyarrow is installed, pickle otherwise; a
+    restart reads it instead of parsing the CSV. ``source_sha256`` avoids
+    hashing the file again when the caller already did, ``persist=False``
+    only reads the cache (read-only serving workers).
+    """
+    if cache_directory is None:
+        return read_csv(path)
+
+    source_sha256 = source_sha256 or file_sha256(path)
+    directory = os.path.join(cache_directory, f"{source_sha256}.v{SCHEMA_VERSION}")
+    for name, reader in (("frame.parquet", pd.read_parquet), ("frame.pkl", pd.read_pickle)):
+        cached = os.path.join(directory, name)
+        if os.path.exists(cached):
+            try:
+                return reader(cached)
+            except Exception as e:
+                print(f"⚠️  Cache du CSV illisible ({e}), relecture du fichier")
+
+    df = read_csv(path)
+    if persist:
+        tmp_path = f"{directory}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        if _cache_format() == "parquet":
+            df.to_parquet(os.path.join(tmp_path, "frame.parquet"))
+        else:
+            df.to_pickle(os.path.join(tmp_path, "frame.pkl"))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_path, directory)
+    return df
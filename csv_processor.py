@@ -1,32 +1,66 @@
 import pandas as pd
-import numpy as np
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-import pickle
 import os
+import time
+
+from config.config import RAGChatbotConfig
+from csv_loader import apply_schema, iter_frames, load_frame
+from embedding_backends import create_encoder, embedding_cache_name
+from embedding_cache import EmbeddingCache, shared_query_cache
+from document_renderer import render_synced_documents, stable_row_ids
+from index_manifest import file_sha256
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+from question_filters import QuestionFilterParser
 
 class CSVProcessor:
     """Classe pour traiter et analyser les données CSV"""
     
-    def __init__(self, csv_path: str):
+    EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+    # Nombre de lignes lues, encodées et ajoutées à ChromaDB par lot
+    BATCH_SIZE = 1024
+
+    # Colonnes descriptives : vocabulaire des filtres et index lexical
+    CATALOG_COLUMNS = ['Name', 'Platform', 'Year', 'Genre', 'Publisher']
+    # Lignes lues par lot pour construire le catalogue
+    CATALOG_BATCH_SIZE = 50_000
+
+    def __init__(self, csv_path: str, embedding_cache_dir: str = RAGChatbotConfig.EMBEDDING_CACHE_DIRECTORY,
+                 config: Optional[RAGChatbotConfig] = None):
         """
         Initialise le processeur CSV
         
         Args:
             csv_path: Chemin vers le fichier CSV
+            embedding_cache_dir: Dossier du cache d'embeddings partagé avec le chatbot
+            config: Configuration (backend d'embeddings : torch ou ONNX)
         """
         self.csv_path = csv_path
         self.df = None
         self.model = None
+        self.config = config or RAGChatbotConfig()
+        # Clé du cache et du LRU des questions : propre au backend (vecteurs ONNX/int8 légèrement différents)
+        self.cache_name = embedding_cache_name(self.config, self.EMBEDDING_MODEL)
+        self.embedding_cache = EmbeddingCache(
+            embedding_cache_dir,
+            self.cache_name,
+            max_entries=self.config.EMBEDDING_CACHE_MAX_ENTRIES
+        )
         self.chroma_client = None
         self.collection = None
+        self.lexical_index = None
+        self.filter_parser = None
+        self.catalog = None
         
     def load_data(self) -> pd.DataFrame:
         """Charge les données CSV"""
         try:
-            self.df = pd.read_csv(self.csv_path)
+            # Même lecture typée et même cache que le chatbot
+            self.df = load_frame(self.csv_path, os.path.join(self.config.PERSIST_DIRECTORY, "frames"))
             print(f"✅ Données chargées: {len(self.df)} lignes, {len(self.df.columns)} colonnes")
             print(f"📊 Colonnes: {list(self.df.columns)}")
             
@@ -74,12 +108,12 @@ class CSVProcessor:
         
         # Par plateforme
         print("\n🎮 Ventes par plateforme (top 10):")
-        platform_sales = self.df.groupby('Platform')['Global_Sales'].sum().nlargest(10)
+        platform_sales = self.df.groupby('Platform', observed=True)['Global_Sales'].sum().nlargest(10)
         print(platform_sales.to_string())
         
         # Par genre
         print("\n🎭 Ventes par genre:")
-        genre_sales = self.df.groupby('Genre')['Global_Sales'].sum().sort_values(ascending=False)
+        genre_sales = self.df.groupby('Genre', observed=True)['Global_Sales'].sum().sort_values(ascending=False)
         print(genre_sales.to_string())
         
         # Par année
@@ -87,13 +121,20 @@ class CSVProcessor:
         yearly_sales = self.df.groupby('Year')['Global_Sales'].sum().tail(10)
         print(yearly_sales.to_string())
     
-    def prepare_for_rag(self, persist_directory: str = "./chroma_db"):
-        """Prépare les données pour le RAG avec ChromaDB"""
+    def prepare_for_rag(self, persist_directory: str = "./chroma_db", sync: bool = False):
+        """
+        Prépare les données pour le RAG avec ChromaDB
+
+        Args:
+            persist_directory: Dossier de ChromaDB
+            sync: Synchroniser une collection existante avec le CSV (seules les lignes
+                  nouvelles ou modifiées sont encodées, les lignes disparues supprimées)
+        """
         print("\n🔄 Préparation des données pour RAG...")
         
         # Charger le modèle d'embedding
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.model = create_encoder(self.config, self.EMBEDDING_MODEL)
             print("✅ Modèle d'embedding chargé")
         except:
             print("⚠️  Utilisation d'embeddings simples (fallback)")
@@ -120,61 +161,151 @@ class CSVProcessor:
         # Vérifier si la collection est vide
         if self.collection.count() == 0:
             self._create_embeddings()
+        elif sync:
+            self.sync_with_csv()
+        elif not self._has_stable_ids():
+            # Collection indexée par position de ligne : les ids de l'index lexical ne lui correspondent plus
+            print("⚠️  Collection aux identifiants positionnels : synchronisation avec le CSV")
+            self.sync_with_csv()
         
         print(f"✅ Base vectorielle prête: {self.collection.count()} documents")
-    
-    def _create_embeddings(self):
-        """Crée les embeddings pour les données"""
-        print("  📝 Création des embeddings...")
         
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, row in self.df.iterrows():
-            # Créer un texte riche pour chaque jeu
-            doc_text = f"""
-Jeu: {row['Name']}
-Plateforme: {row['Platform']}
-Année: {row['Year']}
-Genre: {row['Genre']}
-Éditeur: {row['Publisher']}
-Ventes Amérique du Nord: {row['NA_Sales']} millions
-Ventes Europe: {row['EU_Sales']} millions
-Ventes Japon: {row['JP_Sales']} millions
-Ventes autres régions: {row['Other_Sales']} millions
-Ventes mondiales: {row['Global_Sales']} millions
-"""
-            documents.append(doc_text)
-            metadatas.append({
-                'name': str(row['Name']),
-                'platform': str(row['Platform']),
-                'year': int(row['Year']) if not pd.isna(row['Year']) else 0,
-                'genre': str(row['Genre']),
-                'publisher': str(row['Publisher']),
-                'global_sales': float(row['Global_Sales'])
-            })
-            ids.append(str(idx))
-        
-        # Ajouter les documents à ChromaDB
-        if self.model:
-            # Utiliser SentenceTransformer pour les embeddings
-            embeddings = self.model.encode(documents).tolist()
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids,
-                embeddings=embeddings
-            )
-        else:
-            # Sans embedding personnalisé
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
+        # Colonnes descriptives seulement, indexées par les mêmes ids stables que la collection
+        self.catalog = self._load_catalog()
+        self.catalog = self.catalog.set_axis(stable_row_ids(self.catalog))
+        self.filter_parser = QuestionFilterParser(self.catalog)
         
-        print(f"  ✅ {len(documents)} documents ajoutés à la base vectorielle")
+        # Index lexical (noms, éditeurs, plateformes) pour la recherche hybride ;
+        # dossier distinct de celui du chatbot, dont les ids sont les positions des lignes
+        self.lexical_index = LexicalIndex.load_or_build(
+            self.catalog,
+            file_sha256(self.csv_path),
+            os.path.join(persist_directory, "lexical_rows")
+        )
+    
+    def _load_catalog(self) -> pd.DataFrame:
+        """Colonnes descriptives du CSV, relu par lots sans les colonnes de ventes si load_data n'a pas été appelé"""
+        if self.df is not None:
+            return self.df[[c for c in self.CATALOG_COLUMNS if c in self.df.columns]]
+        chunks = iter_frames(self.csv_path, self.CATALOG_BATCH_SIZE, usecols=self.CATALOG_COLUMNS)
+        # Catégories propres à chaque lot : le schéma est réappliqué au cadre assemblé
+        catalog = apply_schema(pd.concat(chunks))
+        return catalog[[c for c in self.CATALOG_COLUMNS if c in catalog.columns]]
+
+    def _iter_row_batches(self, batch_size: int) -> Iterator[pd.DataFrame]:
+        """Lit le CSV par lots de taille fixe sans charger tout le fichier (mêmes types que load_data)"""
+        yield from iter_frames(self.csv_path, batch_size)
+
+    def _iter_document_batches(self, batch_size: int) -> Iterator[Tuple[List[str], List[Dict], List[str]]]:
+        """Transforme chaque lot de lignes en (documents, metadatas, ids stables)"""
+        seen = Counter()
+        for chunk in self._iter_row_batches(batch_size):
+            yield render_synced_documents(chunk, seen)
+
+    def _batch_size(self, batch_size: int) -> int:
+        # ChromaDB refuse les lots au-delà de sa taille maximale
+        max_batch_size = getattr(self.chroma_client, 'max_batch_size', None)
+        return min(batch_size, max_batch_size) if max_batch_size else batch_size
+
+    def _create_embeddings(self, batch_size: int = BATCH_SIZE):
+        """Encode et ajoute toutes les lignes du CSV à une collection vide"""
+        print("  📝 Création des embeddings...")
+        start = time.perf_counter()
+        total = self._write_batches(self._iter_document_batches(self._batch_size(batch_size)), self.collection.add)
+        elapsed = time.perf_counter() - start
+        print(f"  ✅ {total} documents ajoutés à la base vectorielle "
+              f"en {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} lignes/s)")
+
+    def sync_with_csv(self, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """
+        Met la collection à jour d'après le CSV sans tout réindexer : les lignes
+        dont l'id stable est nouveau ou dont le row_hash a changé sont encodées
+        et upsertées, celles qui ont disparu du fichier sont supprimées.
+
+        Returns:
+            Nombre de lignes ajoutées, modifiées, supprimées et inchangées
+        """
+        print("  🔄 Synchronisation de la base vectorielle avec le CSV...")
+        start = time.perf_counter()
+        stored = self._stored_row_hashes()
+        seen = set()
+        counts = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+        def changed_batches():
+            for documents, metadatas, ids in self._iter_document_batches(self._batch_size(batch_size)):
+                seen.update(ids)
+                keep = [i for i, (row_id, metadata) in enumerate(zip(ids, metadatas))
+                        if stored.get(row_id) != metadata['row_hash']]
+                for i in keep:
+                    counts["updated" if ids[i] in stored else "added"] += 1
+                counts["unchanged"] += len(ids) - len(keep)
+                if keep:
+                    yield [documents[i] for i in keep], [metadatas[i] for i in keep], [ids[i] for i in keep]
+
+        self._write_batches(changed_batches(), self.collection.upsert)
+
+        vanished = [row_id for row_id in stored if row_id not in seen]
+        step = self._batch_size(self.BATCH_SIZE)
+        for position in range(0, len(vanished), step):
+            self.collection.delete(ids=vanished[position:position + step])
+        counts["deleted"] = len(vanished)
+
+        elapsed = time.perf_counter() - start
+        print(f"  ✅ Synchronisation en {elapsed:.1f}s : {counts['added']} ajoutées, {counts['updated']} modifiées, "
+              f"{counts['deleted']} supprimées, {counts['unchanged']} inchangées")
+        return counts
+
+    def _stored_row_hashes(self) -> Dict[str, Optional[str]]:
+        """id -> row_hash de chaque document de la collection (None pour les anciens documents)"""
+        stored = {}
+        step = self._batch_size(self.BATCH_SIZE)
+        while True:
+            page = self.collection.get(include=['metadatas'], limit=step, offset=len(stored))
+            if not page['ids']:
+                return stored
+            for row_id, metadata in zip(page['ids'], page['metadatas']):
+                stored[row_id] = (metadata or {}).get('row_hash')
+
+    def _has_stable_ids(self) -> bool:
+        sample = self.collection.get(limit=1, include=['metadatas'])
+        return bool(sample['metadatas']) and 'row_hash' in (sample['metadatas'][0] or {})
+
+    def _write_batches(self, batches: Iterator[Tuple[List[str], List[Dict], List[str]]], write) -> int:
+        """
+        Encode et écrit les lots (add ou upsert) : le lot suivant est encodé pendant
+        que le précédent est écrit dans ChromaDB, la mémoire reste bornée à ~2 lots.
+        """
+        total = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending = None
+            for documents, metadatas, ids in batches:
+                if self.model:
+                    # Encoder avec le modèle d'embeddings (SentenceTransformer ou ONNX) : seuls les textes absents du cache sont encodés
+                    embeddings = self.embedding_cache.embed(documents, self.model.encode, persist=False).tolist()
+                else:
+                    # Sans embedding personnalisé
+                    embeddings = None
+
+                # Attendre l'écriture du lot précédent avant d'en lancer une nouvelle
+                if pending is not None:
+                    pending.result()
+                pending = writer.submit(
+                    write,
+                    documents=documents,
+                    metadatas=metadatas,
+                    ids=ids,
+                    embeddings=embeddings
+                )
+
+                total += len(ids)
+                elapsed = time.perf_counter() - start
+                print(f"  ⏳ {total} lignes indexées ({total / elapsed:.0f} lignes/s)", end="\r")
+
+            if pending is not None:
+                pending.result()
+        self.embedding_cache.save()
+        return total
     
     def search_similar(self, query: str, n_results: int = 5) -> List[Dict]:
         """Recherche des jeux similaires à la requête"""
@@ -183,13 +314,30 @@ Ventes mondiales: {row['Global_Sales']} millions
             return []
         
         try:
+            exact = self.lexical_index.exact_matches(query) if self.lexical_index else []
+            if exact:
+                # Titre cité tel quel : ses lignes suffisent, sans calcul d'embedding
+                return self._fetch_rows(exact[:n_results])
+            
+            # Plateforme, genre, éditeur ou années cités : recherche limitée à ces jeux
+            filters = self.filter_parser.parse(query) if self.filter_parser else {}
+            
             if self.model:
-                # Avec embedding personnalisé
-                query_embedding = self.model.encode([query]).tolist()[0]
+                # Avec embedding personnalisé (LRU partagé avec le retriever du chatbot)
+                query_embedding = shared_query_cache().embed(
+                    self.cache_name, query, lambda text: self.model.encode([text])[0]
+                ).tolist()
+                where = QuestionFilterParser.to_where(filters)
                 results = self.collection.query(
                     query_embeddings=[query_embedding],
-                    n_results=n_results
+                    n_results=n_results,
+                    where=where
                 )
+                if where and not results['ids'][0]:
+                    results = self.collection.query(
+                        query_embeddings=[query_embedding],
+                        n_results=n_results
+                    )
             else:
                 # Recherche textuelle simple
                 results = self.collection.query(
@@ -202,12 +350,42 @@ Ventes mondiales: {row['Global_Sales']} millions
             if results['documents']:
                 for i in range(len(results['documents'][0])):
                     formatted_results.append({
+                        'id': results['ids'][0][i],
                         'document': results['documents'][0][i],
                         'metadata': results['metadatas'][0][i],
                         'distance': results['distances'][0][i] if results['distances'] else None
                     })
             
+            if self.lexical_index:
+                formatted_results = self._fuse_lexical(query, formatted_results, n_results, filters)
+            
             return formatted_results
         except Exception as e:
             print(f"❌ Erreur lors de la recherche: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def _fuse_lexical(self, query: str, vector_results: List[Dict], n_results: int,
+                      filters: Dict[str, Any]) -> List[Dict]:
+        """Fusionne les résultats vectoriels et BM25 (reciprocal rank fusion)"""
+        allowed = self.filter_parser.mask(self.catalog, filters) if filters else None
+        lexical_ids = [row_id for row_id, _ in self.lexical_index.search(query, n_results, allowed=allowed)]
+        if not lexical_ids:
+            return vector_results
+        fused = reciprocal_rank_fusion([[result['id'] for result in vector_results], lexical_ids])
+        ids = [row_id for row_id, _ in fused[:n_results]]
+        
+        by_id = {result['id']: result for result in vector_results}
+        missing = [row_id for row_id in ids if row_id not in by_id]
+        by_id.update((result['id'], result) for result in self._fetch_rows(missing))
+        return [by_id[row_id] for row_id in ids if row_id in by_id]
+
+    def _fetch_rows(self, ids: List[str]) -> List[Dict]:
+        """Documents de la collection par identifiant, dans l'ordre demandé"""
+        if not ids:
+            return []
+        fetched = self.collection.get(ids=ids, include=['documents', 'metadatas'])
+        by_id = {
+            row_id: {'id': row_id, 'document': document, 'metadata': metadata, 'distance': None}
+            for row_id, document, metadata in zip(fetched['ids'], fetched['documents'], fetched['metadatas'])
+        }
+        return [by_id[row_id] for row_id in ids if row_id in by_id]
@@ -1,9 +1,17 @@
 import json
+import os
 import pandas as pd
-from typing import List
+from typing import Iterator, List
+
+# Characters read at a time by the streaming loaders
+READ_BLOCK_SIZE = 1 << 16
 
 class DataLoader:
-    """Load CSV / JSON / TXT datasets"""
+    """Load CSV / JSON / TXT datasets
+
+    ``load_*`` return every text at once; ``iter_*`` yield them one by one
+    while reading the file in bounded pieces (datasets larger than memory).
+    """
 
     @staticmethod
     def load_csv(path: str, text_column: str | None = None) -> List[str]:
@@ -30,3 +38,108 @@ class DataLoader:
             return [json.dumps(item) for item in data]
 
         return [json.dumps(data)]
+
+    @staticmethod
+    def iter_csv(path: str, text_column: str | None = None, chunksize: int = 10_000) -> Iterator[str]:
+        """Rows read ``chunksize`` at a time.
+
+        Cells are kept as written in the file (empty when missing): types
+        inferred chunk by chunk would render the same column differently
+        from one chunk to the next.
+        """
+        reader = pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False)
+        for chunk in reader:
+            if text_column and text_column in chunk.columns:
+                yield from (text for text in chunk[text_column] if text)
+            else:
+                yield from chunk.agg(" ".join, axis=1)
+
+    @staticmethod
+    def iter_jsonl(path: str, text_field: str | None = None) -> Iterator[str]:
+        """One text per non-empty line"""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield DataLoader._json_text(json.loads(line), text_field)
+
+    @staticmethod
+    def iter_json(path: str, text_field: str | None = None) -> Iterator[str]:
+        """Items of a top-level JSON array, decoded one at a time from a bounded buffer"""
+        decoder = json.JSONDecoder()
+        with open(path, "r", encoding="utf-8") as f:
+            buffer = f.read(READ_BLOCK_SIZE).lstrip()
+            if not buffer.startswith("["):
+                # Single object: same result as load_json
+                yield json.dumps(json.loads(buffer + f.read()))
+                return
+
+            position, eof = 1, False
+            while True:
+                # Skip the separators before the next item
+                while True:
+                    while position < len(buffer) and buffer[position] in " \t\r\n,":
+                        position += 1
+                    if position < len(buffer) or eof:
+                        break
+                    block = f.read(READ_BLOCK_SIZE)
+                    eof = not block
+                    buffer, position = buffer[position:] + block, 0
+                if position >= len(buffer):
+                    raise ValueError(f"Tableau JSON non terminé : {path}")
+                if buffer[position] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                    # Complete once the separator after it is read: a number cut by the end of
+                    # the buffer still decodes ("1." of "1.5", "2" of "22")
+                    after = end
+                    while after < len(buffer) and buffer[after] in " \t\r\n":
+                        after += 1
+                    complete = after < len(buffer) and buffer[after] in ",]"
+                    if eof and not complete:
+                        raise ValueError(f"Tableau JSON invalide ou non terminé : {path}")
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    complete = False
+                if not complete:
+                    block = f.read(READ_BLOCK_SIZE)
+                    eof = not block
+                    buffer, position = buffer[position:] + block, 0
+                    continue
+                yield DataLoader._json_text(item, text_field)
+                position = end
+
+    @staticmethod
+    def iter_txt(path: str, window_size: int = 100_000) -> Iterator[str]:
+        """Windows of about ``window_size`` characters, cut after a line break when there is one"""
+        with open(path, "r", encoding="utf-8") as f:
+            pending = ""
+            while True:
+                block = f.read(window_size - len(pending))
+                if not block:
+                    if pending:
+                        yield pending
+                    return
+                pending += block
+                cut = pending.rfind("\n") + 1 or len(pending)
+                window, pending = pending[:cut], pending[cut:]
+                yield window
+
+    @staticmethod
+    def iter_file(path: str, text_field: str | None = None) -> Iterator[str]:
+        """Streaming loader chosen from the extension (.csv, .json, .jsonl, anything else as text)"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            return DataLoader.iter_csv(path, text_field)
+        if extension == ".json":
+            return DataLoader.iter_json(path, text_field)
+        if extension in (".jsonl", ".ndjson"):
+            return DataLoader.iter_jsonl(path, text_field)
+        return DataLoader.iter_txt(path)
+
+    @staticmethod
+    def _json_text(item, text_field: str | None) -> str:
+        if text_field:
+            return str(item.get(text_field, ""))
+        return json.dumps(item)
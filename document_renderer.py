@@ -0,0 +1,112 @@
+import hashlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csv_loader import as_float64, is_compact_number
+
+# (template, column) pairs of the per-game document, in display order
+GAME_TEMPLATE = [
+    ("\nJeu: {}", 'Name'),
+    ("\nPlateforme: {}", 'Platform'),
+    ("\nAnnée: {}", 'Year'),
+    ("\nGenre: {}", 'Genre'),
+    ("\nÉditeur: {}", 'Publisher'),
+    ("\nVentes Amérique du Nord: {} millions", 'NA_Sales'),
+    ("\nVentes Europe: {} millions", 'EU_Sales'),
+    ("\nVentes Japon: {} millions", 'JP_Sales'),
+    ("\nVentes autres régions: {} millions", 'Other_Sales'),
+    ("\nVentes mondiales: {} millions\n", 'Global_Sales'),
+]
+
+# Columns identifying a game across exports of the CSV (the Rank and row order change)
+ROW_KEY_COLUMNS = ['Name', 'Platform', 'Year']
+
+
+def format_column(column: pd.Series, template: str = "{}") -> np.ndarray:
+    """Vectorized ``template.format(value)`` for every cell.
+
+    Only the distinct values are formatted (platforms, genres, years and
+    sales figures repeat a lot), then spread back with the factorize codes.
+    NaN is formatted like an f-string would ('nan'). Typed frames (float32
+    sales, nullable Int16 year) render like the float64 frame the documents
+    were first indexed from.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    uniques = pd.Series(uniques)
+    if is_compact_number(uniques.dtype):
+        uniques = as_float64(uniques)
+    labels = np.array([template.format(value) for value in uniques.tolist()], dtype=object)
+    return labels[codes]
+
+
+def as_text(column: pd.Series) -> pd.Series:
+    """Vectorized equivalent of f"{value}" for every cell (NaN -> 'nan')."""
+    return pd.Series(format_column(column), index=column.index, dtype=object)
+
+
+def render_game_texts(df: pd.DataFrame) -> List[str]:
+    """One rich text per game, identical to the per-row f-string template."""
+    parts = [format_column(df[column], template) for template, column in GAME_TEMPLATE]
+    return list(map("".join, zip(*parts)))
+
+
+def render_game_metadatas(df: pd.DataFrame) -> List[Dict]:
+    """Chroma metadata per game (name, platform, year, genre, publisher, global_sales)."""
+    columns = {
+        'name': format_column(df['Name']).tolist(),
+        'platform': format_column(df['Platform']).tolist(),
+        'year': pd.to_numeric(df['Year'], errors='coerce').fillna(0).to_numpy(dtype=np.int64).tolist(),
+        'genre': format_column(df['Genre']).tolist(),
+        'publisher': format_column(df['Publisher']).tolist(),
+        'global_sales': as_float64(df['Global_Sales']).tolist(),
+    }
+    keys = tuple(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def render_game_documents(df: pd.DataFrame) -> Tuple[List[str], List[Dict], List[str]]:
+    """(documents, metadatas, ids) for a frame of games, ids being the row index."""
+    return render_game_texts(df), render_game_metadatas(df), df.index.astype(str).tolist()
+
+
+def stable_row_ids(df: pd.DataFrame, seen: Optional[Counter] = None) -> List[str]:
+    """sha1 of Name|Platform|Year per row: ids that survive a re-sorted or updated export.
+
+    The n-th repeat of a key in file order gets a '-n' suffix; pass the same
+    ``seen`` counter to the successive chunks of one file.
+    """
+    seen = Counter() if seen is None else seen
+    keys = map("|".join, zip(*(format_column(df[column]) for column in ROW_KEY_COLUMNS if column in df.columns)))
+    ids = []
+    for key in keys:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        seen[digest] += 1
+        ids.append(digest if seen[digest] == 1 else f"{digest}-{seen[digest]}")
+    return ids
+
+
+def render_synced_documents(df: pd.DataFrame, seen: Optional[Counter] = None) -> Tuple[List[str], List[Dict], List[str]]:
+    """(documents, metadatas, ids) with stable ids and a ``row_hash`` of each document in the metadata."""
+    texts = render_game_texts(df)
+    metadatas = render_game_metadatas(df)
+    for text, metadata in zip(texts, metadatas):
+        metadata['row_hash'] = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return texts, metadatas, stable_row_ids(df, seen)
+
+
+def render_bullet_list(labels: pd.Series, values: pd.Series, unit: str = "millions") -> str:
+    """'- label: value unit' lines, one per row."""
+    return "".join(map("".join, zip(
+        format_column(labels, "- {}: "),
+        format_column(values, f"{{}} {unit}\n"),
+    )))
+
+
+def top_rows_by_group(df: pd.DataFrame, group_column: str, value_column: str, n: int) -> Dict[str, pd.DataFrame]:
+    """``n`` largest rows per group in a single sort, instead of one filter + nlargest per group."""
+    ranked = df.sort_values(value_column, ascending=False, kind='stable')
+    top = ranked.groupby(group_column, sort=False, observed=True).head(n)
+    return dict(tuple(top.groupby(group_column, sort=False, observed=True)))
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+from config.config import RAGChatbotConfig
+
+TORCH = "torch"
+ONNX = "onnx"
+
+
+def embedding_cache_name(config: RAGChatbotConfig, model_name: Optional[str] = None) -> str:
+    """Name under which vectors are cached and indexes fingerprinted.
+
+    The ONNX and int8 vectors are close to the torch ones but not identical,
+    so each backend gets its own cache and index.
+    """
+    model_name = model_name or config.EMBEDDING_MODEL
+    if config.EMBEDDING_BACKEND == ONNX:
+        return f"{model_name}-onnx-int8" if config.ONNX_QUANTIZE else f"{model_name}-onnx"
+    return model_name
+
+
+def create_embeddings(config: RAGChatbotConfig, model_name: Optional[str] = None) -> Embeddings:
+    """LangChain embeddings of the configured backend (torch sentence-transformers or ONNX Runtime)"""
+    model_name = model_name or config.EMBEDDING_MODEL
+    if config.EMBEDDING_BACKEND == ONNX:
+        from onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(
+            model_name,
+            config.ONNX_MODEL_DIRECTORY,
+            quantize=config.ONNX_QUANTIZE,
+            intra_op_threads=config.EMBEDDING_THREADS
+        )
+    if config.EMBEDDING_BACKEND != TORCH:
+        raise ValueError(f"EMBEDDING_BACKEND inconnu : {config.EMBEDDING_BACKEND!r} (attendu : 'torch' ou 'onnx')")
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    _set_torch_threads(config)
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def create_encoder(config: RAGChatbotConfig, model_name: Optional[str] = None):
+    """Model with ``encode(texts) -> np.ndarray``: SentenceTransformer or its ONNX counterpart"""
+    model_name = model_name or config.EMBEDDING_MODEL
+    if config.EMBEDDING_BACKEND == ONNX:
+        return create_embeddings(config, model_name)
+
+    from sentence_transformers import SentenceTransformer
+    _set_torch_threads(config)
+    return SentenceTransformer(model_name)
+
+
+def _set_torch_threads(config: RAGChatbotConfig) -> None:
+    if config.EMBEDDING_THREADS:
+        import torch
+        torch.set_num_threads(config.EMBEDDING_THREADS)
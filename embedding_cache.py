@@ -0,0 +1,388 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def _model_slug(model_name: str) -> str:
+    """'sentence-transformers/all-MiniLM-L6-v2' and 'all-MiniLM-L6-v2' share the same cache."""
+    name = model_name.split("/")[-1] if model_name.startswith("sentence-transformers/") else model_name
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+
+class EmbeddingCache:
+    """Disk-backed embedding cache keyed by (model name, text hash).
+
+    Vectors live in a memory-mapped float32 matrix (``vectors.f32``), the
+    key -> slot mapping and last-use clock in ``index.json``. When more than
+    ``max_entries`` texts are cached, the least recently used slots are
+    reused for new texts.
+
+    Several instances may share a directory (RAGChatbot and CSVProcessor,
+    server workers): every new slot or eviction is appended to ``index.log``
+    under an exclusive lock of ``index.lock``, and each instance replays the
+    records of the others before reading or allocating. ``save()`` folds
+    the log back into ``index.json``. Without ``fcntl`` (Windows) there is
+    no cross-process lock and a directory must have a single writer.
+
+    With ``read_only=True`` (pre-forked server workers) the matrix is mapped
+    read-only and shared through the page cache; misses are encoded but
+    never written back.
+    """
+
+    INITIAL_CAPACITY = 1024
+    # Past this size, a persisting store folds the log into index.json
+    MAX_LOG_BYTES = 4 << 20
+
+    def __init__(self, directory: str, model_name: str, max_entries: int = 200_000, read_only: bool = False):
+        self.model_name = model_name
+        self.read_only = read_only
+        self.directory = os.path.join(directory, _model_slug(model_name))
+        self.max_entries = max_entries
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.log_path = os.path.join(self.directory, "index.log")
+        self.lock_path = os.path.join(self.directory, "index.lock")
+        self._lock = threading.Lock()
+
+        self.dim = None
+        self.capacity = 0
+        self.clock = 0
+        self.entries = {}  # key -> [slot, last_used]
+        self._free = []
+        self._vectors = None
+        self._snapshot = None  # identity of the index.json the state was loaded from
+        self._log_offset = 0  # bytes of index.log already replayed
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Cross-process lock of the cache directory (shared to read, exclusive to write)"""
+        handle = None
+        if fcntl is not None:
+            try:
+                if exclusive:
+                    os.makedirs(self.directory, exist_ok=True)
+                handle = open(self.lock_path, "a+b")
+            except OSError:
+                # Missing or read-only directory: nobody writes there
+                handle = None
+        try:
+            if handle is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            if handle is not None:
+                handle.close()
+
+    @staticmethod
+    def _identity(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self) -> None:
+        """Catch up with what other instances wrote (file lock held)."""
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except OSError:
+            log_size = 0
+        snapshot = self._identity(self.index_path)
+        if snapshot != self._snapshot or log_size < self._log_offset:
+            self._load(snapshot)
+        if log_size > self._log_offset:
+            self._replay_log()
+
+    def _load(self, snapshot: Optional[tuple]) -> None:
+        self._snapshot = snapshot
+        self._log_offset = 0
+        self.dim = None
+        self.capacity = 0
+        self.entries = {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            expected_size = index["capacity"] * index["dim"] * 4
+            if os.path.getsize(self.vectors_path) >= expected_size:
+                self.dim = index["dim"]
+                self.capacity = index["capacity"]
+                self.clock = max(self.clock, index["clock"])
+                self.entries = index["entries"]
+        except (OSError, ValueError):
+            pass
+        self._remap()
+
+    def _replay_log(self) -> None:
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Writers append whole lines under the exclusive lock
+        for line in data.splitlines():
+            record = json.loads(line)
+            if record[0] == "+":
+                _, key, slot, used = record
+                self.entries[key] = [slot, used]
+                self.clock = max(self.clock, used)
+            elif record[0] == "-":
+                self.entries.pop(record[1], None)
+            elif record[0] == "capacity":
+                _, self.capacity, self.dim = record
+        self._log_offset += len(data)
+        self._remap()
+
+    def _remap(self) -> None:
+        """Map the matrix at the current capacity and rebuild the free slot list"""
+        self._vectors = None
+        if self.capacity and self.dim:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r" if self.read_only else "r+",
+                                      shape=(self.capacity, self.dim))
+        used = np.zeros(self.capacity, dtype=bool)
+        used[[slot for slot, _ in self.entries.values()]] = True
+        self._free = np.flatnonzero(~used)[::-1].tolist()
+
+    def _append_log(self, records: List[list]) -> None:
+        if not records:
+            return
+        with open(self.log_path, "ab") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records).encode("utf-8"))
+            # The log was replayed up to its end before the store: everything in it is known now
+            self._log_offset = f.tell()
+
+    def save(self) -> None:
+        """Fold the log into the index file; vectors are already in the memory-mapped matrix."""
+        with self._lock, self._file_lock(exclusive=True):
+            if self.read_only:
+                return
+            self._refresh()
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._save_index()
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "clock": self.clock,
+                "entries": self.entries,
+            }, f)
+        os.replace(tmp_path, self.index_path)
+        open(self.log_path, "wb").close()
+        self._snapshot = self._identity(self.index_path)
+        self._log_offset = 0
+
+    def _ensure_capacity(self, needed: int, records: List[list]) -> None:
+        if needed <= self.capacity:
+            return
+        new_capacity = max(self.INITIAL_CAPACITY, self.capacity)
+        while new_capacity < needed:
+            new_capacity *= 2
+        new_capacity = min(new_capacity, self.max_entries)
+
+        os.makedirs(self.directory, exist_ok=True)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self.capacity = new_capacity
+        records.append(["capacity", self.capacity, self.dim])
+        self._remap()
+
+    # ------------------------------------------------------------------ #
+    # Lookup
+    # ------------------------------------------------------------------ #
+    def key(self, text: str) -> str:
+        return hashlib.sha1(f"{_model_slug(self.model_name)}\0{text}".encode("utf-8")).hexdigest()
+
+    def _allocate_slots(self, count: int, records: List[list]) -> List[int]:
+        """Free slots first, then the least recently used ones."""
+        self._ensure_capacity(min(len(self.entries) + count, self.max_entries), records)
+
+        missing = count - len(self._free)
+        if missing > 0:
+            # Evict at least 1/8 of the cache at once so streaming inserts don't sort on every batch
+            evict = min(len(self.entries), max(missing, self.capacity // 8))
+            victims = sorted(self.entries.items(), key=lambda item: item[1][1])[:evict]
+            for victim_key, (slot, _) in victims:
+                del self.entries[victim_key]
+                self._free.append(slot)
+                records.append(["-", victim_key])
+        return [self._free.pop() for _ in range(count)]
+
+    def embed(self, texts: Sequence[str], encode: Callable[[List[str]], np.ndarray],
+              persist: bool = True, store: bool = True) -> np.ndarray:
+        """Return the embeddings of ``texts``, encoding only the ones not cached yet.
+
+        With ``persist=False`` new vectors are not flushed and the log is
+        not folded into the index file until ``save()``, which keeps a long
+        ingestion from rewriting it after every batch. With ``store=False``
+        misses are encoded but not cached, nothing is written to disk.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        keys = [self.key(text) for text in texts]
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            self.clock += 1
+            result = [None] * len(texts)
+            todo = {}  # key -> first position of a text to encode
+            for i, key in enumerate(keys):
+                entry = self.entries.get(key)
+                if entry is not None:
+                    entry[1] = self.clock
+                    result[i] = np.array(self._vectors[entry[0]])
+                elif key not in todo:
+                    todo[key] = i
+
+        if todo:
+            positions = list(todo.values())
+            encoded = np.asarray(encode([texts[i] for i in positions]), dtype=np.float32)
+            if store and not self.read_only:
+                self._store(keys, positions, encoded, persist)
+            for j, i in enumerate(positions):
+                result[i] = encoded[j]
+
+        # Duplicates within the batch reuse the vector of their first occurrence
+        first = {}
+        for i, key in enumerate(keys):
+            if result[i] is None:
+                result[i] = result[first[key]]
+            first.setdefault(key, i)
+        return np.vstack(result)
+
+    def _store(self, keys: List[str], positions: List[int], encoded: np.ndarray, persist: bool) -> None:
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            if self.dim is None:
+                self.dim = encoded.shape[1]
+            # Texts another instance stored meanwhile keep their slot
+            new = [j for j, i in enumerate(positions) if keys[i] not in self.entries]
+            # Never exceed the capacity: only the last texts of a huge batch are kept
+            new = new[-self.max_entries:]
+            records = []
+            slots = self._allocate_slots(len(new), records)
+            for j, slot in zip(new, slots):
+                key = keys[positions[j]]
+                self._vectors[slot] = encoded[j]
+                self.entries[key] = [slot, self.clock]
+                records.append(["+", key, slot, self.clock])
+            self._append_log(records)
+            if persist and self._vectors is not None:
+                self._vectors.flush()
+                if self._log_offset > self.MAX_LOG_BYTES:
+                    self._save_index()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def normalize_query(text: str) -> str:
+    """Case, surrounding punctuation and whitespace runs don't change what is asked."""
+    return re.sub(r"\s+", " ", text.casefold()).strip(" \t\n?!.;:,")
+
+
+class QueryEmbeddingLRU:
+    """Bounded in-memory LRU of query embeddings, keyed by (model, normalized query)."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        key = (_model_slug(model_name), normalize_query(text))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_name: str, text: str, vector: np.ndarray) -> None:
+        key = (_model_slug(model_name), normalize_query(text))
+        with self._lock:
+            self._entries[key] = np.asarray(vector, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def embed(self, model_name: str, text: str, encode: Callable[[str], np.ndarray]) -> np.ndarray:
+        """Embedding of ``text``, running ``encode`` only on a miss."""
+        vector = self.get(model_name, text)
+        if vector is None:
+            vector = np.asarray(encode(text), dtype=np.float32)
+            self.put(model_name, text, vector)
+        return vector
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# One LRU per process, shared by the LangChain retriever and CSVProcessor.search_similar
+_shared_query_cache = QueryEmbeddingLRU()
+
+
+def shared_query_cache() -> QueryEmbeddingLRU:
+    return _shared_query_cache
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain ``Embeddings`` backed by the disk cache (documents) and the shared query LRU"""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache,
+                 query_cache: Optional[QueryEmbeddingLRU] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.query_cache = query_cache or shared_query_cache()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.cache.embed(texts, self._encode).tolist()
+
+    def lookup_documents(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of ``texts`` for a request: cached vectors reused, misses never written to disk"""
+        return self.cache.embed(texts, self._encode, store=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.query_cache.embed(self.cache.model_name, text, self.embeddings.embed_query).tolist()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """``embed_query`` for several questions, the LRU misses encoded in a single call."""
+        model_name = self.cache.model_name
+        vectors = [self.query_cache.get(model_name, text) for text in texts]
+        misses = sorted({text for text, vector in zip(texts, vectors) if vector is None})
+        if misses:
+            encoded = dict(zip(misses, self._encode(misses)))
+            for text in misses:
+                self.query_cache.put(model_name, text, encoded[text])
+            vectors = [encoded[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return [vector.tolist() for vector in vectors]
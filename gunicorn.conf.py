@@ -0,0 +1,65 @@
+"""
+Configuration gunicorn : plusieurs workers pré-forkés qui partagent un index en lecture seule
+
+    RAG_VECTOR_BACKEND=numpy python build_index.py --csv data/vgsales.csv   # une fois, ou après un changement du CSV
+    gunicorn -c gunicorn.conf.py app:app
+
+Le processus maître importe app.py (preload_app), attend que le chatbot soit
+prêt, puis forke les workers : le modèle d'embeddings, le DataFrame et les
+index sont partagés en copy-on-write, les matrices de vecteurs sont des
+fichiers mappés en lecture seule (page cache commun) et aucun worker n'écrit
+dans PERSIST_DIRECTORY. Le backend vectoriel est imposé à "numpy"
+(RAG_VECTOR_BACKEND) : l'index est une matrice mappée partagée par les
+workers, là où un client Chroma ouvert dans le maître serait hérité par
+chaque worker avec son index HNSW.
+
+Chaque worker garde ses propres histogrammes : PROMETHEUS_MULTIPROC_DIR
+(vidé au démarrage) reçoit un fichier par processus et /metrics additionne
+ceux de tous les workers, quel que soit celui qui répond.
+
+(gunicorn ne fonctionne pas sous Windows : y utiliser app.py ou asgi_app.py.)
+"""
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Avant l'import de torch : un seul thread de calcul par worker, pas de pool OpenMP hérité du fork
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+os.environ["RAG_READ_ONLY_INDEX"] = "1"
+os.environ["RAG_VECTOR_BACKEND"] = "numpy"
+
+# Avant l'import de metrics (preload_app) : séries des workers additionnées par /metrics,
+# celles d'un lancement précédent effacées
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "rag_chatbot_metrics"))
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+
+bind = "0.0.0.0:5000"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Threads : les réponses en streaming attendent LM Studio sans bloquer le worker
+worker_class = "gthread"
+threads = 4
+preload_app = True
+timeout = 180
+
+
+def when_ready(server):
+    """Dans le maître, avant le premier fork : le chatbot doit être entièrement chargé"""
+    import app
+
+    if not app.service.wait():
+        server.log.error(f"Chatbot indisponible : {app.service.status()}")
+        raise SystemExit(1)
+    server.log.info(f"Chatbot prêt : {app.service.status()['timings']}")
+    # Les objets déjà chargés ne sont plus parcourus par le GC : leurs pages restent partagées
+    gc.freeze()
+
+
+def worker_exit(server, worker):
+    """Dans le worker qui s'arrête : dernières observations écrites pour /metrics"""
+    import metrics
+
+    metrics.REGISTRY.flush()
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """Hash the raw bytes of a file without loading it entirely in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexManifest:
+    """Manifest stored next to a persisted collection.
+
+    It records everything the stored vectors depend on (source bytes,
+    chunking parameters, embedding model). When the manifest of the current
+    inputs equals the stored one, the collection can be reused as is.
+    """
+
+    def __init__(self, persist_directory: str, collection_name: str):
+        self.path = os.path.join(persist_directory, f"{collection_name}.manifest.json")
+
+    @staticmethod
+    def build(csv_path: str, **params: Any) -> Dict[str, Any]:
+        manifest = {"source_sha256": file_sha256(csv_path)}
+        manifest.update(params)
+        return manifest
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, manifest: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def matches(self, manifest: Dict[str, Any]) -> bool:
+        return self.load() == manifest
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
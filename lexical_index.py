@@ -0,0 +1,225 @@
+import json
+import math
+import os
+import re
+import shutil
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ['Name', 'Publisher', 'Platform']
+
+# Bump when what build() stores changes (tokenize, FIELDS, K1/B, the exact-name rules), so persisted
+# indexes are rebuilt
+INDEX_VERSION = 1
+
+# Game names shorter than this are too ambiguous to be spotted in a question ("Go", "Pac")
+MIN_EXACT_NAME_CHARS = 4
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Double-quoted spans of a question ("Combat", « Combat », “Combat”)
+_QUOTED = re.compile(r'"([^"]+)"|«([^»]+)»|“([^”]+)”')
+
+# One-word game names that are also everyday, genre or sport words ("Combat", "Tennis"):
+# they only count as an exact name when quoted in the question
+COMMON_TITLE_WORDS = frozenset("""
+action adventure again alias alien amnesia apex assault ballistic barbarian baseball black blur bolt
+boxing breach breakdown breakout bridge brink calling carnival cars carve catan chameleon checkers
+chess combat commando contact contrast create crush cube defender descent desire destiny dirt dolphin
+driven driver dungeons epidemic evolve exhibition exit fable fireball folklore fortress fracture
+freeway frequency fuel futurama glacier golf grid halloween haze infected inversion journey july
+kangaroo karate killer lagoon legendary lips mahjong malice moon nostalgia obscure overlord pinball
+pharaoh phoenix polaris prey primal prototype pure rage rampage reactor reloaded rewrite ride risen
+robots rocky rush saint scrabble sneakers snowboarding soccer sorcery speed spray stolen survivor
+swords syndicate there tennis tornado totaled vertigo viewpoint virus volleyball whiteout
+""".split())
+
+# Question words that say nothing about which game is meant (French and English)
+STOPWORDS = frozenset("""
+a au aux avec ce ces combien comment dans de des du en est et il la le les leur meilleur meilleurs
+moyenne ou par plus pour quel quelle quelles quels qui quoi sa se ses son sont sur top un une vendu
+vendus vente ventes jeu jeux total totales globales mondiales
+about an and are best by for from game games how in is it most of on or sales sold the to what which
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free alphanumeric tokens ("Pokémon Rouge/Bleu" -> pokemon, rouge, bleu)"""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return _TOKEN.findall(text.lower())
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Merge several ranked id lists: score(id) = sum of 1 / (k + rank), best first"""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class LexicalIndex:
+    """BM25 over the Name, Publisher and Platform of every game, plus an exact-name table.
+
+    ``search`` scores the question tokens against the inverted index;
+    ``exact_matches`` spots full game names inside the question (longest
+    match first) so that "ventes de Wii Sports au Japon" resolves to the
+    Wii Sports rows without any embedding. Ids are the DataFrame index as
+    strings, the same ids the per-game documents use.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, ids: List[str], lengths: np.ndarray,
+                 postings: Dict[str, Tuple[np.ndarray, np.ndarray]], names: Dict[Tuple[str, ...], List[int]]):
+        self.ids = ids
+        self.lengths = lengths
+        self.postings = postings
+        self.names = names
+        self.average_length = float(lengths.mean()) if len(lengths) else 0.0
+        self.max_name_tokens = max((len(name) for name in names), default=0)
+
+    # ------------------------------------------------------------------ #
+    # Construction
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "LexicalIndex":
+        fields = [c for c in FIELDS if c in df.columns]
+        # Tokenize each distinct value once: platforms and publishers repeat a lot
+        tokenized = {}
+        for column in fields:
+            codes, uniques = pd.factorize(df[column].astype(str))
+            tokens = [tokenize(value) for value in uniques]
+            tokenized[column] = [tokens[code] for code in codes]
+
+        postings = defaultdict(lambda: ([], []))
+        lengths = np.zeros(len(df), dtype=np.float32)
+        names = defaultdict(list)
+        for row in range(len(df)):
+            counts = Counter()
+            for column in fields:
+                counts.update(tokenized[column][row])
+            lengths[row] = sum(counts.values())
+            for token, tf in counts.items():
+                rows, tfs = postings[token]
+                rows.append(row)
+                tfs.append(tf)
+            if 'Name' in tokenized:
+                name = tuple(tokenized['Name'][row])
+                if len(" ".join(name)) >= MIN_EXACT_NAME_CHARS:
+                    names[name].append(row)
+
+        return cls(
+            df.index.astype(str).tolist(),
+            lengths,
+            {token: (np.array(rows, dtype=np.int32), np.array(tfs, dtype=np.float32))
+             for token, (rows, tfs) in postings.items()},
+            dict(names),
+        )
+
+    @classmethod
+    def load_or_build(cls, df: pd.DataFrame, source_hash: str, directory: str) -> "LexicalIndex":
+        path = os.path.join(directory, f"{source_hash[:16]}.v{INDEX_VERSION}.json")
+        index = cls.load(path)
+        if index is not None:
+            print(f"✓ Index lexical chargé ({len(index.postings)} termes)")
+            return index
+
+        index = cls.build(df)
+        os.makedirs(directory, exist_ok=True)
+        index.save(path)
+        # Index of previous versions of the file are stale
+        for name in os.listdir(directory):
+            if name != os.path.basename(path):
+                stale = os.path.join(directory, name)
+                if os.path.isdir(stale):
+                    shutil.rmtree(stale, ignore_errors=True)
+                else:
+                    os.remove(stale)
+        print(f"✓ Index lexical construit et persisté ({len(index.postings)} termes)")
+        return index
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def save(self, path: str) -> None:
+        data = {
+            "ids": self.ids,
+            "lengths": self.lengths.tolist(),
+            "postings": {token: [rows.tolist(), tfs.tolist()] for token, (rows, tfs) in self.postings.items()},
+            "names": [[list(name), rows] for name, rows in self.names.items()],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["LexicalIndex"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls(
+            data["ids"],
+            np.array(data["lengths"], dtype=np.float32),
+            {token: (np.array(rows, dtype=np.int32), np.array(tfs, dtype=np.float32))
+             for token, (rows, tfs) in data["postings"].items()},
+            {tuple(name): rows for name, rows in data["names"]},
+        )
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    def search(self, query: str, k: int = 10, allowed: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """(id, BM25 score) of the ``k`` best games, best first (among the ``allowed`` rows if given)"""
+        tokens = [token for token in set(tokenize(query)) if token in self.postings and token not in STOPWORDS]
+        if not tokens:
+            return []
+        n = len(self.ids)
+        scores = np.zeros(n, dtype=np.float32)
+        norm = self.K1 * (1 - self.B + self.B * self.lengths / self.average_length)
+        for token in tokens:
+            rows, tfs = self.postings[token]
+            idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tfs * (self.K1 + 1) / (tfs + norm[rows])
+
+        if allowed is not None:
+            scores[~allowed] = 0
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            kth = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= kth]
+        # Ties (e.g. a platform alone) keep the file order, i.e. the sales rank in vgsales.csv
+        ordered = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return [(self.ids[row], float(scores[row])) for row in ordered.tolist()]
+
+    def exact_matches(self, query: str) -> List[str]:
+        """Ids of the games whose full name appears in the question (longest names first, no overlap).
+
+        A one-word name made of a common word ("Combat", "Tennis") only
+        matches when quoted, so "les jeux de combat" stays a genre question.
+        """
+        tokens = tokenize(query)
+        quoted = {tuple(tokenize(next(filter(None, span)))) for span in _QUOTED.findall(query)}
+        matches = []
+        start = 0
+        while start < len(tokens):
+            for length in range(min(self.max_name_tokens, len(tokens) - start), 0, -1):
+                name = tuple(tokens[start:start + length])
+                rows = self.names.get(name)
+                if rows and length == 1 and name[0] in COMMON_TITLE_WORDS and name not in quoted:
+                    continue
+                if rows:
+                    matches.extend(self.ids[row] for row in rows)
+                    start += length
+                    break
+            else:
+                start += 1
+        return matches
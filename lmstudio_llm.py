@@ -1,74 +1,424 @@
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
 import json
+import random
+import threading
+import time
 
-class LMStudioLLM:
-    """Wrapper pour utiliser LM Studio comme backend LLM via l'API OpenAI (compatible Python 3.13)"""
-    
-    def __init__(self, base_url="http://localhost:1234/v1", temperature=0.7, max_tokens=2000):
+from metrics import record_llm_usage, record_span, span
+
+
+class LMStudioError(Exception):
+    """Erreur de communication avec LM Studio (le message est affichable tel quel)"""
+
+
+class LMStudioConnectionError(LMStudioError):
+    """Serveur injoignable"""
+
+
+class LMStudioTimeoutError(LMStudioError):
+    """Le modèle n'a pas répondu à temps"""
+
+
+class LMStudioHTTPError(LMStudioError):
+    """Réponse HTTP autre que 200"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LMStudioUnavailableError(LMStudioError):
+    """Circuit ouvert : LM Studio a échoué trop souvent, on échoue immédiatement"""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur : après `failure_threshold` échecs consécutifs, les appels
+    échouent immédiatement pendant `reset_timeout` secondes, puis un seul
+    appel d'essai est autorisé (demi-ouvert) avant de refermer le circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class LMStudioClientBase:
+    """Paramètres, corps de requête et politique de nouvelles tentatives communs aux clients sync et async"""
+
+    HEADERS = {
+        "Content-Type": "application/json"
+    }
+
+    # Fin du flux SSE
+    STREAM_DONE = object()
+
+    def __init__(self, base_url="http://localhost:1234/v1", temperature=0.7, max_tokens=2000,
+                 timeout=120, connect_timeout=5, max_retries=2, backoff_base=0.5, backoff_max=4.0,
+                 pool_size=10, failure_threshold=5, reset_timeout=30.0, breaker=None):
         """
         Initialise le client LM Studio
-        
+
         Args:
             base_url: URL du serveur LM Studio (par défaut: http://localhost:1234/v1)
             temperature: Température pour la génération (0.0 = déterministe, 1.0 = créatif)
             max_tokens: Nombre maximum de tokens à générer
+            timeout: Délai max (s) de lecture de la réponse
+            connect_timeout: Délai max (s) d'établissement de la connexion
+            max_retries: Nouvelles tentatives sur erreur de connexion ou HTTP 5xx
+            backoff_base: Attente de base (s) avant une nouvelle tentative, doublée à chaque essai
+            backoff_max: Attente maximale (s) entre deux tentatives
+            pool_size: Nombre de connexions keep-alive conservées
+            failure_threshold: Échecs consécutifs avant d'ouvrir le circuit
+            reset_timeout: Durée (s) pendant laquelle le circuit reste ouvert
+            breaker: Disjoncteur à partager avec un autre client (sinon un nouveau est créé)
         """
         self.base_url = base_url.rstrip('/')
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.api_endpoint = f"{self.base_url}/chat/completions"
-    
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker(failure_threshold, reset_timeout)
+
+    def _backoff_delay(self, attempt):
+        """Attente exponentielle avec gigue complète avant la tentative n° `attempt`"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            raise LMStudioUnavailableError(
+                f"❌ LM Studio ne répond plus sur {self.base_url} "
+                f"(nouvel essai dans {self.breaker.reset_timeout:.0f}s max)"
+            )
+
+    @classmethod
+    def _parse_sse_line(cls, line):
+        """
+        Texte d'un évènement SSE "data: {...}", None s'il n'en contient pas,
+        STREAM_DONE pour "data: [DONE]", le dict "usage" du dernier évènement
+        """
+        if not line or not line.startswith("data:"):
+            return None
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return cls.STREAM_DONE
+        event = json.loads(data)
+        choices = event.get("choices") or []
+        if not choices:
+            return event.get("usage") or None
+        return choices[0].get("delta", {}).get("content") or None
+
+    @staticmethod
+    def _content(data):
+        try:
+            return data['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError) as e:
+            raise LMStudioError(f"❌ Réponse inattendue de LM Studio : {e}") from e
+
+    @staticmethod
+    def _messages(prompt):
+        """Un texte devient un unique message utilisateur ; une liste de messages est envoyée telle quelle"""
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        return list(prompt)
+
+    def _payload(self, prompt, stream=False):
+        """Corps de la requête /chat/completions"""
+        payload = {
+            "model": "local-model",
+            "messages": self._messages(prompt),
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens
+        }
+        if stream:
+            payload["stream"] = True
+            # Nombre de tokens du prompt et de la réponse dans le dernier évènement
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    @staticmethod
+    def _record_usage(data, seconds):
+        """Tokens du champ "usage" d'une réponse complète (vitesse calculée sur toute la requête)"""
+        usage = (data.get("usage") or {}) if isinstance(data, dict) else {}
+        record_llm_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"), seconds)
+
+    @staticmethod
+    def _record_stream_usage(usage, chunks, first_token_at):
+        """Tokens d'une réponse en flux ; sans "usage", un fragment compte pour un token"""
+        usage = usage or {}
+        seconds = time.perf_counter() - first_token_at if first_token_at else 0.0
+        record_llm_usage(usage.get("prompt_tokens"), usage.get("completion_tokens", chunks), seconds)
+
+    def _connection_error_message(self):
+        return f"❌ Erreur de connexion à LM Studio sur {self.base_url}\n\n💡 Vérifiez que:\n   1. LM Studio est lancé\n   2. Un modèle est chargé\n   3. Le serveur est démarré sur le port 1234"
+
+    @staticmethod
+    def _timeout_message():
+        return "❌ Timeout: Le modèle met trop de temps à répondre. Essayez avec un prompt plus court."
+
+
+class LMStudioLLM(LMStudioClientBase):
+    """Wrapper pour utiliser LM Studio comme backend LLM via l'API OpenAI (compatible Python 3.13)"""
+
+    def __init__(self, base_url="http://localhost:1234/v1", temperature=0.7, max_tokens=2000, **kwargs):
+        super().__init__(base_url, temperature, max_tokens, **kwargs)
+
+        # Session persistante : les connexions TCP sont réutilisées d'un appel à l'autre
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def __call__(self, prompt):
         """
         Génère une réponse à partir d'un prompt
-        
+
         Args:
-            prompt: Le prompt à envoyer au modèle
-            
+            prompt: Le prompt à envoyer au modèle (texte ou liste de messages {"role", "content"})
+
         Returns:
             str: La réponse générée par le modèle
+
+        Raises:
+            LMStudioError: si LM Studio est injoignable, trop lent ou répond en erreur
         """
-        try:
-            # Préparer la requête
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": "local-model",
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens
-            }
-            
-            # Envoyer la requête
-            response = requests.post(
-                self.api_endpoint,
-                headers=headers,
-                json=payload,
-                timeout=120  # 2 minutes timeout
-            )
-            
-            # Vérifier la réponse
-            if response.status_code == 200:
+        start = time.perf_counter()
+        with span("llm_generate"):
+            response = self._post(self._payload(prompt))
+            try:
                 data = response.json()
-                return data['choices'][0]['message']['content']
-            else:
-                return f"Erreur HTTP {response.status_code}: {response.text}"
-            
-        except requests.exceptions.ConnectionError:
-            return f"❌ Erreur de connexion à LM Studio sur {self.base_url}\n\n💡 Vérifiez que:\n   1. LM Studio est lancé\n   2. Un modèle est chargé\n   3. Le serveur est démarré sur le port 1234"
-        
-        except requests.exceptions.Timeout:
-            return "❌ Timeout: Le modèle met trop de temps à répondre. Essayez avec un prompt plus court."
-        
-        except Exception as e:
-            return f"❌ Erreur: {str(e)}"
-    
+            except ValueError as e:
+                raise LMStudioError(f"❌ Réponse inattendue de LM Studio : {e}") from e
+            content = self._content(data)
+        self._record_usage(data, time.perf_counter() - start)
+        return content
+
+    def stream(self, prompt):
+        """
+        Génère une réponse token par token (API OpenAI avec "stream": true, réponses SSE)
+
+        Args:
+            prompt: Le prompt à envoyer au modèle (texte ou liste de messages {"role", "content"})
+
+        Yields:
+            str: Les fragments de texte au fur et à mesure de la génération
+
+        Raises:
+            LMStudioError: si LM Studio est injoignable, trop lent ou répond en erreur
+        """
+        start = time.perf_counter()
+        first_token_at, chunks, usage = None, 0, None
+        with span("llm_generate"), self._post(self._payload(prompt, stream=True), stream=True) as response:
+            response.encoding = "utf-8"
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    token = self._parse_sse_line(line)
+                    if token is self.STREAM_DONE:
+                        break
+                    if isinstance(token, dict):
+                        usage = token
+                    elif token:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            record_span("llm_first_token", first_token_at - start)
+                        chunks += 1
+                        yield token
+            except requests.exceptions.ConnectionError as e:
+                self.breaker.record_failure()
+                raise LMStudioConnectionError(self._connection_error_message()) from e
+            except requests.exceptions.Timeout as e:
+                raise LMStudioTimeoutError(self._timeout_message()) from e
+        self._record_stream_usage(usage, chunks, first_token_at)
+
+    def _post(self, payload, stream=False):
+        """
+        POST vers /chat/completions avec nouvelles tentatives (erreurs de connexion
+        et HTTP 5xx, attente exponentielle avec gigue) et disjoncteur
+        """
+        self._check_circuit()
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self._backoff_delay(attempt))
+            try:
+                response = self.session.post(self.api_endpoint, json=payload, stream=stream,
+                                             timeout=(self.connect_timeout, self.timeout))
+            except requests.exceptions.ConnectionError as e:
+                error = LMStudioConnectionError(self._connection_error_message())
+                error.__cause__ = e
+                continue
+            except requests.exceptions.Timeout as e:
+                # Une génération trop lente ne sera pas plus rapide au second essai
+                self.breaker.record_failure()
+                raise LMStudioTimeoutError(self._timeout_message()) from e
+
+            if response.status_code == 200:
+                self.breaker.record_success()
+                return response
+
+            error = LMStudioHTTPError(response.status_code, f"Erreur HTTP {response.status_code}: {response.text}")
+            response.close()
+            if response.status_code < 500:
+                # Le serveur fonctionne, c'est la requête qui est refusée : inutile de réessayer
+                self.breaker.record_success()
+                raise error
+
+        self.breaker.record_failure()
+        raise error
+
     def generate(self, prompt, **kwargs):
         """
         Méthode alternative pour la génération (compatible avec certaines interfaces LangChain)
         """
-        return self.__call__(prompt)
\ No newline at end of file
+        return self.__call__(prompt)
+
+
+class AsyncLMStudioLLM(LMStudioClientBase):
+    """
+    Variante asynchrone (httpx) : l'attente de LM Studio n'occupe aucun thread,
+    des centaines de requêtes peuvent être en cours dans une seule boucle asyncio
+    """
+
+    def __init__(self, base_url="http://localhost:1234/v1", temperature=0.7, max_tokens=2000, **kwargs):
+        super().__init__(base_url, temperature, max_tokens, **kwargs)
+        import httpx
+
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(
+            headers=self.HEADERS,
+            # pool=None : les requêtes en surnombre attendent une connexion libre au lieu d'échouer
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout, pool=None),
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+        )
+
+    async def __call__(self, prompt):
+        """
+        Génère une réponse à partir d'un prompt
+
+        Raises:
+            LMStudioError: si LM Studio est injoignable, trop lent ou répond en erreur
+        """
+        start = time.perf_counter()
+        with span("llm_generate"):
+            response = await self._post(self._payload(prompt))
+            try:
+                data = response.json()
+            except ValueError as e:
+                raise LMStudioError(f"❌ Réponse inattendue de LM Studio : {e}") from e
+            content = self._content(data)
+        self._record_usage(data, time.perf_counter() - start)
+        return content
+
+    async def stream(self, prompt):
+        """Génère une réponse token par token (async generator)"""
+        start = time.perf_counter()
+        first_token_at, chunks, usage = None, 0, None
+        with span("llm_generate"):
+            response = await self._post(self._payload(prompt, stream=True), stream=True)
+            try:
+                async for line in response.aiter_lines():
+                    token = self._parse_sse_line(line)
+                    if token is self.STREAM_DONE:
+                        break
+                    if isinstance(token, dict):
+                        usage = token
+                    elif token:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            record_span("llm_first_token", first_token_at - start)
+                        chunks += 1
+                        yield token
+            except self._httpx.TimeoutException as e:
+                raise LMStudioTimeoutError(self._timeout_message()) from e
+            except self._httpx.TransportError as e:
+                self.breaker.record_failure()
+                raise LMStudioConnectionError(self._connection_error_message()) from e
+            finally:
+                await response.aclose()
+        self._record_stream_usage(usage, chunks, first_token_at)
+
+    async def _post(self, payload, stream=False):
+        """Même politique que LMStudioLLM._post, sans bloquer la boucle d'évènements"""
+        httpx = self._httpx
+        self._check_circuit()
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff_delay(attempt))
+            try:
+                request = self.client.build_request("POST", self.api_endpoint, json=payload)
+                response = await self.client.send(request, stream=stream)
+            except httpx.TimeoutException as e:
+                if not isinstance(e, httpx.ConnectTimeout):
+                    self.breaker.record_failure()
+                    raise LMStudioTimeoutError(self._timeout_message()) from e
+                error = LMStudioConnectionError(self._connection_error_message())
+                error.__cause__ = e
+                continue
+            except httpx.TransportError as e:
+                # Connexion refusée ou coupée par le serveur
+                error = LMStudioConnectionError(self._connection_error_message())
+                error.__cause__ = e
+                continue
+
+            if response.status_code == 200:
+                self.breaker.record_success()
+                return response
+
+            body = (await response.aread()).decode("utf-8", errors="replace")
+            await response.aclose()
+            error = LMStudioHTTPError(response.status_code, f"Erreur HTTP {response.status_code}: {body}")
+            if response.status_code < 500:
+                self.breaker.record_success()
+                raise error
+
+        self.breaker.record_failure()
+        raise error
+
+    async def aclose(self):
+        await self.client.aclose()
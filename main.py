@@ -1,4 +1,5 @@
 from rag_chatbot import RAGChatbot
+import metrics
 import os
 
 def main():
@@ -70,10 +71,12 @@ def main():
             continue
         
         print("\n⏳ Analyse en cours...\n")
-        result = chatbot.ask(question)
+        with metrics.trace() as trace:
+            result = chatbot.ask(question)
         
         print(f"🤖 Assistant : {result['answer']}")
         print(f"\n📊 {len(result['sources'])} sources de données consultées")
+        print(f"⏱️  {trace.summary()}")
         print("\n" + "-" * 70 + "\n")
 
 if __name__ == "__main__":
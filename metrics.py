@@ -0,0 +1,248 @@
+import bisect
+import contextlib
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 400)
+INF_BOUND = 'le="+Inf"'
+
+# Pre-fork servers: each process writes its series to <directory>/<pid>.json and /metrics sums the files
+MULTIPROCESS_DIRECTORY = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+# Seconds between the writes of a process's file (observations are batched in between)
+FLUSH_SECONDS = 1.0
+
+
+class Histogram:
+    """Prometheus histogram (cumulative buckets, _sum and _count) with optional labels"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, on_change: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.on_change = on_change
+        self.reset()
+
+    def reset(self) -> None:
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+        if self.on_change is not None:
+            self.on_change()
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        with self._lock:
+            return {key: ([*counts], total, count) for key, (counts, total, count) in self._series.items()}
+
+    def render(self, series: Optional[Dict[Tuple[str, ...], Tuple[List[int], float, int]]] = None) -> List[str]:
+        """Exposition lines of ``series`` (this process's own by default)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        series = self.snapshot() if series is None else series
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_labels(labels + [le])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(labels + [INF_BOUND])} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: List[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    """Histograms of the process, or of every process sharing ``directory`` (multiprocess mode).
+
+    In multiprocess mode a background thread writes the process's series to
+    ``<directory>/<pid>.json`` at most every ``FLUSH_SECONDS``, a forked
+    child starts from empty series (the parent's stay in the parent's file)
+    and ``render`` sums the files of all processes. Files of exited processes
+    are kept, so the totals never go down; the directory must be emptied
+    before the server starts.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.metrics: List[Histogram] = []
+        self.directory = directory
+        self._reset_flusher()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, on_change=self._changed if self.directory else None, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        if not self.directory:
+            return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+        self.flush()
+        merged = self._read_all()
+        return "\n".join(line for metric in self.metrics
+                         for line in metric.render(merged.get(metric.name, {}))) + "\n"
+
+    # ------------------------------------------------------------------ #
+    # Multiprocess mode
+    # ------------------------------------------------------------------ #
+    def flush(self) -> None:
+        """Write this process's series to its file (atomically: a reader never sees half a file)"""
+        data = {metric.name: [[list(key), counts, total, count]
+                              for key, (counts, total, count) in metric.snapshot().items()]
+                for metric in self.metrics}
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _read_all(self) -> Dict[str, Dict[Tuple[str, ...], Tuple[List[int], float, int]]]:
+        merged: Dict[str, Dict[Tuple[str, ...], Tuple[List[int], float, int]]] = {}
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # removed in the meantime
+            for name, series in data.items():
+                metric_series = merged.setdefault(name, {})
+                for key, counts, total, count in series:
+                    key = tuple(key)
+                    if key in metric_series:
+                        previous_counts, previous_total, previous_count = metric_series[key]
+                        counts = [a + b for a, b in zip(previous_counts, counts)]
+                        total, count = previous_total + total, previous_count + count
+                    metric_series[key] = (counts, total, count)
+        return merged
+
+    def _changed(self) -> None:
+        self._dirty.set()
+        if self._flusher_pid != os.getpid():
+            with self._start_lock:
+                if self._flusher_pid != os.getpid():
+                    threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+                    self._flusher_pid = os.getpid()
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            time.sleep(FLUSH_SECONDS)
+            self._dirty.clear()
+            try:
+                self.flush()
+            except OSError:
+                pass  # next observation retries
+
+    def _reset_flusher(self) -> None:
+        self._dirty = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flusher_pid = None
+
+    def _after_fork(self) -> None:
+        for metric in self.metrics:
+            metric.reset()
+        self._reset_flusher()
+
+
+REGISTRY = Registry(MULTIPROCESS_DIRECTORY)
+STAGE_SECONDS = REGISTRY.histogram(
+    "rag_stage_seconds", "Duration of each stage of answering a question", ["stage"])
+LLM_TOKENS = REGISTRY.histogram(
+    "rag_llm_tokens", "Prompt and completion tokens per LM Studio call", ["kind"], buckets=TOKEN_BUCKETS)
+LLM_TOKENS_PER_SECOND = REGISTRY.histogram(
+    "rag_llm_tokens_per_second", "Completion tokens per second of generation", buckets=RATE_BUCKETS)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Trace:
+    """Spans and token counts of one question, for display (CLI)"""
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self.usage: Dict[str, float] = {}
+
+    def summary(self) -> str:
+        parts = [f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in self.spans]
+        if self.usage:
+            tokens = f"{self.usage.get('prompt_tokens', '?')} → {self.usage.get('completion_tokens', '?')} tokens"
+            if self.usage.get("tokens_per_second"):
+                tokens += f" ({self.usage['tokens_per_second']:.1f} tokens/s)"
+            parts.append(tokens)
+        return " | ".join(parts)
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("rag_trace", default=None)
+
+
+@contextlib.contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block into rag_stage_seconds{stage=...} (and the current trace, if any)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(stage, time.perf_counter() - start)
+
+
+def record_span(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    current = _current_trace.get()
+    if current is not None:
+        current.spans.append((stage, seconds))
+
+
+@contextlib.contextmanager
+def trace() -> Iterator[Trace]:
+    """Collect the spans of the enclosed calls (propagated to asyncio.to_thread and tasks)"""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def record_llm_usage(prompt_tokens: Optional[int], completion_tokens: Optional[int], seconds: float) -> None:
+    """Token counts of an LM Studio call (``usage`` field of the response) and generation speed"""
+    usage = {}
+    if prompt_tokens is not None:
+        LLM_TOKENS.observe(prompt_tokens, kind="prompt")
+        usage["prompt_tokens"] = prompt_tokens
+    if completion_tokens is not None:
+        LLM_TOKENS.observe(completion_tokens, kind="completion")
+        usage["completion_tokens"] = completion_tokens
+        if seconds > 0 and completion_tokens:
+            usage["tokens_per_second"] = completion_tokens / seconds
+            LLM_TOKENS_PER_SECOND.observe(usage["tokens_per_second"])
+    current = _current_trace.get()
+    if current is not None:
+        current.usage.update(usage)
@@ -0,0 +1,118 @@
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import _model_slug
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_int8.onnx"
+
+
+def hub_name(model_name: str) -> str:
+    """'all-MiniLM-L6-v2' -> 'sentence-transformers/all-MiniLM-L6-v2' (name on the Hugging Face hub)"""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence-transformers model (mean pooling + L2 normalization) run with ONNX Runtime on CPU.
+
+    The first use exports the Hugging Face model to ``<directory>/<model>/``
+    (``model.onnx``, plus ``model_int8.onnx`` with dynamic int8 quantization
+    of the weights) together with its tokenizer; later runs only need
+    ``onnxruntime`` and the tokenizer, not torch. ``intra_op_threads=0``
+    lets ONNX Runtime pick the number of threads.
+    """
+
+    def __init__(self, model_name: str, directory: str, quantize: bool = True, intra_op_threads: int = 0,
+                 batch_size: int = 64, max_length: int = 256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.directory = os.path.join(directory, _model_slug(model_name))
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        path = self.export(model_name, self.directory, quantize)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(self.directory)
+
+    @staticmethod
+    def export(model_name: str, directory: str, quantize: bool = True) -> str:
+        """Export (once) the model to ONNX, quantized if requested; returns the path of the model to load"""
+        fp32_path = os.path.join(directory, FP32_FILE)
+        int8_path = os.path.join(directory, INT8_FILE)
+        path = int8_path if quantize else fp32_path
+        if os.path.exists(path):
+            return path
+
+        if not os.path.exists(fp32_path):
+            import torch
+            from transformers import AutoModel, AutoTokenizer
+
+            print(f"⏳ Export ONNX de {model_name}...")
+            os.makedirs(directory, exist_ok=True)
+            tokenizer = AutoTokenizer.from_pretrained(hub_name(model_name))
+            model = AutoModel.from_pretrained(hub_name(model_name)).eval()
+            sample = tokenizer(["exemple de document"], return_tensors="pt")
+            names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+            axes = {name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]}
+            tmp_path = f"{fp32_path}.tmp"
+            with torch.no_grad():
+                torch.onnx.export(model, tuple(sample[name] for name in names), tmp_path,
+                                  input_names=names, output_names=["last_hidden_state"],
+                                  dynamic_axes=axes, opset_version=14)
+            tokenizer.save_pretrained(directory)
+            os.replace(tmp_path, fp32_path)
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print("⏳ Quantification int8 du modèle ONNX...")
+            tmp_path = f"{int8_path}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        print(f"✓ Modèle ONNX prêt : {path}")
+        return path
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Unit vectors of ``texts`` (same interface as ``SentenceTransformer.encode``)"""
+        texts = list(texts)
+        batch_size = batch_size or self.batch_size
+        result = np.zeros((len(texts), 0), dtype=np.float32)
+        # Texts of similar length share a batch: less padding to run through the model
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            positions = order[start:start + batch_size]
+            vectors = self._encode_batch([texts[i] for i in positions])
+            if result.shape[1] == 0:
+                result = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[positions] = vectors
+        return result
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        tokens = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        inputs = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+        if "token_type_ids" in self.input_names and "token_type_ids" not in inputs:
+            inputs["token_type_ids"] = np.zeros_like(inputs["input_ids"])
+        hidden = self.session.run(None, inputs)[0]
+
+        # Mean pooling over the real tokens, then L2 normalization (as the sentence-transformers pipeline)
+        mask = tokens["attention_mask"].astype(np.float32)[:, :, None]
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
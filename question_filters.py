@@ -0,0 +1,211 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Mots-clés (normalisés : minuscules, sans accents) -> colonne
+DIMENSION_WORDS = {
+    'Platform': ["plateforme", "plateformes", "platform", "platforms", "console", "consoles"],
+    'Genre': ["genre", "genres"],
+    'Publisher': ["editeur", "editeurs", "publisher", "publishers", "studio", "studios"],
+    'Year': ["annee", "annees", "year", "years", "an"],
+}
+
+# Noms français des genres du jeu de données (normalisés) -> genre
+GENRE_ALIASES = {
+    "aventure": "Adventure",
+    "combat": "Fighting",
+    "course": "Racing",
+    "courses": "Racing",
+    "tir": "Shooter",
+    "reflexion": "Puzzle",
+    "strategie": "Strategy",
+    "sport": "Sports",
+    "role": "Role-Playing",
+    "rpg": "Role-Playing",
+}
+
+# Colonne du DataFrame -> clé des métadonnées des documents par jeu
+METADATA_KEYS = {
+    'Platform': 'platform',
+    'Genre': 'genre',
+    'Publisher': 'publisher',
+    'Year': 'year',
+}
+
+# Un mot seul ("sony", "konami") ne désigne un éditeur que s'il en a publié au moins autant de jeux :
+# les petits éditeurs portent souvent des noms communs ("Quelle", "Success", "Rain")
+MIN_PUBLISHER_GAMES = 20
+
+# Mots d'éditeurs trop vagues pour désigner un éditeur à eux seuls
+_GENERIC_PUBLISHER_WORDS = {
+    "the", "game", "games", "new", "big", "black", "blue", "red", "white", "green", "digital", "global",
+    "interactive", "entertainment", "media", "studio", "studios", "software", "unknown", "mad", "little",
+    "electronic", "idea", "deep", "nippon", "rising", "focus", "empire", "level", "prototype", "compile",
+    "universal", "system", "aqua", "oxygen", "spike", "crave",
+}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+-]*")
+_YEAR = re.compile(r"\b(19[7-9]\d|20[0-4]\d)\b")
+
+
+def normalize(text: str) -> str:
+    """Minuscules, sans accents ni espaces multiples"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+def tokens_of(text: str) -> List[str]:
+    return _TOKEN.findall(text)
+
+
+class QuestionFilterParser:
+    """
+    Repère dans une question les plateformes, genres, éditeurs et années du
+    jeu de données, à partir des valeurs présentes dans le DataFrame.
+
+    ``parse`` renvoie {'Platform': [...], 'Genre': [...], 'Publisher': [...],
+    'Year': (min, max)} ; ``to_where`` traduit ce dictionnaire en filtre de
+    métadonnées (Chroma ou index NumPy) et ``mask`` en masque de lignes.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.platforms = self._vocabulary(df, 'Platform')
+        self.genres = self._vocabulary(df, 'Genre')
+        genres = set(self.genres.values())
+        self.genres.update({alias: genre for alias, genre in GENRE_ALIASES.items() if genre in genres})
+        self.publishers = self._publisher_phrases(df)
+        self.max_publisher_tokens = max((len(phrase) for phrase in self.publishers), default=0)
+        years = pd.to_numeric(df['Year'], errors='coerce').dropna() if 'Year' in df.columns else pd.Series(dtype=float)
+        self.year_range = (int(years.min()), int(years.max())) if len(years) else (1970, 2049)
+        self.reserved = {word for words in DIMENSION_WORDS.values() for word in words}
+
+    @staticmethod
+    def _vocabulary(df: pd.DataFrame, column: str) -> Dict[str, str]:
+        if column not in df.columns:
+            return {}
+        return {normalize(str(value)): value for value in df[column].dropna().unique()}
+
+    def _publisher_phrases(self, df: pd.DataFrame) -> Dict[Tuple[str, ...], List[str]]:
+        """Nom complet de chaque éditeur, plus son premier mot s'il est distinctif ("sony", "konami")"""
+        if 'Publisher' not in df.columns:
+            return {}
+        games = df['Publisher'].value_counts()
+        phrases = defaultdict(list)
+        for publisher in games.index:
+            words = tuple(tokens_of(normalize(str(publisher))))
+            if not words or words[0] in ("unknown", "n"):
+                continue
+            if len(words) > 1:
+                phrases[words].append(publisher)
+            phrases[words[:1]].append(publisher)
+
+        single_word_games = defaultdict(int)
+        for phrase, publishers in phrases.items():
+            if len(phrase) == 1:
+                single_word_games[phrase] = int(games[publishers].sum())
+        return {
+            phrase: sorted(set(publishers)) for phrase, publishers in phrases.items()
+            if len(phrase) > 1 or (
+                single_word_games[phrase] >= MIN_PUBLISHER_GAMES
+                and phrase[0] not in _GENERIC_PUBLISHER_WORDS
+                and phrase[0] not in self.platforms and phrase[0] not in self.genres
+                and len(phrase[0]) >= 3
+            )
+        }
+
+    # ------------------------------------------------------------------ #
+    # Extraction
+    # ------------------------------------------------------------------ #
+    def parse(self, question: str, skip: Optional[str] = None) -> Dict[str, object]:
+        """Filtres mentionnés dans la question (``skip`` : colonne à ignorer, ex. la dimension groupée)"""
+        text = normalize(question)
+        tokens = tokens_of(text)
+        token_set = set(tokens)
+        filters = {}
+
+        platforms = [value for key, value in self.platforms.items() if key in token_set]
+        if platforms and skip != 'Platform':
+            filters['Platform'] = platforms
+        genres = []
+        for key, value in self.genres.items():
+            if key in token_set and key not in self.reserved and value not in genres:
+                genres.append(value)
+        if genres and skip != 'Genre':
+            filters['Genre'] = genres
+        publishers = self._publishers(tokens)
+        if publishers and skip != 'Publisher':
+            filters['Publisher'] = publishers
+
+        year = self._years(text)
+        if year and skip != 'Year':
+            filters['Year'] = year
+        return filters
+
+    def _publishers(self, tokens: Sequence[str]) -> List[str]:
+        found = []
+        start = 0
+        while start < len(tokens):
+            for length in range(min(self.max_publisher_tokens, len(tokens) - start), 0, -1):
+                values = self.publishers.get(tuple(tokens[start:start + length]))
+                if values:
+                    found.extend(value for value in values if value not in found)
+                    start += length
+                    break
+            else:
+                start += 1
+        return found
+
+    def _years(self, text: str) -> Optional[Tuple[int, int]]:
+        years = [int(y) for y in _YEAR.findall(text)]
+        low, high = self.year_range
+        if len(years) >= 2 and re.search(r"\b(entre|between|de|from)\b", text):
+            return min(years), max(years)
+        if len(years) == 1:
+            year = years[0]
+            if re.search(rf"\b(depuis|apres|since|after)\s+{year}\b", text):
+                return year, high
+            if re.search(rf"\b(avant|before)\s+{year}\b", text):
+                return low, year - 1
+            return year, year
+        return None
+
+    # ------------------------------------------------------------------ #
+    # Traductions
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def to_where(filters: Dict[str, object]) -> Optional[Dict[str, object]]:
+        """Filtre de métadonnées au format Chroma ({'$and': [...]} si plusieurs conditions)"""
+        clauses = []
+        for column, value in filters.items():
+            key = METADATA_KEYS.get(column)
+            if key is None:
+                continue
+            if column == 'Year':
+                low, high = value
+                clauses.append({key: {"$gte": int(low)}})
+                clauses.append({key: {"$lte": int(high)}})
+            else:
+                values = [str(v) for v in value]
+                clauses.append({key: values[0]} if len(values) == 1 else {key: {"$in": values}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    @staticmethod
+    def mask(df: pd.DataFrame, filters: Dict[str, object]) -> np.ndarray:
+        """Lignes de ``df`` qui satisfont tous les filtres (une année manquante ne satisfait aucun filtre)"""
+        keep = np.ones(len(df), dtype=bool)
+        for column, value in filters.items():
+            if column not in df.columns:
+                continue
+            if column == 'Year':
+                low, high = value
+                keep &= df['Year'].between(low, high).to_numpy(dtype=bool, na_value=False)
+            else:
+                keep &= df[column].isin(value).to_numpy(dtype=bool, na_value=False)
+        return keep
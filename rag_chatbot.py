@@ -1,11 +1,27 @@
 from langchain.prompts import PromptTemplate
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
-from lmstudio_llm import LMStudioLLM
+from lmstudio_llm import LMStudioLLM, AsyncLMStudioLLM, LMStudioError
+from index_manifest import IndexManifest
+from embedding_cache import CachedEmbeddings, EmbeddingCache, shared_query_cache
+from embedding_backends import create_embeddings, embedding_cache_name
+from csv_loader import load_frame
+from document_renderer import as_text, render_bullet_list, render_game_documents
+from analytics import AnalyticsRouter
+from aggregate_cube import AggregateCube
+from answer_cache import SemanticAnswerCache
+from retrieval_batcher import RetrievalBatcher
+from vector_index import ChromaVectorIndex, IndexVectorStore, NumpyVectorIndex
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+from context_packer import ContextPacker, TokenCounter
+from metrics import span
+from config.config import RAGChatbotConfig
 import pandas as pd
+import asyncio
+import contextlib
 import os
+import time
 
 class RAGChatbot:
     # Define system prompt as class constant
@@ -24,25 +40,81 @@ RÈGLES STRICTES (OBLIGATOIRES) :
 Réponds toujours en français, de manière claire et concise.
 """
 
-    def __init__(self, csv_path=None):
+    # Reformulation d'un résultat déjà calculé (voie analytique)
+    PHRASING_PROMPT = """Voici le résultat exact, déjà calculé sur l'ensemble des données :
+{result}
+
+Reformule ce résultat en français, clairement et brièvement, pour répondre à la question : {question}
+Ne modifie aucun chiffre et n'ajoute aucune information.
+
+Réponse :"""
+
+    COLLECTION_NAME = "video_games_sales"
+
+    # Découpage des documents (plus grand que la config par défaut pour avoir plus de contexte)
+    CHUNK_SIZE = 1500
+    CHUNK_OVERLAP = 200
+
+    # À incrémenter dès que le texte produit par _create_documents_from_csv change
+    DOCUMENTS_VERSION = 1
+
+    def __init__(self, csv_path=None, config=None):
         print("🔧 Initialisation du chatbot RAG avec LM Studio...")
+        self.config = config or RAGChatbotConfig()
+        # Durée (s) de chaque étape du démarrage
+        self.timings = {}
         
         # Configuration du modèle LM Studio
-        lm_studio_url = "http://localhost:1234/v1"
+        lm_studio_url = self.config.LM_STUDIO_API_BASE
         self.llm = LMStudioLLM(base_url=lm_studio_url, temperature=0.7)
+        self._async_llm = None
         print(f"✓ Connexion à LM Studio : {lm_studio_url}")
         
         # Configuration des embeddings (local)
-        embeddings_model = "sentence-transformers/all-MiniLM-L6-v2"
-        print(f"⏳ Chargement des embeddings : {embeddings_model}")
-        self.embeddings = HuggingFaceEmbeddings(model_name=embeddings_model)
+        embeddings_model = self.config.EMBEDDING_MODEL
+        print(f"⏳ Chargement des embeddings : {embeddings_model} ({self.config.EMBEDDING_BACKEND})")
+        shared_query_cache().max_entries = self.config.QUERY_EMBEDDING_CACHE_SIZE
+        with self._timed("embeddings"):
+            self.embeddings = CachedEmbeddings(
+                create_embeddings(self.config),
+                EmbeddingCache(
+                    self.config.EMBEDDING_CACHE_DIRECTORY,
+                    embedding_cache_name(self.config),
+                    max_entries=self.config.EMBEDDING_CACHE_MAX_ENTRIES,
+                    read_only=self.config.READ_ONLY_INDEX
+                )
+            )
         print("✓ Embeddings chargés")
         
         # Base de données vectorielle
         self.vectorstore = None
+        self.vector_index = None
         self.retriever = None
         self.prompt = None
         self.df = None
+        self.manifest = None
+        self.cube = None
+        self.analytics = None
+        self.lexical_index = None
+        self._row_ids = None
+        self.retrieval_batcher = None
+        self.static_documents = []
+        self.system_message = self.SYSTEM_PROMPT.strip()
+
+        # Cache des réponses (questions proches -> même réponse)
+        self.answer_cache = SemanticAnswerCache(
+            max_entries=self.config.ANSWER_CACHE_SIZE,
+            ttl_seconds=self.config.ANSWER_CACHE_TTL_SECONDS,
+            max_distance=self.config.ANSWER_CACHE_MAX_DISTANCE
+        )
+        
+        # Contexte envoyé au modèle : sans doublons, diversifié et borné en tokens
+        self.context_packer = ContextPacker(
+            TokenCounter(self.config.CONTEXT_TOKENIZER, self.config.CONTEXT_CHARS_PER_TOKEN),
+            token_budget=self.config.CONTEXT_TOKEN_BUDGET,
+            mmr_lambda=self.config.CONTEXT_MMR_LAMBDA,
+            duplicate_similarity=self.config.CONTEXT_DUPLICATE_SIMILARITY
+        )
         
         # Charger le CSV si fourni
         if csv_path:
@@ -55,115 +127,258 @@ Réponds toujours en français, de manière claire et concise.
         if not os.path.exists(csv_path):
             raise FileNotFoundError(f"Le fichier {csv_path} n'existe pas")
 
-        # Essayez plusieurs encodages pour éviter les erreurs Unicode
-        encodings = ["utf-8", "utf-16", "latin1", "cp1252"]
-        for enc in encodings:
-            try:
-                self.df = pd.read_csv(csv_path, encoding=enc)
-                print(f"✓ CSV chargé avec succès (encoding={enc})")
-                break
-            except UnicodeDecodeError:
-                continue
-        else:
-            raise UnicodeDecodeError(f"Impossible de lire le fichier {csv_path} avec les encodages standards.")
+        # Empreinte des données : clé du cache du CSV, des agrégats et manifeste de la base vectorielle
+        with self._timed("manifest"):
+            self.manifest = self._index_manifest(csv_path)
+        if self.config.READ_ONLY_INDEX and not self._index_is_built():
+            # Workers d'un serveur multi-processus : aucun n'écrit dans l'index
+            raise RuntimeError(
+                f"Index absent ou périmé pour {csv_path} en mode lecture seule : "
+                f"lancez d'abord RAG_VECTOR_BACKEND={self.config.VECTOR_BACKEND} python build_index.py --csv {csv_path}"
+            )
 
-        print(f"✓ {len(self.df)} lignes, {len(self.df.columns)} colonnes")
+        # Une seule lecture (encodage détecté sur les premiers octets, types compacts),
+        # puis le DataFrame typé est relu depuis son cache binaire tant que le CSV ne change pas
+        with self._timed("csv"):
+            self.df = load_frame(
+                csv_path,
+                os.path.join(self.config.PERSIST_DIRECTORY, "frames"),
+                source_sha256=self.manifest["source_sha256"],
+                persist=not self.config.READ_ONLY_INDEX
+            )
+
+        memory = self.df.memory_usage(deep=True).sum() / 1e6
+        print(f"✓ {len(self.df)} lignes, {len(self.df.columns)} colonnes ({memory:.1f} Mo en mémoire)")
         print(f"✓ Colonnes : {', '.join(self.df.columns.tolist())}")
 
+        with self._timed("aggregates"):
+            self.cube = AggregateCube.load_or_build(
+                self.df,
+                self.manifest["source_sha256"],
+                os.path.join(self.config.PERSIST_DIRECTORY, "aggregates")
+            )
+            self.analytics = AnalyticsRouter(self.df, self.cube)
+
+        # Index lexical des noms de jeux, éditeurs et plateformes (recherche exacte d'un titre)
+        if self.config.LEXICAL_SEARCH:
+            with self._timed("lexical_index"):
+                self.lexical_index = LexicalIndex.load_or_build(
+                    self.df,
+                    self.manifest["source_sha256"],
+                    os.path.join(self.config.PERSIST_DIRECTORY, "lexical")
+                )
+                self._row_ids = pd.Index(self.df.index.astype(str))
+
+        # Les réponses mises en cache sur d'autres données ne sont plus valables
+        self.answer_cache.invalidate(self.manifest)
+
+        # Créer ou réutiliser la base vectorielle
+        with self._timed("vectorstore"):
+            self.vectorstore = self._build_or_load_vectorstore()
+
+        # Créer la chaîne QA
+        with self._timed("qa_chain"):
+            self._create_qa_chain()
+
+    @contextlib.contextmanager
+    def _timed(self, phase):
+        """Mesure la durée d'une étape du démarrage dans self.timings"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+
+    def _index_manifest(self, csv_path):
+        """Empreinte de tout ce dont dépendent les vecteurs persistés"""
+        return IndexManifest.build(
+            csv_path,
+            collection_name=self.COLLECTION_NAME,
+            chunk_size=self.CHUNK_SIZE,
+            chunk_overlap=self.CHUNK_OVERLAP,
+            embedding_model=embedding_cache_name(self.config),
+            documents_version=self.DOCUMENTS_VERSION,
+            game_documents=self.config.INDEX_GAME_DOCUMENTS,
+        )
+
+    def _index_is_built(self):
+        """L'index persisté correspond-il au manifeste (données, découpage, modèle) ?"""
+        if self.config.VECTOR_BACKEND == "numpy":
+            stored = IndexManifest(os.path.join(self.config.PERSIST_DIRECTORY, "numpy_index"), self.COLLECTION_NAME)
+            return stored.matches(dict(self.manifest, vector_dtype=self.config.VECTOR_INDEX_DTYPE))
+        return IndexManifest(self.config.PERSIST_DIRECTORY, self.COLLECTION_NAME).matches(self.manifest)
+
+    def _build_or_load_vectorstore(self):
+        """Réutiliser l'index persisté si le manifeste correspond, sinon le reconstruire"""
+        if self.config.VECTOR_BACKEND == "numpy":
+            return self._build_or_load_numpy_store()
+        return self._build_or_load_chroma_store()
+
+    def _create_chunks(self):
+        """Documents issus du CSV, découpés en chunks, puis un document par jeu (non découpé)"""
         # Créer des documents textuels à partir du CSV
         documents = self._create_documents_from_csv()
         print(f"✓ {len(documents)} documents créés à partir des données")
 
         # Diviser en chunks plus grands pour avoir plus de contexte
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1500,  # Augmenté de 500 à 1500
-            chunk_overlap=200,  # Augmenté de 50 à 200
+            chunk_size=self.CHUNK_SIZE,
+            chunk_overlap=self.CHUNK_OVERLAP,
             length_function=len
         )
         chunks = text_splitter.split_documents(documents)
         print(f"✓ {len(chunks)} chunks créés")
 
-        # Créer la base vectorielle avec client persistant
-        print("⏳ Création de la base vectorielle...")
+        if self.config.INDEX_GAME_DOCUMENTS:
+            # Métadonnées plateforme / genre / éditeur / année : cibles des filtres de la recherche vectorielle
+            games = self._rows_as_documents(self.df)
+            print(f"✓ {len(games)} documents par jeu")
+            chunks += games
+        return chunks
+
+    def _build_or_load_numpy_store(self):
+        """Index NumPy en mémoire (matrice memmap), persisté sous PERSIST_DIRECTORY/numpy_index"""
+        directory = os.path.join(self.config.PERSIST_DIRECTORY, "numpy_index")
+        index_directory = os.path.join(directory, self.COLLECTION_NAME)
+        manifest = dict(self.manifest, vector_dtype=self.config.VECTOR_INDEX_DTYPE)
+        stored = IndexManifest(directory, self.COLLECTION_NAME)
+
+        if stored.matches(manifest):
+            index = NumpyVectorIndex.load(index_directory)
+            if index is not None and index.count() > 0:
+                print(f"✓ Index vectoriel à jour réutilisé ({index.count()} chunks, aucun embedding recalculé)")
+                self.vector_index = index
+                return IndexVectorStore(index, self.embeddings)
+
+        stored.clear()
+        chunks = self._create_chunks()
+
+        print(f"⏳ Création de l'index vectoriel ({self.config.VECTOR_INDEX_DTYPE})...")
+        vectorstore = IndexVectorStore.from_documents(
+            documents=chunks,
+            embedding=self.embeddings,
+            directory=index_directory,
+            dtype=self.config.VECTOR_INDEX_DTYPE
+        )
+        stored.save(manifest)
+        self.vector_index = vectorstore.index
+        print("✓ Index vectoriel créé et persisté")
+        return vectorstore
+
+    def _build_or_load_chroma_store(self):
+        """Réutiliser la collection Chroma persistée si le manifeste correspond, sinon la reconstruire"""
         import chromadb
         from chromadb.config import Settings
-        
+
         # Créer le client avec les bons paramètres
         client = chromadb.PersistentClient(
-            path="./chroma_db",
+            path=self.config.PERSIST_DIRECTORY,
             settings=Settings(
                 anonymized_telemetry=False,
                 allow_reset=True
             )
         )
-        
-        self.vectorstore = Chroma.from_documents(
+
+        manifest = self.manifest
+        stored = IndexManifest(self.config.PERSIST_DIRECTORY, self.COLLECTION_NAME)
+
+        if stored.matches(manifest):
+            try:
+                collection = client.get_collection(self.COLLECTION_NAME)
+                if collection.count() > 0:
+                    print(f"✓ Base vectorielle à jour réutilisée ({collection.count()} chunks, aucun embedding recalculé)")
+                    self.vector_index = ChromaVectorIndex(collection)
+                    return Chroma(
+                        client=client,
+                        collection_name=self.COLLECTION_NAME,
+                        embedding_function=self.embeddings
+                    )
+            except ValueError:
+                pass
+
+        # Données, découpage ou modèle modifiés : on ne reconstruit que cette collection
+        stored.clear()
+        try:
+            client.delete_collection(self.COLLECTION_NAME)
+            print(f"✓ Ancienne collection '{self.COLLECTION_NAME}' supprimée")
+        except ValueError:
+            pass
+
+        chunks = self._create_chunks()
+
+        print("⏳ Création de la base vectorielle...")
+        vectorstore = Chroma.from_documents(
             documents=chunks,
             embedding=self.embeddings,
             client=client,
-            collection_name="video_games_sales"
+            collection_name=self.COLLECTION_NAME
         )
+        stored.save(manifest)
+        self.vector_index = ChromaVectorIndex(vectorstore._collection)
         print("✓ Base vectorielle créée et persistée")
+        return vectorstore
 
-        # Créer la chaîne QA
-        self._create_qa_chain()
-
-    
     def _create_documents_from_csv(self):
-        """Convertir les données CSV en documents textuels avec plus d'informations"""
+        """Convertir les agrégats pré-calculés en documents textuels (sans reparcourir le CSV)"""
         documents = []
+        cube = self.cube
+        columns = cube.summary["columns"]
         
         # Créer un résumé général détaillé
         summary = f"""
 Dataset : Données sur les ventes de jeux vidéo
-Nombre total d'entrées : {len(self.df)}
-Colonnes disponibles : {', '.join(self.df.columns.tolist())}
+Nombre total d'entrées : {cube.summary["rows"]}
+Colonnes disponibles : {', '.join(columns)}
 
 Résumé statistique complet :
-{self.df.describe(include='all').to_string()}
+{cube.summary["describe"]}
 """
         documents.append(Document(page_content=summary, metadata={"type": "summary"}))
         
         # TOP jeux par ventes globales
-        if 'Global_Sales' in self.df.columns and 'Name' in self.df.columns:
-            top_games = self.df.nlargest(20, 'Global_Sales')  # TOP 20
+        if 'Global_Sales' in columns and 'Name' in columns:
+            top_games = cube.top_games_by('Global_Sales', 20)  # TOP 20
+            if 'Platform' in top_games.columns:
+                labels = as_text(top_games['Name']) + " (" + as_text(top_games['Platform']) + ")"
+            else:
+                labels = as_text(top_games['Name']) + " (N/A)"
             top_text = "TOP 20 des jeux les plus vendus (Global_Sales) :\n"
-            for idx, row in top_games.iterrows():
-                top_text += f"- {row['Name']} ({row.get('Platform', 'N/A')}): {row['Global_Sales']} millions\n"
+            top_text += render_bullet_list(labels, top_games['Global_Sales'])
             documents.append(Document(page_content=top_text, metadata={"type": "top_games"}))
         
         # TOP jeux par plateforme
-        if 'Platform' in self.df.columns and 'Global_Sales' in self.df.columns:
-            platforms = self.df['Platform'].unique()[:15]  # Top 15 plateformes
+        if 'Platform' in columns and 'Global_Sales' in columns:
+            platforms = cube.summary["platform_order"][:15]  # Top 15 plateformes
+            top_by_platform = cube.top_games_per_platform(10)
             for platform in platforms:
-                platform_data = self.df[self.df['Platform'] == platform].nlargest(10, 'Global_Sales')
+                platform_data = top_by_platform.get(platform, cube.top_games.iloc[0:0])
                 platform_text = f"TOP 10 jeux sur {platform} :\n"
-                for idx, row in platform_data.iterrows():
-                    platform_text += f"- {row['Name']}: {row['Global_Sales']} millions\n"
+                platform_text += render_bullet_list(as_text(platform_data['Name']), platform_data['Global_Sales'])
                 documents.append(Document(page_content=platform_text, metadata={"type": "platform", "platform": platform}))
         
         # Statistiques par région
         region_cols = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
-        available_regions = [col for col in region_cols if col in self.df.columns]
+        available_regions = [col for col in region_cols if col in columns]
         if available_regions:
+            totals, count = cube.totals(available_regions)
             region_text = "Statistiques de ventes par région (en millions) :\n"
             for col in available_regions:
-                total = self.df[col].sum()
-                mean = self.df[col].mean()
+                total = totals[col]
+                mean = total / count
                 region_text += f"- {col}: Total = {total:.2f}M, Moyenne = {mean:.2f}M\n"
             documents.append(Document(page_content=region_text, metadata={"type": "regions"}))
         
         # TOP éditeurs
-        if 'Publisher' in self.df.columns:
-            top_publishers = self.df.groupby('Publisher')['Global_Sales'].sum().nlargest(15)
+        if 'Publisher' in columns:
+            top_publishers = cube.aggregate('Publisher', 'Global_Sales').nlargest(15)
             pub_text = "TOP 15 éditeurs par ventes totales :\n"
             for pub, sales in top_publishers.items():
                 pub_text += f"- {pub}: {sales:.2f} millions\n"
             documents.append(Document(page_content=pub_text, metadata={"type": "publishers"}))
         
         # TOP genres
-        if 'Genre' in self.df.columns:
-            top_genres = self.df.groupby('Genre')['Global_Sales'].sum().nlargest(10)
+        if 'Genre' in columns:
+            top_genres = cube.aggregate('Genre', 'Global_Sales').nlargest(10)
             genre_text = "TOP 10 genres par ventes totales :\n"
             for genre, sales in top_genres.items():
                 genre_text += f"- {genre}: {sales:.2f} millions\n"
@@ -176,13 +391,23 @@ Résumé statistique complet :
         if not self.vectorstore:
             raise ValueError("Veuillez d'abord charger des données")
         
-        # Template de prompt avec SYSTEM_PROMPT intégré
-        prompt_template = f"""{self.SYSTEM_PROMPT}
-
-Contexte (données extraites) :
-{{context}}
+        # Message système identique d'une question à l'autre (consignes puis documents de synthèse,
+        # toujours dans le même ordre) : LM Studio réutilise le préfixe déjà calculé (cache KV)
+        self.static_documents = [
+            doc for doc in self._create_documents_from_csv()
+            if doc.metadata["type"] in self.config.STATIC_CONTEXT_TYPES
+        ]
+        self.system_message = self.SYSTEM_PROMPT.strip()
+        if self.static_documents:
+            self.system_message += "\n\nDonnées de référence (ensemble du dataset) :\n\n" + "\n\n".join(
+                doc.page_content.strip() for doc in self.static_documents
+            )
+        
+        # Partie propre à chaque question, placée après le préfixe commun
+        prompt_template = """Contexte (données extraites) :
+{context}
 
-Question : {{question}}
+Question : {question}
 
 Réponse :"""
         
@@ -196,33 +421,114 @@ Réponse :"""
             search_type="similarity",
             search_kwargs={"k": 10}  # Augmenté de 5 à 10 pour plus de contexte
         )
+
+        # Questions simultanées : un seul encode et une seule requête Chroma par lot
+        if self.config.RETRIEVAL_BATCHING:
+            self.retrieval_batcher = RetrievalBatcher(
+                self.embeddings.embed_queries,
+                self._search_batch,
+                max_batch=self.config.RETRIEVAL_MAX_BATCH,
+                max_wait_ms=self.config.RETRIEVAL_BATCH_WAIT_MS
+            )
         
         print("✓ Chaîne QA créée avec succès\n")
     
     def ask(self, question):
         """Poser une question sur les données"""
         if not self.vectorstore:
+            return self._no_data_response()
+        
+        try:
+            with span("ask"):
+                response, pending = self._prepare_answer(question)
+                if response is None:
+                    # Obtenir la réponse du modèle
+                    response = self._finish_answer(pending, self.llm(pending["prompt"]))
+            return response
+        
+        except LMStudioError as e:
+            # LM Studio injoignable, trop lent ou en erreur : message affichable, jamais mis en cache
             return {
-                "answer": "Aucune donnée n'a été chargée. Veuillez charger un fichier CSV d'abord.",
+                "answer": str(e),
                 "sources": []
             }
         
+        except Exception as e:
+            return {
+                "answer": f"Erreur lors de la génération de la réponse : {e}",
+                "sources": []
+            }
+    
+    def ask_stream(self, question):
+        """
+        Poser une question et recevoir la réponse au fil de la génération
+        
+        Yields:
+            dict: {"type": "token", "text": ...} pour chaque fragment, puis
+                  {"type": "done", "sources_count": ..., "cached": ..., "context_tokens": ...}
+        """
+        if not self.vectorstore:
+            response = self._no_data_response()
+            yield {"type": "token", "text": response["answer"]}
+            yield {"type": "done", "sources_count": 0, "cached": False}
+            return
+        
         try:
-            # Récupérer les documents pertinents
-            relevant_docs = self.retriever.get_relevant_documents(question)
-            
-            # Construire le contexte
-            context = "\n\n".join([doc.page_content for doc in relevant_docs])
-            
-            # Créer le prompt complet
-            full_prompt = self.prompt.format(context=context, question=question)
-            
-            # Obtenir la réponse du modèle
-            answer = self.llm(full_prompt)
+            response, pending = self._prepare_answer(question)
+            if response is not None:
+                # Réponse déjà connue (voie analytique ou cache) : un seul fragment
+                yield {"type": "token", "text": response["answer"]}
+            else:
+                parts = []
+                for token in self.llm.stream(pending["prompt"]):
+                    parts.append(token)
+                    yield {"type": "token", "text": token}
+                response = self._finish_answer(pending, "".join(parts))
             
+            yield {"type": "done", "sources_count": len(response["sources"]), "cached": response.get("cached", False),
+                   "context_tokens": response.get("context_tokens", 0)}
+        
+        except LMStudioError as e:
+            yield {"type": "token", "text": str(e)}
+            yield {"type": "done", "sources_count": 0, "cached": False}
+        
+        except Exception as e:
+            yield {"type": "token", "text": f"Erreur lors de la génération de la réponse : {e}"}
+            yield {"type": "done", "sources_count": 0, "cached": False}
+    
+    @property
+    def async_llm(self):
+        """Client LM Studio asynchrone, créé au premier appel (httpx n'est requis que par le serveur ASGI)"""
+        if self._async_llm is None:
+            # Même disjoncteur que le client synchrone : un LM Studio en panne l'est pour les deux
+            self._async_llm = AsyncLMStudioLLM(
+                base_url=self.llm.base_url,
+                temperature=self.llm.temperature,
+                max_tokens=self.llm.max_tokens,
+                breaker=self.llm.breaker
+            )
+        return self._async_llm
+    
+    async def aask(self, question):
+        """
+        Version asynchrone de ask : la recherche (embeddings, Chroma, pandas) tourne
+        dans le pool de threads, l'attente du LLM ne bloque aucun thread
+        """
+        if not self.vectorstore:
+            return self._no_data_response()
+        
+        try:
+            with span("ask"):
+                response, pending = await asyncio.to_thread(self._prepare_answer, question)
+                if response is None:
+                    answer = await self.async_llm(pending["prompt"])
+                    response = self._finish_answer(pending, answer)
+            return response
+        
+        except LMStudioError as e:
             return {
-                "answer": answer,
-                "sources": relevant_docs
+                "answer": str(e),
+                "sources": []
             }
         
         except Exception as e:
@@ -231,6 +537,207 @@ Réponse :"""
                 "sources": []
             }
     
+    async def aask_stream(self, question):
+        """Version asynchrone de ask_stream (mêmes évènements)"""
+        if not self.vectorstore:
+            response = self._no_data_response()
+            yield {"type": "token", "text": response["answer"]}
+            yield {"type": "done", "sources_count": 0, "cached": False}
+            return
+        
+        try:
+            response, pending = await asyncio.to_thread(self._prepare_answer, question)
+            if response is not None:
+                yield {"type": "token", "text": response["answer"]}
+            else:
+                parts = []
+                async for token in self.async_llm.stream(pending["prompt"]):
+                    parts.append(token)
+                    yield {"type": "token", "text": token}
+                response = self._finish_answer(pending, "".join(parts))
+            
+            yield {"type": "done", "sources_count": len(response["sources"]), "cached": response.get("cached", False),
+                   "context_tokens": response.get("context_tokens", 0)}
+        
+        except LMStudioError as e:
+            yield {"type": "token", "text": str(e)}
+            yield {"type": "done", "sources_count": 0, "cached": False}
+        
+        except Exception as e:
+            yield {"type": "token", "text": f"Erreur lors de la génération de la réponse : {e}"}
+            yield {"type": "done", "sources_count": 0, "cached": False}
+    
+    async def aclose(self):
+        """Ferme les connexions du client asynchrone"""
+        if self._async_llm is not None:
+            await self._async_llm.aclose()
+    
+    @staticmethod
+    def _no_data_response():
+        return {
+            "answer": "Aucune donnée n'a été chargée. Veuillez charger un fichier CSV d'abord.",
+            "sources": []
+        }
+    
+    def _prepare_answer(self, question):
+        """
+        Tout ce qui précède la génération : voie analytique, cache, récupération et prompt
+        
+        Returns:
+            (response, None) si la réponse est déjà connue,
+            (None, pending) sinon, pending contenant le prompt à envoyer au modèle
+        """
+        # Questions agrégées : calcul exact avec pandas, sans retriever
+        # (sauf si un titre précis est cité : c'est alors une recherche de lignes)
+        with span("route"):
+            games = self.lexical_index.exact_matches(question) if self.lexical_index else []
+            intent = self.analytics.route(question) if self.analytics and not games else None
+        if intent and not self.config.ANALYTICS_LLM_PHRASING:
+            with span("analytics"):
+                result = self.analytics.answer(intent)[0]
+            return {"answer": result, "sources": [self._analytics_source(result, intent)]}, None
+        
+        # Cache sémantique : une question très proche d'une question déjà posée réutilise sa réponse,
+        # si elle cite les mêmes plateformes, genres, éditeurs, années ("en 2008" / "en 2009") et jeux ("FIFA 14" / "FIFA 15")
+        with span("embed_question"):
+            question_embedding = self._embed_question(question)
+        filters = self.analytics.filter_parser.parse(question) if self.analytics else {}
+        with span("answer_cache"):
+            cached = self.answer_cache.lookup(question_embedding, filters, games)
+        if cached is not None:
+            return dict(cached, cached=True), None
+        
+        if intent:
+            # Le LLM ne fait que reformuler le résultat déjà calculé
+            with span("analytics"):
+                result = self.analytics.answer(intent)[0]
+            prompt = self.PHRASING_PROMPT.format(result=result, question=question)
+            sources = [self._analytics_source(result, intent)]
+        else:
+            # Récupérer les documents pertinents, hors chunks des documents déjà dans le message système
+            # (le découpage en chunks change leur texte : on les reconnaît à leur type)
+            with span("retrieve"):
+                documents = [doc for doc in self._retrieve(question, question_embedding)
+                             if doc.metadata.get("type") not in self.config.STATIC_CONTEXT_TYPES]
+            
+            # Construire le contexte dans la limite du budget de tokens
+            # (vecteurs lus dans le cache, sans y écrire ceux des documents rendus à la volée)
+            with span("context_packing"):
+                packed = self.context_packer.pack(
+                    question_embedding,
+                    documents,
+                    self.embeddings.lookup_documents([doc.page_content for doc in documents])
+                )
+            sources = packed.documents
+            
+            # Créer le prompt complet
+            with span("prompt"):
+                prompt = self._messages(self.prompt.format(context=packed.text, question=question))
+            return None, {"prompt": prompt, "sources": sources, "embedding": question_embedding,
+                          "filters": filters, "games": games, "context_tokens": packed.tokens}
+        
+        return None, {"prompt": prompt, "sources": sources, "embedding": question_embedding,
+                      "filters": filters, "games": games}
+    
+    def _messages(self, user_content):
+        """Messages envoyés à LM Studio : préfixe système commun, puis la partie propre à la question"""
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": user_content}
+        ]
+    
+    def _embed_question(self, question):
+        if self.retrieval_batcher:
+            return self.retrieval_batcher.embed(question)
+        return self.embeddings.embed_query(question)
+    
+    def _retrieve(self, question, question_embedding):
+        """Documents les plus proches de la question (k du retriever), recherche lexicale incluse"""
+        k = self.retriever.search_kwargs["k"]
+        if self.lexical_index:
+            # Titre cité tel quel : seules ses lignes partent dans le contexte
+            exact = self.lexical_index.exact_matches(question)
+            if exact:
+                return self._game_documents(exact[:k])
+        
+        # Plateformes, genres, éditeurs et années cités : la recherche se limite aux documents concernés
+        filters = {}
+        if self.config.METADATA_FILTERING and self.analytics:
+            filters = self.analytics.filter_parser.parse(question)
+        with span("vector_search"):
+            vector_docs = self._vector_search(question, question_embedding, k, filters)
+        
+        lexical = []
+        if self.lexical_index:
+            with span("lexical_search"):
+                allowed = self.analytics.filter_parser.mask(self.df, filters) if filters else None
+                lexical = self.lexical_index.search(question, self.config.LEXICAL_TOP_K, allowed=allowed)
+        if not lexical:
+            return vector_docs
+        
+        # Fusion des deux classements (reciprocal rank fusion)
+        game_docs = self._game_documents([row_id for row_id, _ in lexical])
+        by_content = {doc.page_content: doc for doc in vector_docs + game_docs}
+        fused = reciprocal_rank_fusion([
+            [doc.page_content for doc in vector_docs],
+            [doc.page_content for doc in game_docs]
+        ])
+        return [by_content[content] for content, _ in fused[:k]]
+    
+    def _vector_search(self, question, question_embedding, k, filters):
+        """k plus proches voisins, d'abord parmi les documents qui respectent les filtres"""
+        where = self.analytics.filter_parser.to_where(filters) if filters else None
+        if where is None:
+            if self.retrieval_batcher:
+                return self.retrieval_batcher.search(question_embedding, k)
+            return self.retriever.get_relevant_documents(question)
+        
+        if self.retrieval_batcher:
+            docs = self.retrieval_batcher.search(question_embedding, k, where)
+        else:
+            docs = self._search_batch([question_embedding], k, where)[0]
+        if len(docs) < k:
+            # Trop peu de documents filtrés : on complète avec la recherche sans filtre
+            seen = {doc.page_content for doc in docs}
+            others = self._vector_search(question, question_embedding, k, {})
+            docs += [doc for doc in others if doc.page_content not in seen][:k - len(docs)]
+        return docs
+    
+    def _game_documents(self, row_ids):
+        """Documents des jeux (même rendu que l'indexation ligne par ligne)"""
+        return self._rows_as_documents(self.df.iloc[self._row_ids.get_indexer(row_ids)])
+    
+    @staticmethod
+    def _rows_as_documents(rows):
+        texts, metadatas, _ = render_game_documents(rows)
+        return [
+            Document(page_content=text, metadata=dict(metadata, type="game"))
+            for text, metadata in zip(texts, metadatas)
+        ]
+    
+    def _search_batch(self, vectors, k, where=None):
+        """Une seule recherche vectorielle pour plusieurs questions : une liste de documents par question"""
+        return [
+            [Document(page_content=hit.document, metadata=hit.metadata) for hit in hits]
+            for hits in self.vector_index.search(vectors, k, where)
+        ]
+    
+    def _finish_answer(self, pending, answer):
+        """Assembler la réponse générée et la mettre en cache"""
+        response = {
+            "answer": answer,
+            "sources": pending["sources"]
+        }
+        self.answer_cache.store(pending["embedding"], response, pending["filters"], pending["games"])
+        if "context_tokens" in pending:
+            # Taille du contexte de cette génération (une réponse tirée du cache n'en a pas)
+            response = dict(response, context_tokens=pending["context_tokens"])
+        return response
+    
+    @staticmethod
+    def _analytics_source(result, intent):
+        return Document(page_content=result, metadata={"type": "analytics", "intent": intent.kind})
+    
     def get_data_info(self):
         """Obtenir des informations sur les données chargées"""
         if self.df is None:
@@ -242,6 +749,17 @@ Réponse :"""
 - Nombre de colonnes : {len(self.df.columns)}
 - Colonnes : {', '.join(self.df.columns.tolist())}
 """
+        cache = self.answer_cache.stats()
+        info += (f"- Cache des réponses : {cache['size']} entrées, "
+                 f"{cache['hits']} hits / {cache['misses']} misses\n")
+        if self.retrieval_batcher:
+            batching = self.retrieval_batcher.stats()
+            info += (f"- Recherche par lots : {batching['requests']} requêtes en {batching['batches']} lots "
+                     f"(moyenne {batching['mean_batch_size']:.1f})\n")
+        context = self.context_packer.stats.as_dict()
+        if context['requests']:
+            info += (f"- Contexte : {context['mean_tokens']:.0f} tokens en moyenne "
+                     f"(max {context['max_tokens']}), {context['dropped']} documents écartés\n")
         return info
 
 
@@ -0,0 +1,119 @@
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+EMBED = "embed"
+SEARCH = "search"
+
+
+class RetrievalBatcher:
+    """Coalesces concurrent question embeddings and vector searches.
+
+    Callers block on ``embed(question)`` / ``search(vector, k, where)``
+    while a single worker thread collects the requests arriving within
+    ``max_wait_ms`` of the first one (at most ``max_batch``), runs one
+    ``encode_batch(texts)`` for the embeddings and one
+    ``search_batch(vectors, k, where)`` per distinct ``(k, where)`` for the
+    searches, then resolves each caller's future with its own row of the
+    result.
+
+    The worker is started on first use and again after a fork, so the
+    batcher can be created before a pre-forking server spawns its workers.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], Sequence[Any]],
+                 search_batch: Callable[[List[Sequence[float]], int, Optional[dict]], Sequence[Any]],
+                 max_batch: int = 32, max_wait_ms: float = 5.0):
+        self.encode_batch = encode_batch
+        self.search_batch = search_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.batches = 0
+        self.requests = 0
+
+        self._queue = None
+        self._worker = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def embed(self, question: str) -> Any:
+        return self._submit(EMBED, question, None).result()
+
+    def search(self, vector: Sequence[float], k: int, where: Optional[dict] = None) -> Any:
+        return self._submit(SEARCH, vector, (k, where)).result()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Worker
+    # ------------------------------------------------------------------ #
+    def _submit(self, kind: str, payload: Any, options: Any) -> Future:
+        future = Future()
+        self._ensure_worker().put((kind, payload, options, future))
+        return future
+
+    def _ensure_worker(self) -> "queue.SimpleQueue":
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    # Threads do not survive a fork: each process gets its own queue and worker
+                    self._queue = queue.SimpleQueue()
+                    self._worker = threading.Thread(target=self._run, args=(self._queue,),
+                                                    name="retrieval-batcher", daemon=True)
+                    self._worker.start()
+                    self._pid = pid
+        return self._queue
+
+    def _collect(self, pending: "queue.SimpleQueue") -> List[Tuple]:
+        batch = [pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending: "queue.SimpleQueue") -> None:
+        while True:
+            batch = self._collect(pending)
+            self.batches += 1
+            self.requests += len(batch)
+
+            groups = {}
+            for kind, payload, options, future in batch:
+                if future.set_running_or_notify_cancel():
+                    key = (kind, json.dumps(options, sort_keys=True))
+                    groups.setdefault(key, (options, []))[1].append((payload, future))
+
+            for (kind, _), (options, items) in groups.items():
+                payloads = [payload for payload, _ in items]
+                try:
+                    if kind == EMBED:
+                        results = self.encode_batch(payloads)
+                    else:
+                        k, where = options
+                        results = self.search_batch(payloads, k, where)
+                except Exception as e:
+                    for _, future in items:
+                        future.set_exception(e)
+                    continue
+                for (_, future), result in zip(items, results):
+                    future.set_result(result)
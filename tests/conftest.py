@@ -0,0 +1,74 @@
+import hashlib
+import os
+import re
+import sys
+from typing import List
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CSV_PATH = os.path.join(ROOT, "data", "vgsales.csv")
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words vectors: no model download, similar texts stay close"""
+
+    DIM = 256
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.DIM, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % self.DIM] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+class RecordingLLM:
+    """Stands in for LMStudioLLM and keeps every prompt it was sent"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return "réponse du modèle"
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        yield "réponse du modèle"
+
+
+def build_chatbot(tmp_path, monkeypatch, **config):
+    import rag_chatbot
+    from config.config import RAGChatbotConfig
+
+    monkeypatch.setattr(rag_chatbot, "create_embeddings", lambda *args, **kwargs: HashingEmbeddings())
+    settings = dict(
+        VECTOR_BACKEND="numpy",
+        PERSIST_DIRECTORY=str(tmp_path / "index"),
+        EMBEDDING_CACHE_DIRECTORY=str(tmp_path / "embeddings"),
+        RETRIEVAL_BATCHING=False,
+    )
+    settings.update(config)
+    chatbot = rag_chatbot.RAGChatbot(csv_path=CSV_PATH, config=RAGChatbotConfig(**settings))
+    chatbot.llm = RecordingLLM()
+    return chatbot
+
+
+@pytest.fixture(scope="session")
+def chatbot(tmp_path_factory):
+    monkeypatch = pytest.MonkeyPatch()
+    try:
+        yield build_chatbot(tmp_path_factory.mktemp("chatbot"), monkeypatch)
+    finally:
+        monkeypatch.undo()
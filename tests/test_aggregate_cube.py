@@ -0,0 +1,21 @@
+import pandas as pd
+
+import aggregate_cube
+from aggregate_cube import AggregateCube
+from conftest import CSV_PATH
+
+
+def test_cube_is_rebuilt_when_its_version_changes(tmp_path, monkeypatch):
+    df = pd.read_csv(CSV_PATH, nrows=500)
+    AggregateCube.load_or_build(df, "0" * 64, str(tmp_path))
+    built = []
+    monkeypatch.setattr(AggregateCube, "build", classmethod(lambda cls, frame: built.append(1) or
+                                                            AggregateCube(pd.DataFrame(), pd.DataFrame(), {})))
+
+    AggregateCube.load_or_build(df, "0" * 64, str(tmp_path))
+    assert built == []
+
+    monkeypatch.setattr(aggregate_cube, "CUBE_VERSION", aggregate_cube.CUBE_VERSION + 1)
+    AggregateCube.load_or_build(df, "0" * 64, str(tmp_path))
+    assert built == [1]
+    assert [path.name for path in tmp_path.iterdir()] == [f"{'0' * 16}.v{aggregate_cube.CUBE_VERSION}"]
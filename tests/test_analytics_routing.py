@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from analytics import AnalyticsRouter
+from conftest import CSV_PATH
+
+
+@pytest.fixture(scope="module")
+def router():
+    return AnalyticsRouter(pd.read_csv(CSV_PATH))
+
+
+@pytest.mark.parametrize("question", [
+    "Quel est le meilleur jeu de Mario ?",
+    "Quel est le jeu le plus vendu de la série Zelda ?",
+])
+def test_unparsed_words_fall_back_to_rag(router, question):
+    assert router.route(question) is None
+
+
+def test_verb_eu_is_not_europe(router):
+    intent = router.route("Quel jeu a eu le plus de ventes ?")
+    assert intent.kind == 'top_games' and intent.measure == 'Global_Sales'
+    assert router.route("Top 5 des éditeurs par ventes EU").measure == 'EU_Sales'
+
+
+def test_genre_and_platform_filters_are_kept(router):
+    intent = router.route("Quels sont les meilleurs jeux d'aventure sur PS2 ?")
+    assert intent.kind == 'top_games'
+    assert intent.filters == {'Platform': ['PS2'], 'Genre': ['Adventure']}
+    _, table = router.answer(intent)
+    assert (router.df.loc[table.index, ['Platform', 'Genre']] == ['PS2', 'Adventure']).all().all()
+
+
+def test_count_intent(router):
+    intent = router.route("Quelle console a le plus de jeux ?")
+    assert (intent.kind, intent.group_by, intent.agg) == ('ranking', 'Platform', 'count')
+    text, table = router.answer(intent)
+    counts = router.df['Platform'].value_counts()
+    assert table.index[0] == counts.index[0] and table.iloc[0, 0] == counts.iloc[0]
+    assert f"{counts.iloc[0]} jeux" in text
+
+    text, _ = router.answer(router.route("Combien de jeux sur PS2 ?"))
+    assert f"{(router.df['Platform'] == 'PS2').sum()}" in text
+
+
+@pytest.mark.parametrize("question, kind, group_by", [
+    # Suggestions of the web interface and of main.py
+    ("Quel est le jeu le plus vendu ?", 'top_games', None),
+    ("Quels sont les meilleurs jeux par plateforme ?", 'top_games', 'Platform'),
+    ("Quelles sont les statistiques de vente par région ?", 'regions', None),
+    ("Quel éditeur a le plus de succès ?", 'ranking', 'Publisher'),
+    # Phrasings of the analytics request
+    ("best-selling game", 'top_games', None),
+    ("sales by region", 'regions', None),
+    ("top publisher", 'ranking', 'Publisher'),
+])
+def test_suggested_questions_are_answered_by_analytics(router, question, kind, group_by):
+    intent = router.route(question)
+    assert intent is not None
+    assert (intent.kind, intent.group_by) == (kind, group_by)
@@ -0,0 +1,50 @@
+from answer_cache import SemanticAnswerCache
+
+
+def test_same_embedding_other_filters_is_a_miss():
+    cache = SemanticAnswerCache()
+    cache.store([1.0, 0.0], {"answer": "2008"}, {'Year': (2008, 2008)})
+    cache.store([1.0, 0.0], {"answer": "PS2"}, {'Platform': ['PS2']})
+
+    assert cache.lookup([1.0, 0.01], {'Year': (2008, 2008)})["answer"] == "2008"
+    assert cache.lookup([1.0, 0.01], {'Platform': ['PS2']})["answer"] == "PS2"
+    assert cache.lookup([1.0, 0.0], {'Year': (2009, 2009)}) is None
+    assert cache.lookup([1.0, 0.0]) is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_chatbot_keys_answers_on_the_parsed_filters(chatbot):
+    chatbot.answer_cache.invalidate()
+    question = "Que sais-tu des jeux de Konami sortis sur {} ?"
+    assert "cached" not in chatbot.ask(question.format("PS2"))
+    # Same question on another platform: very close embedding, but not the same answer
+    chatbot.embeddings.embed_query = lambda text, embed=chatbot.embeddings.embed_query: embed(question.format("PS2"))
+    try:
+        assert "cached" not in chatbot.ask(question.format("DS"))
+        assert chatbot.ask(question.format("PS2")).get("cached")
+    finally:
+        del chatbot.embeddings.embed_query
+
+
+def test_same_embedding_other_games_is_a_miss():
+    cache = SemanticAnswerCache()
+    cache.store([1.0, 0.0], {"answer": "FIFA 14"}, games=["10", "11"])
+    assert cache.lookup([1.0, 0.0], games=["11", "10"])["answer"] == "FIFA 14"
+    assert cache.lookup([1.0, 0.0], games=["12"]) is None
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_chatbot_keys_answers_on_the_named_games(chatbot):
+    chatbot.answer_cache.invalidate()
+    question = "Combien d'exemplaires de {} ont été vendus en Europe ?"
+    fifa14, fifa15 = (chatbot.lexical_index.exact_matches(question.format(title)) for title in ("FIFA 14", "FIFA 15"))
+    assert fifa14 and fifa15 and not set(fifa14) & set(fifa15)
+
+    assert "cached" not in chatbot.ask(question.format("FIFA 14"))
+    # Same embedding for both titles: only the named games tell them apart
+    chatbot.embeddings.embed_query = lambda text, embed=chatbot.embeddings.embed_query: embed(question.format("FIFA 14"))
+    try:
+        assert "cached" not in chatbot.ask(question.format("FIFA 15"))
+        assert chatbot.ask(question.format("FIFA 14")).get("cached")
+    finally:
+        del chatbot.embeddings.embed_query
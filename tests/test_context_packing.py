@@ -0,0 +1,18 @@
+import os
+
+
+def cache_files(cache):
+    return {name: os.stat(os.path.join(cache.directory, name)).st_mtime_ns
+            for name in os.listdir(cache.directory)}
+
+
+def test_answering_does_not_write_the_embedding_cache(chatbot):
+    cache = chatbot.embeddings.cache
+    before, entries = cache_files(cache), len(cache)
+    chatbot.answer_cache.invalidate()
+    chatbot.llm.prompts.clear()
+    # Documents de jeux rendus à la volée par la recherche lexicale : absents du cache
+    chatbot.ask("Que sais-tu des jeux Zelda sur Nintendo 64 ?")
+    assert chatbot.llm.prompts
+    assert len(cache) == entries
+    assert cache_files(cache) == before
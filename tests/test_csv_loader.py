@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import csv_loader
+from conftest import CSV_PATH
+
+
+@pytest.fixture
+def late_latin1_csv(tmp_path):
+    """UTF-8 over the sniffed prefix, then a latin1 byte ("Pokémon" written in cp1252)"""
+    path = tmp_path / "games.csv"
+    rows = [f"{i},Game {i},PS2,Action,Sony,1.0\n".encode("ascii") for i in range(20000)]
+    content = b"Rank,Name,Platform,Genre,Publisher,Global_Sales\n" + b"".join(rows)
+    assert len(content) > csv_loader.SNIFF_BYTES
+    path.write_bytes(content + "20001,Pokémon,GB,Role-Playing,Nintendo,31.4\n".encode("cp1252"))
+    return str(path)
+
+
+def test_pandas_path_falls_back_to_latin1(late_latin1_csv, monkeypatch):
+    monkeypatch.setattr(csv_loader, "_pyarrow_available", lambda: False)
+    df = csv_loader.read_csv(late_latin1_csv)
+    assert df['Name'].iloc[-1] == "Pokémon"
+
+
+def test_pyarrow_path_falls_back_to_latin1(late_latin1_csv, monkeypatch):
+    read_csv = pd.read_csv
+    engines = []
+
+    def pyarrow_like(path, engine=None, **kwargs):
+        # Same strict decoding as the pyarrow engine, which is not importable everywhere
+        engines.append(engine)
+        return read_csv(path, **kwargs)
+
+    monkeypatch.setattr(csv_loader, "_pyarrow_available", lambda: True)
+    monkeypatch.setattr(csv_loader.pd, "read_csv", pyarrow_like)
+    df = csv_loader.read_csv(late_latin1_csv)
+    assert df['Name'].iloc[-1] == "Pokémon"
+    assert engines == ["pyarrow", "pyarrow"]
+
+
+def test_iter_frames_falls_back_to_latin1(late_latin1_csv):
+    frames = list(csv_loader.iter_frames(late_latin1_csv, chunksize=1000))
+    df = pd.concat(frames)
+    assert len(df) == 20001 and (df.index == range(20001)).all()
+    assert df['Name'].iloc[-1] == "Pokémon"
+    assert df['Name'].iloc[0] == "Game 0"
+
+
+def test_iter_frames_reads_only_the_requested_columns():
+    columns = ['Name', 'Platform', 'Year', 'Missing']
+    frames = list(csv_loader.iter_frames(CSV_PATH, chunksize=5000, usecols=columns))
+    assert all(list(frame.columns) == ['Name', 'Platform', 'Year'] for frame in frames)
+    df = csv_loader.apply_schema(pd.concat(frames))
+    expected = csv_loader.read_csv(CSV_PATH)[['Name', 'Platform', 'Year']]
+    pd.testing.assert_frame_equal(df, expected, check_categorical=False)
+    assert df['Platform'].dtype == 'category' and df['Year'].dtype == 'Int16'
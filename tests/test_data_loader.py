@@ -0,0 +1,35 @@
+import json
+import random
+
+import pytest
+
+import data_loader
+from data_loader import DataLoader
+
+
+def arrays():
+    yield [1, 22, True, None, "ab", 1.5]
+    rng = random.Random(0)
+    for _ in range(20):
+        yield [rng.choice([rng.uniform(-1e3, 1e3), rng.randint(-10**6, 10**6), rng.random() * 1e-5,
+                           "téxt", {"n": rng.random(), "k": [1, 2.25]}, False, None])
+               for _ in range(rng.randint(0, 30))]
+
+
+@pytest.mark.parametrize("block_size", range(1, 9))
+def test_iter_json_across_read_boundaries(tmp_path, monkeypatch, block_size):
+    monkeypatch.setattr(data_loader, "READ_BLOCK_SIZE", block_size)
+    path = tmp_path / "data.json"
+    for items in arrays():
+        for separators in ((",", ":"), (", ", ": ")):
+            path.write_text(json.dumps(items, separators=separators), encoding="utf-8")
+            assert list(DataLoader.iter_json(str(path))) == [json.dumps(item) for item in items]
+
+
+@pytest.mark.parametrize("content", ["[1, 2", "[1, 2 3]", "[1.5"])
+def test_iter_json_rejects_broken_arrays(tmp_path, monkeypatch, content):
+    monkeypatch.setattr(data_loader, "READ_BLOCK_SIZE", 2)
+    path = tmp_path / "data.json"
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(DataLoader.iter_json(str(path)))
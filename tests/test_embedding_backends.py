@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("transformers")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+from conftest import CSV_PATH
+from document_renderer import render_game_documents
+from onnx_embeddings import OnnxEmbeddings, hub_name
+
+MODEL = "all-MiniLM-L6-v2"
+
+# Same threshold as benchmarks/bench_embeddings.py --min-cosine
+MIN_COSINE = 0.98
+
+
+@pytest.fixture(scope="module")
+def texts():
+    documents, _, _ = render_game_documents(pd.read_csv(CSV_PATH).head(200))
+    return documents + ["Ventes de Tetris sur Game Boy", "Quel est le jeu le plus vendu en 2008 ?"]
+
+
+@pytest.fixture(scope="module")
+def torch_vectors(texts):
+    model = sentence_transformers.SentenceTransformer(hub_name(MODEL))
+    return np.asarray(model.encode(texts, batch_size=64, normalize_embeddings=True), dtype=np.float32)
+
+
+@pytest.mark.parametrize("quantize", [False, True], ids=["fp32", "int8"])
+def test_onnx_vectors_match_torch(texts, torch_vectors, quantize, tmp_path_factory):
+    onnx = OnnxEmbeddings(MODEL, str(tmp_path_factory.getbasetemp() / "onnx_models"), quantize=quantize)
+    vectors = np.asarray(onnx.encode(texts), dtype=np.float32)
+    assert vectors.shape == torch_vectors.shape
+    cosine = np.sum(torch_vectors * vectors, axis=1)
+    assert cosine.min() >= MIN_COSINE
@@ -0,0 +1,69 @@
+import multiprocessing
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+def encode(texts):
+    """Deterministic vectors: the text decides the values, so mixed-up slots are visible"""
+    return np.array([[len(text), sum(map(ord, text)) % 97, ord(text[0])] for text in texts], dtype=np.float32)
+
+
+def test_two_instances_share_a_directory(tmp_path):
+    first = EmbeddingCache(str(tmp_path), "model")
+    second = EmbeddingCache(str(tmp_path), "model")
+
+    a_texts = [f"a{i}" for i in range(50)]
+    b_texts = [f"b{i}" for i in range(50)]
+    np.testing.assert_array_equal(first.embed(a_texts, encode, persist=False), encode(a_texts))
+    np.testing.assert_array_equal(second.embed(b_texts, encode, persist=False), encode(b_texts))
+
+    # Each instance reads what the other stored, from distinct slots
+    calls = []
+    counting = lambda texts: calls.append(texts) or encode(texts)
+    np.testing.assert_array_equal(first.embed(b_texts, counting), encode(b_texts))
+    np.testing.assert_array_equal(second.embed(a_texts, counting), encode(a_texts))
+    assert calls == []
+    slots = [slot for slot, _ in first.entries.values()]
+    assert len(slots) == len(set(slots)) == 100
+
+    first.save()
+    reopened = EmbeddingCache(str(tmp_path), "model")
+    np.testing.assert_array_equal(reopened.embed(a_texts + b_texts, counting), encode(a_texts + b_texts))
+    assert calls == []
+
+
+def test_eviction_by_one_instance_is_seen_by_the_other(tmp_path):
+    first = EmbeddingCache(str(tmp_path), "model", max_entries=16)
+    second = EmbeddingCache(str(tmp_path), "model", max_entries=16)
+    old = [f"old{i}" for i in range(16)]
+    first.embed(old, encode)
+    second.embed(old, encode)  # all hits
+    new = [f"new{i}" for i in range(8)]
+    first.embed(new, encode)
+
+    # The slots reused by the first instance no longer answer for the evicted texts
+    np.testing.assert_array_equal(second.embed(old + new, encode), encode(old + new))
+    assert len(second) <= 16 and len(first) <= 16
+
+
+def _fill(directory, prefix):
+    cache = EmbeddingCache(directory, "model")
+    for start in range(0, 200, 10):
+        cache.embed([f"{prefix}{i}" for i in range(start, start + 10)], encode)
+
+
+def test_concurrent_processes(tmp_path):
+    processes = [multiprocessing.Process(target=_fill, args=(str(tmp_path), prefix)) for prefix in "ab"]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = EmbeddingCache(str(tmp_path), "model")
+    texts = [f"{prefix}{i}" for prefix in "ab" for i in range(200)]
+    calls = []
+    np.testing.assert_array_equal(cache.embed(texts, lambda t: calls.append(t) or encode(t)), encode(texts))
+    assert calls == []
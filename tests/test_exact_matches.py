@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from conftest import CSV_PATH
+from lexical_index import LexicalIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    df = pd.read_csv(CSV_PATH)
+    return df, LexicalIndex.build(df)
+
+
+def names(df, ids):
+    return {df.loc[int(i), 'Name'] for i in ids}
+
+
+@pytest.mark.parametrize("question", [
+    "Quels sont les meilleurs jeux de combat ?",
+    "Quel jeu d'adventure a le plus vendu ?",
+    "Ventes des jeux de tennis et de golf au Japon",
+    "Top 5 des jeux de soccer",
+])
+def test_common_words_are_not_game_names(index, question):
+    _, lexical = index
+    assert lexical.exact_matches(question) == []
+
+
+def test_quoted_common_word_title_matches(index):
+    df, lexical = index
+    assert names(df, lexical.exact_matches('Combien a vendu "Combat" ?')) == {"Combat"}
+    assert names(df, lexical.exact_matches("Ventes de « Tennis » sur NES")) == {"Tennis"}
+
+
+def test_distinctive_names_still_match(index):
+    df, lexical = index
+    assert names(df, lexical.exact_matches("Ventes de Tetris sur Game Boy")) == {"Tetris"}
+    assert "Wii Sports" in names(df, lexical.exact_matches("ventes de Wii Sports au Japon"))
+
+
+def test_index_is_rebuilt_when_its_version_changes(tmp_path, monkeypatch):
+    import lexical_index
+
+    df = pd.read_csv(CSV_PATH, nrows=500)
+    LexicalIndex.load_or_build(df, "0" * 64, str(tmp_path))
+    built = []
+    build = LexicalIndex.build.__func__
+    monkeypatch.setattr(LexicalIndex, "build", classmethod(lambda cls, frame: built.append(1) or build(cls, frame)))
+
+    LexicalIndex.load_or_build(df, "0" * 64, str(tmp_path))
+    assert built == []
+
+    monkeypatch.setattr(lexical_index, "INDEX_VERSION", lexical_index.INDEX_VERSION + 1)
+    LexicalIndex.load_or_build(df, "0" * 64, str(tmp_path))
+    assert built == [1]
+    assert [path.name for path in tmp_path.iterdir()] == [f"{'0' * 16}.v{lexical_index.INDEX_VERSION}.json"]
@@ -0,0 +1,23 @@
+def test_filters_narrow_the_vector_search(chatbot):
+    question = "Quels jeux de réflexion sont sortis sur DS en 2007 ?"
+    filters = chatbot.analytics.filter_parser.parse(question)
+    assert filters == {'Platform': ['DS'], 'Genre': ['Puzzle'], 'Year': (2007, 2007)}
+
+    embedding = chatbot.embeddings.embed_query(question)
+    documents = chatbot._vector_search(question, embedding, 5, filters)
+    assert len(documents) == 5
+    for doc in documents:
+        assert (doc.metadata["type"], doc.metadata["platform"], doc.metadata["genre"], doc.metadata["year"]) \
+            == ("game", "DS", "Puzzle", 2007)
+
+    # Without the filters, the same search is not limited to these games
+    unfiltered = chatbot._vector_search(question, embedding, 5, {})
+    assert any(doc.metadata.get("genre") != "Puzzle" for doc in unfiltered)
+
+
+def test_retrieved_games_respect_the_filters(chatbot):
+    documents = chatbot._retrieve("Quels jeux de réflexion sont sortis sur DS en 2007 ?",
+                                  chatbot.embeddings.embed_query("Quels jeux de réflexion sont sortis sur DS en 2007 ?"))
+    games = [doc for doc in documents if doc.metadata["type"] == "game"]
+    assert games
+    assert all(doc.metadata["platform"] == "DS" and doc.metadata["year"] == 2007 for doc in games)
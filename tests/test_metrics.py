@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+
+import pytest
+
+import metrics
+
+
+def parse(text):
+    """{sample line without value: value}"""
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_single_process_render():
+    registry = metrics.Registry()
+    histogram = registry.histogram("test_seconds", "Test", ["stage"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    samples = parse(registry.render())
+    assert samples['test_seconds_bucket{stage="a",le="0.1"}'] == "1"
+    assert samples['test_seconds_bucket{stage="a",le="+Inf"}'] == "2"
+    assert samples['test_seconds_count{stage="a"}'] == "2"
+
+
+def _observe_in_child(histogram, registry):
+    histogram.observe(0.5, stage="a")
+    histogram.observe(2.0, stage="b")
+    registry.flush()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork only")
+def test_multiprocess_render_sums_the_processes(tmp_path):
+    registry = metrics.Registry(str(tmp_path))
+    histogram = registry.histogram("test_seconds", "Test", ["stage"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")  # before the fork: must not be counted again by the children
+
+    context = multiprocessing.get_context("fork")
+    for _ in range(2):
+        child = context.Process(target=_observe_in_child, args=(histogram, registry))
+        child.start()
+        child.join()
+        assert child.exitcode == 0
+
+    samples = parse(registry.render())
+    assert samples['test_seconds_bucket{stage="a",le="0.1"}'] == "1"
+    assert samples['test_seconds_bucket{stage="a",le="1"}'] == "3"
+    assert samples['test_seconds_count{stage="a"}'] == "3"
+    assert samples['test_seconds_count{stage="b"}'] == "2"
+    assert samples['test_seconds_sum{stage="b"}'] == "4.000000"
+    assert len(list(tmp_path.glob("*.json"))) == 3
@@ -0,0 +1,26 @@
+from config.config import RAGChatbotConfig
+
+
+def user_message(chatbot, question):
+    chatbot.answer_cache.invalidate()
+    chatbot.llm.prompts.clear()
+    chatbot.ask(question)
+    system, user = chatbot.llm.prompts[-1]
+    assert system["role"] == "system" and user["role"] == "user"
+    return user["content"]
+
+
+def test_static_documents_only_in_system_message(chatbot):
+    static_chunks = [chunk for chunk in chatbot._create_chunks()
+                     if chunk.metadata["type"] in RAGChatbotConfig.STATIC_CONTEXT_TYPES]
+    assert static_chunks
+    for question in ("Donne-moi un résumé statistique du dataset",
+                     "Parle-moi des genres et des éditeurs du dataset"):
+        content = user_message(chatbot, question)
+        for chunk in static_chunks:
+            assert chunk.page_content.strip()[:200] not in content
+
+
+def test_platform_documents_still_retrieved(chatbot):
+    content = user_message(chatbot, "Parle-moi du TOP 10 jeux sur chaque plateforme")
+    assert "TOP 10 jeux sur" in content
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from vector_index import NumpyVectorIndex
+
+
+def rows(n, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def batched(directory, dtype, vectors, batch=7):
+    index = NumpyVectorIndex(str(directory), dtype)
+    for start in range(0, len(vectors), batch):
+        ids = [str(i) for i in range(start, min(start + batch, len(vectors)))]
+        index.add(ids, vectors[start:start + batch], [f"doc {i}" for i in ids],
+                  [{"n": int(i), "parity": "even" if int(i) % 2 == 0 else "odd"} for i in ids])
+    return index
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_batched_adds_match_a_single_add(tmp_path, dtype):
+    vectors = rows(100)
+    index = batched(tmp_path / "batched", dtype, vectors)
+    whole = batched(tmp_path / "whole", dtype, vectors, batch=100)
+    queries = rows(3, seed=1)
+    assert ([[hit.id for hit in hits] for hits in index.search(queries, 5)]
+            == [[hit.id for hit in hits] for hits in whole.search(queries, 5)])
+
+    # Blocks are concatenated once, by the first search
+    assert len(index.vectors) == 100 and not index._pending
+    hits = index.search(queries, 5, where={"parity": "even"})
+    assert all(hit.metadata["n"] % 2 == 0 for hit in hits[0])
+
+
+def test_adds_after_a_search_and_upserts(tmp_path):
+    vectors = rows(20)
+    index = batched(tmp_path, "float32", vectors[:10])
+    assert index.search(vectors[:1], 1)[0][0].id == "0"
+
+    index.add(["10", "0"], vectors[10:12], ["doc 10", "new 0"], [{"n": 10}, {"n": 0}])
+    assert index.count() == 11
+    assert index.search(vectors[11:12], 1)[0][0].document == "new 0"
+    assert index.search(vectors[10:11], 1, where={"n": {"$gte": 10}})[0][0].id == "10"
+
+    index.save()
+    reloaded = NumpyVectorIndex.load(str(tmp_path))
+    assert reloaded.count() == 11
+    assert reloaded.search(vectors[11:12], 1)[0][0].document == "new 0"
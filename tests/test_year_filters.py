@@ -0,0 +1,34 @@
+import numpy as np
+
+import csv_loader
+from aggregate_cube import AggregateCube
+from analytics import AnalyticsRouter
+from conftest import CSV_PATH
+
+
+def typed_frame():
+    frame = csv_loader.read_csv(CSV_PATH)
+    assert str(frame['Year'].dtype) == 'Int16' and frame['Year'].isna().any()
+    return frame
+
+
+def test_mask_skips_missing_years():
+    frame = typed_frame()
+    router = AnalyticsRouter(frame, AggregateCube.build(frame))
+    mask = router.filter_parser.mask(frame, {'Platform': ['Wii'], 'Year': (2008, 2008)})
+    assert mask.dtype == np.bool_
+    assert mask.sum() == ((frame['Platform'] == 'Wii') & (frame['Year'] == 2008)).sum() > 0
+
+
+def test_analytics_answer_with_year_filter():
+    frame = typed_frame()
+    router = AnalyticsRouter(frame, AggregateCube.build(frame))
+    intent = router.route("Quel est le jeu le plus vendu en 2008 ?")
+    text = router.answer(intent)[0]
+    assert "2008" in text and "Mario Kart Wii" in text
+
+
+def test_ask_with_year_filter(chatbot):
+    for question in ("Quels jeux sont sortis sur Wii en 2008 ?", "Parle-moi des jeux Nintendo de 2006"):
+        answer = chatbot.ask(question)["answer"]
+        assert not answer.startswith("Erreur"), answer
@@ -0,0 +1,383 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+DTYPES = ("float32", "float16", "int8")
+
+# Rows scored per matrix product; bounds the float32 copy made for float16/int8 storage
+SCORE_BLOCK_ROWS = 8192
+
+
+class VectorHit(NamedTuple):
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    score: float  # cosine similarity, higher is closer
+
+
+class VectorIndex:
+    """Minimal vector index interface shared by the Chroma and NumPy backends."""
+
+    def add(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+            documents: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def delete(self, ids: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    def search(self, vectors: Sequence[Sequence[float]], k: int,
+               where: Optional[Dict[str, Any]] = None) -> List[List[VectorHit]]:
+        """Top ``k`` hits for each query vector, optionally restricted by a Chroma-style ``where``."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+
+class ChromaVectorIndex(VectorIndex):
+    """``VectorIndex`` over an existing Chroma collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def add(self, ids, embeddings, documents, metadatas):
+        step = getattr(self.collection._client, "max_batch_size", None) or 5000
+        for start in range(0, len(ids), step):
+            end = start + step
+            self.collection.add(ids=list(ids[start:end]), embeddings=[list(v) for v in embeddings[start:end]],
+                                documents=list(documents[start:end]), metadatas=list(metadatas[start:end]))
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=list(ids))
+
+    def search(self, vectors, k, where=None):
+        results = self.collection.query(
+            query_embeddings=[list(vector) for vector in vectors],
+            n_results=k,
+            where=where or None,
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            # Squared L2 distance between unit vectors: d = 2 - 2 cos
+            [VectorHit(id_, text, metadata or {}, 1.0 - distance / 2.0)
+             for id_, text, metadata, distance in zip(ids, texts, metadatas, distances)]
+            for ids, texts, metadatas, distances in zip(
+                results["ids"], results["documents"], results["metadatas"], results["distances"])
+        ]
+
+    def count(self):
+        return self.collection.count()
+
+
+class _Column(NamedTuple):
+    values: np.ndarray    # float64 for numeric fields, object otherwise
+    present: np.ndarray   # bool, False where the field is missing
+    numeric: bool
+
+
+class NumpyVectorIndex(VectorIndex):
+    """Brute-force cosine search over a memory-mapped embedding matrix.
+
+    Vectors are normalized and stored as float32, float16 or int8 (one
+    float32 scale per row), so a search is a matrix product followed by
+    ``argpartition``. Metadata lives in column arrays and ``where`` filters
+    (``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in``,
+    ``$nin``, ``$and``, ``$or``) become boolean masks. The index is written
+    to ``directory`` by ``save`` and reopened read-only by ``load``.
+
+    ``add`` only queues the encoded block: the matrix is concatenated and
+    the metadata columns rebuilt once, by the next search, delete or save,
+    so a batched ingestion stays linear in the number of rows.
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32"):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        self.directory = directory
+        self.dtype = dtype
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.vectors = None
+        self.scales = None
+        self._columns: Optional[Dict[str, _Column]] = {}
+        self._positions: Dict[str, int] = {}
+        self._pending: List[Tuple[np.ndarray, Optional[np.ndarray]]] = []
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Storage
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _unit_rows(vectors) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _encode(self, unit: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.dtype == "int8":
+            scales = np.abs(unit).max(axis=1).astype(np.float32) / 127.0
+            scales[scales == 0] = 1.0
+            return np.round(unit / scales[:, None]).astype(np.int8), scales
+        return unit.astype(self.dtype), None
+
+    def _decoded(self, start: int, end: int) -> np.ndarray:
+        block = np.asarray(self.vectors[start:end], dtype=np.float32)
+        if self.scales is not None:
+            block *= self.scales[start:end, None]
+        return block
+
+    def add(self, ids, embeddings, documents, metadatas):
+        ids = [str(id_) for id_ in ids]
+        unit = self._unit_rows(embeddings)
+        if self._positions.keys() & set(ids):
+            # Upsert: the new version replaces the stored one
+            self.delete(ids)
+        self._pending.append(self._encode(unit))
+        self._positions.update((id_, i) for i, id_ in enumerate(ids, start=len(self.ids)))
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+        self.metadatas.extend(dict(m or {}) for m in metadatas)
+        self._columns = None
+
+    def _consolidate(self, columns: bool = True) -> None:
+        """Concatenate the blocks added since the last call (and rebuild the metadata columns if stale)"""
+        with self._lock:
+            if self._pending:
+                vectors = [np.asarray(self.vectors)] if self.vectors is not None and len(self.vectors) else []
+                scales = [np.asarray(self.scales)] if self.scales is not None and len(self.scales) else []
+                for encoded, block_scales in self._pending:
+                    vectors.append(encoded)
+                    if block_scales is not None:
+                        scales.append(block_scales)
+                self.vectors = np.concatenate(vectors) if len(vectors) > 1 else vectors[0]
+                self.scales = (np.concatenate(scales) if len(scales) > 1 else scales[0]) if scales else None
+                self._pending = []
+            if columns and self._columns is None:
+                fields = sorted({key for metadata in self.metadatas for key in metadata})
+                self._columns = {field: self._build_column(field) for field in fields}
+
+    def delete(self, ids):
+        doomed = {str(id_) for id_ in ids} & self._positions.keys()
+        if not doomed:
+            return
+        self._consolidate(columns=False)
+        keep = np.array([id_ not in doomed for id_ in self.ids], dtype=bool)
+        self.vectors = np.asarray(self.vectors)[keep]
+        if self.scales is not None:
+            self.scales = np.asarray(self.scales)[keep]
+        positions = np.flatnonzero(keep).tolist()
+        self.ids = [self.ids[i] for i in positions]
+        self.documents = [self.documents[i] for i in positions]
+        self.metadatas = [self.metadatas[i] for i in positions]
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._positions = {id_: i for i, id_ in enumerate(self.ids)}
+        # Columns are rebuilt by the next search
+        self._columns = None
+
+    def _build_column(self, field: str) -> _Column:
+        raw = [metadata.get(field) for metadata in self.metadatas]
+        present = np.array([value is not None for value in raw], dtype=bool)
+        numeric = all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                      for value in raw if value is not None)
+        if numeric:
+            values = np.array([np.nan if value is None else value for value in raw], dtype=np.float64)
+        else:
+            values = np.empty(len(raw), dtype=object)
+            values[:] = raw
+        return _Column(values, present, numeric)
+
+    def count(self):
+        return len(self.ids)
+
+    def save(self) -> None:
+        self._consolidate(columns=False)
+        tmp_path = f"{self.directory}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        dimension = self.vectors.shape[1] if self.vectors is not None else 0
+        np.save(os.path.join(tmp_path, "vectors.npy"),
+                np.asarray(self.vectors) if self.vectors is not None else np.zeros((0, 0), dtype=self.dtype))
+        if self.scales is not None:
+            np.save(os.path.join(tmp_path, "scales.npy"), np.asarray(self.scales))
+        with open(os.path.join(tmp_path, "records.json"), "w", encoding="utf-8") as f:
+            json.dump({"dtype": self.dtype, "dimension": dimension, "ids": self.ids,
+                       "documents": self.documents, "metadatas": self.metadatas}, f, ensure_ascii=False)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(os.path.dirname(self.directory) or ".", exist_ok=True)
+        os.replace(tmp_path, self.directory)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["NumpyVectorIndex"]:
+        try:
+            with open(os.path.join(directory, "records.json"), "r", encoding="utf-8") as f:
+                records = json.load(f)
+            index = cls(directory, records["dtype"])
+            index.vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+            if index.dtype == "int8":
+                index.scales = np.load(os.path.join(directory, "scales.npy"))
+        except (OSError, ValueError, KeyError):
+            return None
+        index.ids = records["ids"]
+        index.documents = records["documents"]
+        index.metadatas = records["metadatas"]
+        index._reindex()
+        return index
+
+    # ------------------------------------------------------------------ #
+    # Filtering
+    # ------------------------------------------------------------------ #
+    def _condition(self, field: str, condition: Any) -> np.ndarray:
+        column = self._columns.get(field)
+        if column is None:
+            return np.zeros(len(self.ids), dtype=bool)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        mask = column.present.copy()
+        for op, value in condition.items():
+            if op in ("$in", "$nin"):
+                if column.numeric:
+                    hit = np.isin(column.values, list(value))
+                else:
+                    allowed = set(value)
+                    hit = np.fromiter((v in allowed for v in column.values), dtype=bool, count=len(column.values))
+                mask &= hit if op == "$in" else ~hit
+            elif op in ("$eq", "$ne"):
+                hit = column.values == value
+                mask &= hit if op == "$eq" else ~hit
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                if not column.numeric:
+                    raise ValueError(f"{op} needs a numeric field, '{field}' is not")
+                with np.errstate(invalid="ignore"):
+                    mask &= {
+                        "$gt": np.greater, "$gte": np.greater_equal,
+                        "$lt": np.less, "$lte": np.less_equal,
+                    }[op](column.values, value)
+            else:
+                raise ValueError(f"Unsupported operator {op!r}")
+        return mask
+
+    def _mask(self, where: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, value in where.items():
+            if key == "$and":
+                for clause in value:
+                    mask &= self._mask(clause)
+            elif key == "$or":
+                mask &= np.logical_or.reduce([self._mask(clause) for clause in value])
+            else:
+                mask &= self._condition(key, value)
+        return mask
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+    def _scores(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """(rows, queries) cosine similarities, computed block by block"""
+        if rows is None:
+            total = len(self.ids)
+            if self.dtype == "float32" and self.scales is None:
+                return np.asarray(self.vectors) @ queries.T
+            return np.vstack([self._decoded(start, min(start + SCORE_BLOCK_ROWS, total)) @ queries.T
+                              for start in range(0, total, SCORE_BLOCK_ROWS)])
+        block = np.asarray(self.vectors[rows], dtype=np.float32)
+        if self.scales is not None:
+            block *= self.scales[rows, None]
+        return block @ queries.T
+
+    def search(self, vectors, k, where=None):
+        queries = self._unit_rows(vectors)
+        if not self.ids:
+            return [[] for _ in range(len(queries))]
+        self._consolidate()
+
+        rows = np.flatnonzero(self._mask(where)) if where else None
+        if rows is not None and not len(rows):
+            return [[] for _ in range(len(queries))]
+        scores = self._scores(queries, rows)
+
+        k = min(k, scores.shape[0])
+        if k < scores.shape[0]:
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[0])[:, None], scores.shape)
+        results = []
+        for q in range(len(queries)):
+            candidates = top[:, q]
+            ordered = candidates[np.argsort(-scores[candidates, q], kind="stable")]
+            positions = ordered if rows is None else rows[ordered]
+            results.append([
+                VectorHit(self.ids[p], self.documents[p], self.metadatas[p], float(scores[o, q]))
+                for p, o in zip(positions.tolist(), ordered.tolist())
+            ])
+        return results
+
+
+class IndexVectorStore(VectorStore):
+    """LangChain ``VectorStore`` over a ``VectorIndex`` (retriever, similarity_search...)."""
+
+    def __init__(self, index: VectorIndex, embedding: Embeddings):
+        self.index = index
+        self.embedding = embedding
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        self.index.add(ids, self.embedding.embed_documents(texts), texts, metadatas)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        self.index.delete(ids or [])
+        return True
+
+    @staticmethod
+    def _document(hit: VectorHit) -> Document:
+        return Document(page_content=hit.document, metadata=hit.metadata)
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[Dict[str, Any]] = None):
+        return [(self._document(hit), hit.score) for hit in self.index.search([embedding], k, filter)[0]]
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     filter: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_by_vector_with_score(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4,
+                          filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k, filter)
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, directory: str = "./numpy_index",
+                   dtype: str = "float32", **kwargs: Any) -> "IndexVectorStore":
+        """Build, fill and persist a ``NumpyVectorIndex``"""
+        store = cls(NumpyVectorIndex(directory, dtype), embedding)
+        store.add_texts(texts, metadatas, ids)
+        store.index.save()
+        return store
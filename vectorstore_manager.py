@@ -1,36 +1,83 @@
-from typing import List
+import os
+from itertools import islice
+from typing import Iterable, Iterator, List, Union
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 
 from config.config import RAGChatbotConfig
+from data_loader import DataLoader
+from embedding_backends import create_embeddings, embedding_cache_name
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from vector_index import IndexVectorStore, NumpyVectorIndex
 
 class VectorStoreManager:
-    """Chroma Vector Store Manager"""
+    """Vector Store Manager (Chroma or in-process NumPy index, see config.VECTOR_BACKEND)"""
 
     def __init__(self, config: RAGChatbotConfig):
         self.config = config
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=config.EMBEDDING_MODEL
+        self.embeddings = CachedEmbeddings(
+            create_embeddings(config),
+            EmbeddingCache(
+                config.EMBEDDING_CACHE_DIRECTORY,
+                embedding_cache_name(config),
+                max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES
+            )
         )
 
-    def create_vector_store(self, texts: List[str]) -> Chroma:
+    @property
+    def numpy_index_directory(self) -> str:
+        return os.path.join(self.config.PERSIST_DIRECTORY, "numpy_index", "documents")
+
+    def create_vector_store(self, texts: Iterable[str]) -> Union[Chroma, IndexVectorStore]:
+        """Split and index ``texts`` by batches of INGEST_BATCH_SIZE.
+
+        ``texts`` may be a generator (``DataLoader.iter_*``): only one batch
+        of texts, chunks and embeddings is held at a time (besides what the
+        store itself keeps).
+        """
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.config.CHUNK_SIZE,
             chunk_overlap=self.config.CHUNK_OVERLAP
         )
 
-        documents = splitter.create_documents(texts)
+        if self.config.VECTOR_BACKEND == "numpy":
+            vectordb = IndexVectorStore(
+                NumpyVectorIndex(self.numpy_index_directory, self.config.VECTOR_INDEX_DTYPE),
+                self.embeddings
+            )
+        else:
+            vectordb = Chroma(
+                persist_directory=self.config.PERSIST_DIRECTORY,
+                embedding_function=self.embeddings
+            )
 
-        vectordb = Chroma.from_documents(
-            documents,
-            self.embeddings,
-            persist_directory=self.config.PERSIST_DIRECTORY
-        )
-        vectordb.persist()
+        for batch in self._batches(texts):
+            documents = splitter.create_documents(batch)
+            if documents:
+                vectordb.add_documents(documents)
+
+        if self.config.VECTOR_BACKEND == "numpy":
+            vectordb.index.save()
+        else:
+            vectordb.persist()
         return vectordb
 
-    def load_vector_store(self) -> Chroma:
+    def create_vector_store_from_file(self, path: str, text_field: str | None = None) -> Union[Chroma, IndexVectorStore]:
+        """Stream a CSV / JSON / JSONL / TXT file into a new vector store"""
+        return self.create_vector_store(DataLoader.iter_file(path, text_field))
+
+    def _batches(self, texts: Iterable[str]) -> Iterator[List[str]]:
+        iterator = iter(texts)
+        while batch := list(islice(iterator, self.config.INGEST_BATCH_SIZE)):
+            yield batch
+
+    def load_vector_store(self) -> Union[Chroma, IndexVectorStore]:
+        if self.config.VECTOR_BACKEND == "numpy":
+            index = NumpyVectorIndex.load(self.numpy_index_directory)
+            if index is None:
+                raise FileNotFoundError(f"Aucun index NumPy dans {self.numpy_index_directory}")
+            return IndexVectorStore(index, self.embeddings)
+
         return Chroma(
             persist_directory=self.config.PERSIST_DIRECTORY,
             embedding_function=self.embeddings